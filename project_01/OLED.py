@@ -1,26 +1,53 @@
-import sounddevice as sd #Library for the audio input/output (microphone/speakers)
-import numpy as np #Library for the numerical operations, especially array manipulation
-import matplotlib #This is matplotlib it is meant for plotting and visualization 
-matplotlib.use('Agg')  # Sets the matplotlib for plotting and visualization 
-import matplotlib.pyplot as plt #Pyplot module allows for creating plots
-import Adafruit_BBIO.GPIO as GPIO #This library is for general purpose Input/Output (GPIO) 
 import time #Library for time-related functions, such as delays 
+from startup import StartupTimer #Records how long each startup step takes 
+timer = StartupTimer() #Starts the startup clock before any other imports 
+
+# Only the libraries needed to show "Press button" are imported up front.
+# NumPy, sounddevice and matplotlib are imported by a warm-up thread once the display is ready.
+# Hardware libraries are loaded through hw_backend, so EDES301_BACKEND=sim runs this script on the simulator 
+hw_backend = timer.import_module("hw_backend")
+metrics = timer.import_module("metrics") #Per-stage timing and counters (EDES301_METRICS=stdout or a file path) 
+GPIO = timer.call("import GPIO", hw_backend.load_gpio) #This library is for general purpose Input/Output (GPIO) 
 
 # --- Import THE OLED Libraries ---
-import Adafruit_SSD1306 #This is the driver library for the SSD1306-based OLED display
-from PIL import Image, ImageDraw, ImageFont #Pillow (PIL) library for the prupose of image manipulation and drawing text 
+Adafruit_SSD1306 = timer.call("import SSD1306", hw_backend.load_ssd1306) #This is the driver library for the SSD1306-based OLED display
+# Display wrapper that only sends changed pages over I2C (uses Pillow (PIL) to draw text)
+OLEDDisplay = timer.import_module("oled_display").OLEDDisplay
 
 # ----------------------------
 # USER CONFIGURATION
 # ----------------------------
 fs = 44100          # This is the sampling rate in Hertz (Hz) - which is the standard for CD quality audio 
+TARGET_FS = 4000    # Recordings are decimated to this rate while they are captured (None = keep fs) 
+FILTER_PRESET = "heart" # Band-pass filter applied while capturing: "heart", "lung" or None 
+FILTER_BACKEND = "numpy" # "numpy", or "scipy" (slightly faster, but adds seconds to the startup) 
 device = 'hw:1,0'   # This specifies the usb microphone in ALSA format 
 output_file = "waveform.png" #This is the file name for the saved waveform image 
+spectrogram_file = "spectrogram.png" #File name for the saved spectrogram image 
+recording_file = "recording.wav" #Each recording is streamed to this WAV file while the button is held 
+health_file = "recording_health.json" #Overflow/gap report for the last recording (None = don't save) 
+ARCHIVE_DIR = "recordings" #Every recording is compressed and kept here (None = only keep the last one) 
+SAVE_PNG = True     # Also save the full resolution waveform PNG (after the OLED is updated) 
+OLED_AXIS = True    # Draw the zero line on the OLED waveform 
+SPECTROGRAM = True  # Compute a spectrogram while recording (saved with the waveform PNG) 
+SPECTROGRAM_MAX_FREQ = 1000 # Highest frequency shown in the spectrogram (Hz) 
+OLED_VIEW = "waveform" # Left on the OLED after a recording: "waveform" or "spectrogram" (heatmap) 
+LIVE_VIEW_FPS = 10  # Maximum OLED updates per second for the live view while recording 
+HEART_RATE = True   # Estimate the heart rate while recording and show it on the live view (updated every second) 
+RENDER_QUEUE_SIZE = 2               # Maximum recordings waiting for their PNG to be rendered 
+RENDER_QUEUE_POLICY = "drop_oldest" # When the queue is full: "drop_oldest", "drop_newest" or "block" 
 BUTTON_PIN = "P1_36" # GPIO pin name for the button input 
+STARTUP_TIMING = True # Print the per-import startup timing breakdown 
+# Heavy modules imported in the background after the display shows "Press button" 
+WARM_UP_MODULES = ["numpy", hw_backend.SOUNDDEVICE_MODULE, "oled_raster", "render_worker", "recording_sink", "live_view",
+                   "xrun_monitor", "resample", "sos_filter", "heart_rate", "spectrogram", "archive", "matplotlib.figure", "matplotlib.backends.backend_agg"]
 
 # --- OLED CONFIGURATION ---
 I2C_BUS = 1         # I2C bus number connected to the OLED display 
 RST = None          # Not connected 
+# Messages rendered once at startup (shown without redrawing)
+FIXED_MESSAGES = [("Press button", "to record."), ("RECORDING...", "(Hold button)"),
+                  ("Processing...", "Please wait.")]
 # The following initializes the 128x64 OLED display object, using the specified I2C bus
 disp = Adafruit_SSD1306.SSD1306_128_64(rst=RST, i2c_bus=I2C_BUS)
 # ----------------------------
@@ -30,6 +57,7 @@ disp = Adafruit_SSD1306.SSD1306_128_64(rst=RST, i2c_bus=I2C_BUS)
 #PUD_UP means that the pin is normally high (3.3V) and goes Low when the button is pressed (falling edge)
 try:
     GPIO.setup(BUTTON_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    timer.mark("GPIO setup")
 except Exception as e:
     # The following catches any errors during GPIO setup (such as an invalid pin name) and exits
     print(f"Error setting up GPIO: {e}")
@@ -41,13 +69,9 @@ try:
     disp.clear() # This command clears the display buffer (sets all the pixels to black)
     disp.display() #Write the cleared buffer to the screen
     print("OLED Display Initialized.")
-    # Creates a blank image for drawing in 1-bit (black and white) format.
-    width = disp.width
-    height = disp.height
-    image = Image.new('1', (width, height))
-    draw = ImageDraw.Draw(image) #This gets the drawing object for the image
-    # The following loads the default font for displaying the text.
-    font = ImageFont.load_default()
+    # Keeps a copy of the screen so only changed pages are sent, and pre-renders the fixed messages
+    oled = OLEDDisplay(disp, messages=FIXED_MESSAGES)
+    timer.mark("OLED setup")
 except Exception as e:
     # The following catches any error during the OLED initialization and exits 
     print(f"Error initializing OLED: {e}")
@@ -57,24 +81,81 @@ except Exception as e:
 # --- Helper Function to Display Messages ---
 def display_message(line1, line2=""):
     """Draws 1 or 2 lines of text to the OLED screen."""
-    #The following draws a filled black rectangle over the whole image to clear it 
-    draw.rectangle((0, 0, width, height), outline=0, fill=0) # Clear image
-    #Draws the first line of text at the top-left corner (0, 0)
-    draw.text((0, 0),  line1, font=font, fill=255)
-    # Draws the second line of text, offset by 10 pixels vertically 
-    draw.text((0, 10), line2, font=font, fill=255)
-    disp.image(image) #Copies the PIL image buffer to the display driver 
-    disp.display() #Updates the physical OLED screen with the new image 
+    # Text is rendered once and cached; only the changed parts of the screen are sent
+    oled.message(line1, line2)
+
+def show_heart_rate(bpm):
+    """Shows the latest heart rate estimate on the live view."""
+    live_view.set_text(f"{bpm:.0f} BPM" if bpm else "-- BPM")
+
+def render_pngs(audio, spectrogram_result):
+    """Saves the waveform PNG, and the spectrogram PNG if there is one (render worker thread)."""
+    render_waveform_png(audio, output_file)
+    if spectrogram_result is not None:
+        render_spectrogram_png(spectrogram_result, spectrogram_file, max_freq=SPECTROGRAM_MAX_FREQ)
+
+# --- Deferred Startup ---
+render_worker = None # Created once the warm-up imports are done 
+archive_worker = None
+
+def finish_startup():
+    """Waits for the warm-up imports (first call only) and binds the heavy modules."""
+    global np, sd, rasterize_waveform, render_worker, RecordingSink, live_view, xrun_monitor, capture_stages
+    global heart_rate, spectrogram, rasterize_spectrogram, render_waveform_png, render_spectrogram_png
+    global archive_worker
+    if render_worker is not None:
+        return
+    warm_up.join() # Returns immediately if the imports already finished 
+    # These are already in sys.modules, so the imports below are instant
+    import numpy as np #Library for the numerical operations, especially array manipulation
+    sd = hw_backend.load_sounddevice() #Library for the audio input/output (microphone/speakers)
+    from oled_raster import rasterize_waveform, rasterize_spectrogram #Draws straight into the OLED framebuffer 
+    from render_worker import RenderWorker, render_waveform_png, POLICY_BLOCK #Renders the PNGs on a background thread 
+    from recording_sink import RecordingSink #Streams the recording to disk from a writer thread 
+    from live_view import LiveLevelView #Scrolling waveform and level meter shown while recording 
+    from xrun_monitor import XrunMonitor #Records input overflows and gaps from the audio callback 
+    from resample import StreamingDecimator #Anti-alias filter + decimation, applied block by block 
+    import sos_filter #Band-pass filter (removes rumble and handling noise), applied block by block 
+    from heart_rate import HeartRateEstimator #Live BPM from the filtered recording 
+    from spectrogram import StreamingSTFT, render_spectrogram_png #Spectrogram computed block by block 
+    from archive import RecordingArchive #Compressed recordings + index + min/max pyramids 
+    live_view = LiveLevelView(oled, fps=LIVE_VIEW_FPS)
+    xrun_monitor = XrunMonitor(fs)
+    # Heart and lung sounds are below ~2 kHz, so storing 44.1 kHz only makes every later step slower
+    capture_stages = [StreamingDecimator(fs, TARGET_FS)] if TARGET_FS else []
+    if FILTER_PRESET:
+        capture_stages.append(sos_filter.from_preset(FILTER_PRESET, TARGET_FS or fs, FILTER_BACKEND))
+    # Runs on the sink's writer thread; each new estimate replaces the label on the live view
+    heart_rate = HeartRateEstimator(TARGET_FS or fs, on_update=show_heart_rate)
+    # Also fed by the writer thread, so the spectrogram is finished when the recording is 
+    spectrogram = StreamingSTFT(TARGET_FS or fs)
+    # PNG plotting runs on its own thread so the button loop re-arms immediately after a recording
+    render_worker = RenderWorker(render_pngs, max_pending=RENDER_QUEUE_SIZE, policy=RENDER_QUEUE_POLICY)
+    # Archiving also runs in the background, but recordings are never dropped (the loop waits instead)
+    if ARCHIVE_DIR:
+        archive_worker = RenderWorker(RecordingArchive(ARCHIVE_DIR).add, max_pending=RENDER_QUEUE_SIZE,
+                                      policy=POLICY_BLOCK, name="archive-worker")
+    if STARTUP_TIMING:
+        timer.report("first recording")
 
 # --- Main Loop ---
 try:
     display_message("Press button", "to record.") # Initial message on OLED
+    timer.mark("ready message")
     print("Stethoscope script initialized.")
+    if STARTUP_TIMING:
+        timer.report("Press button")
+    # Heavy imports run in the background while waiting for the first press
+    warm_up = timer.warm_up(WARM_UP_MODULES)
     print(f"Press and hold the button on {BUTTON_PIN} to record.")
 
+    show_ready = True # The last waveform stays on the OLED until the next recording 
+
     while True:
         print("\nWaiting for button press...")
-        display_message("Press button", "to record.") # Show ready message
+        if show_ready:
+            display_message("Press button", "to record.") # Show ready message
+        show_ready = True
         
         time.sleep(0.1) 
         
@@ -82,17 +163,30 @@ try:
         #Block the execution until the button is pressed (pin voltage drops from HIGH to LOW) )
         GPIO.wait_for_edge(BUTTON_PIN, GPIO.FALLING)
         
+        finish_startup() # Only waits if the warm-up imports are still running 
         print("Recording started. Release button to stop.")
         display_message("RECORDING...", "(Hold button)")
 
-        recorded_chunks = [] #List to store blocks of recorded audio data 
+        # Blocks are written to disk as they arrive, so memory use does not grow with the hold time
+        # The writer thread decimates and band-pass filters each block before it is written
+        for stage in capture_stages:
+            stage.reset()
+        heart_rate.reset()
+        spectrogram.reset()
+        consumers = ([heart_rate] if HEART_RATE else []) + ([spectrogram] if SPECTROGRAM else [])
+        sink = RecordingSink(recording_file, TARGET_FS or fs, stages=capture_stages, consumers=consumers)
+        xrun_monitor.reset()
 
         # 2. Audio callback function
         def audio_callback(indata, frames, time, status):
             # Function is called automatically by sounddevice when a new block of audio is available 
-            if status:
-                print(status, flush=True) # Print any status information/warnings
-            recorded_chunks.append(indata.copy()) # Append a copy of the new audio data to the list 
+            metrics.count("blocks_captured")
+            # Records overflow/underflow flags and gaps (printing here would slow the callback down)
+            missing = xrun_monitor.on_callback(frames, time, status)
+            if missing:
+                sink.write_gap(missing) # Fills lost samples with silence so the timing stays correct 
+            sink.write(indata) # Queues a copy of the new audio data for the writer thread 
+            live_view.push_block(indata) # Adds the block's peak/RMS to the live view (display thread draws it) 
 
         # 3. Start the audio stream
         stream = sd.InputStream( 
@@ -102,66 +196,86 @@ try:
             dtype='int16', # Data type for the samples (16-bit integers)
             callback=audio_callback #function that calls with new audio data 
         )
-        stream.start() # Begins the non-blocking audio recording stream 
+        live_view.start() # Starts pushing the live view to the OLED at LIVE_VIEW_FPS 
+        if HEART_RATE:
+            live_view.set_text("-- BPM") # Replaced by the estimate once there are a few seconds of audio 
+        with metrics.span("capture"):
+            stream.start() # Begins the non-blocking audio recording stream 
 
-        # 4. Waits for button release (RISING edge) 
-        # Blocks execution until the button is released (pin voltage rises from LOW to High)
-        GPIO.wait_for_edge(BUTTON_PIN, GPIO.RISING)
+            # 4. Waits for button release (RISING edge) 
+            # Blocks execution until the button is released (pin voltage rises from LOW to High)
+            GPIO.wait_for_edge(BUTTON_PIN, GPIO.RISING)
         
         print("Recording stopped.")
+        live_view.stop() # Waits for the display thread so the OLED is free again 
         display_message("Processing...", "Please wait.")
         
         # 5. Stop and close the stream
         stream.stop()
         stream.close()
 
-        if not recorded_chunks:
+        # 6. Process the audio
+        # Closes the WAV file and maps it back as a 1D array (not loaded into RAM)
+        try:
+            with metrics.span("concat"):
+                audio = sink.finish()
+        except Exception as e: # A stage or the file write failed; the partial file is removed
+            print(f"Recording failed: {e!r}")
+            display_message("Recording", "failed")
+            time.sleep(2)
+            continue
+
+        if len(audio) == 0:
             print("No audio recorded.")
             continue # skips to the next iteration of the while loop 
 
-        # 6. Process the audio
-        # Combines all recorded NumPy arrays into a single array 
-        audio = np.concatenate(recorded_chunks)
-        # Flattens the array (e.g., converts (N, 1) shape to (N,))
-        audio = audio.flatten()
-        print(f"{len(audio)} samples captured.")
-
-# 7. Plots waveform
-        plt.figure(figsize=(10, 4)) #Creates a new Matplotlib figure
-        plt.plot(audio, color='blue') #Plots the audio data as a line graph 
-        plt.title("Audio Waveform")
-        plt.xlabel("Sample Number")
-        plt.ylabel("Amplitude")
-        plt.tight_layout() #Adjusts plot parameters for the tight layout 
-        plt.savefig(output_file) #Saves the plot to the specified PNG file 
-
-        print(f"Waveform saved as {output_file}")
-        
-        # --- NEW: DISPLAY WAVEFORM ON OLED ---
-        display_message("Loading PNG...", "") # Shows a loading message
+        print(f"{len(audio)} samples captured ({sink.bytes_written} bytes written to {recording_file}).")
+        for consumer, error in sink.consumer_errors: # Live analysis that failed and was turned off
+            print(f"{type(consumer).__name__} stopped: {error!r}")
+        print(xrun_monitor.report()) # Overflows, gaps and callback timing for this recording
+        if HEART_RATE:
+            print(f"Heart rate: {heart_rate.bpm:.0f} BPM" if heart_rate.bpm else "Heart rate: no reading")
+        if health_file:
+            xrun_monitor.save(health_file)
+
+        # The spectrogram was computed during the recording; this only copies it 
+        spectrogram_result = spectrogram.result() if SPECTROGRAM else None
+
+        # 7. Display the waveform (or spectrogram heatmap) on the OLED
+        # The recording is drawn straight into a 128x64 1-bit framebuffer (no PNG round-trip)
         try:
-            # Opens the saved waveform using Pillow
-            img = Image.open(output_file)
-            
-            # Resize it to fit the display (128x64)
-            # Employs Image.LANCZOS (a high-quality resampling filter for shrinking) for better-looking resized images
-            img = img.resize((disp.width, disp.height), Image.ANTIALIAS)
-            
-            # Converts the image to 1-bit (black and white) format 
-            img = img.convert('1') 
-            
-            # Display the processed image on the OLED
-            disp.image(img)
-            disp.display()
-            print("Waveform image displayed on OLED.")
-            
-            # Shows the image for a set duration (4 seconds)
-            time.sleep(4)
-            
+            with metrics.span("raster"):
+                if (OLED_VIEW == "spectrogram") and SPECTROGRAM:
+                    times, freqs, magnitudes = spectrogram_result
+                    framebuffer = rasterize_spectrogram(magnitudes, freqs, SPECTROGRAM_MAX_FREQ,
+                                                        disp.width, disp.height)
+                    shown = "Spectrogram"
+                else:
+                    framebuffer = rasterize_waveform(audio, disp.width, disp.height, axis=OLED_AXIS)
+                    shown = "Waveform"
+            oled.show(framebuffer)
+            print(f"{shown} displayed on OLED.")
         except Exception as e:
-            print(f"Error displaying image on OLED: {e}")
-            display_message("Error:", "Image load fail")
+            print(f"Error displaying waveform on OLED: {e}")
+            display_message("Error:", "Display fail")
             time.sleep(2)
+            continue
+
+        # Keep the waveform on the OLED while waiting for the next press
+        show_ready = False
+
+        # Keeps a compressed copy of the recording (recording.wav is replaced by the next one)
+        if archive_worker is not None:
+            archive_worker.submit(audio, TARGET_FS or fs, bpm=heart_rate.bpm if HEART_RATE else None,
+                                  intact=xrun_monitor.intact)
+
+        # 8. Queues the full resolution waveform (and spectrogram) plots (optional)
+        # The PNGs are rendered in the background; the loop goes straight back to waiting
+        if SAVE_PNG:
+            if render_worker.submit(audio, spectrogram_result):
+                print(f"Waveform queued for {output_file}" + (f" and {spectrogram_file}" if SPECTROGRAM else ""))
+            else:
+                print("Render queue full; waveform PNG skipped.")
         
 
 except KeyboardInterrupt:
@@ -170,8 +284,11 @@ except KeyboardInterrupt:
 finally:
     # Cleanup block always executed before the script finishes 
     GPIO.cleanup() #reset all used GPIO pins to their default state 
+    if render_worker is not None:
+        render_worker.close() #Finishes any queued waveform PNGs 
+    if archive_worker is not None:
+        archive_worker.close() #Finishes archiving the last recordings 
     display_message("Goodbye!") # Display final message on OLED
     time.sleep(1)
-    disp.clear() #Clear the display buffer
-    disp.display() #update the screen to be blank 
+    oled.clear() #Blanks the screen 
     print("GPIO cleanup complete.")
\ No newline at end of file
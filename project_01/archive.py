@@ -0,0 +1,458 @@
+"""
+--------------------------------------------------------------------------
+Recording Archive
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Recording Archive
+
+  Keeps every recording instead of overwriting the last one.  Recordings are
+stored compressed, listed from a small index, and can be zoomed and rendered
+straight away from a precomputed min/max pyramid without decoding the audio.
+
+Layout of the archive directory:
+  - audio.bin:      Compressed audio of all sessions, appended.  Audio is
+                    split into chunks of CHUNK_SAMPLES samples; every chunk is
+                    delta encoded (int16 differences, which are small for
+                    audio), byte shuffled (all low bytes, then all high
+                    bytes) and zlib compressed on its own, so part of a
+                    recording can be decoded without the rest.
+  - index.jsonl:    One JSON line per session:  id, timestamp, duration, fs,
+                    samples, peak, bpm, byte offset and chunk sizes in
+                    audio.bin, and the pyramid levels (plus any extra
+                    information passed to add()).
+  - pyramid/<id>.npy:
+                    Min/max pyramid of the session, (rows, 2) int16.  Level 0
+                    holds the min / max of every BASE_BUCKET samples and each
+                    further level combines PYRAMID_FACTOR rows of the level
+                    below, down to about MIN_LEVEL_ROWS rows.  The file is
+                    read with np.load(mmap_mode="r"), so only the rows needed
+                    for a view are read from disk.
+
+  envelope() picks the coarsest pyramid level that still gives at least one
+row per output column, so drawing any zoom level of any recording costs
+about the same (a few thousand rows).  Only views zoomed in closer than
+BASE_BUCKET samples per column decode audio, and then only the chunks that
+cover the view (likewise for the partial rows at either end of a view).
+
+Software API:
+
+  RecordingArchive(path)
+    add(audio, fs, bpm=None, timestamp=None, **info)
+      - Compress and index a recording; returns its index entry
+    sessions()
+      - List of index entries (oldest first)
+    get(session_id)
+      - Index entry of one session
+    read_audio(session_id, start=0, stop=None)
+      - Decoded int16 samples [start, stop)
+    envelope(session_id, columns, start=0, stop=None)
+      - (mins, maxs, edges) for "columns" columns of samples [start, stop).
+        Column i covers samples edges[i] .. edges[i + 1]; when the pyramid
+        is used, the inner edges are rounded to its rows (edges[0] == start
+        and edges[-1] == stop always)
+    rasterize(session_id, width=128, height=64, start=0, stop=None)
+      - OLED framebuffer of the (zoomed) waveform
+    render_png(session_id, output_file, start=0.0, stop=None)
+      - Waveform PNG of seconds [start, stop)
+
+  Command line:
+    python3 archive.py [--archive DIR] list
+    python3 archive.py [--archive DIR] render ID out.png [--start S] [--stop S]
+    python3 archive.py test
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import argparse
+import threading
+
+import numpy as np
+
+from decimate import minmax_columns, reduce_minmax, PLOT_COLUMNS
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+INDEX_FILE                  = "index.jsonl"
+AUDIO_FILE                  = "audio.bin"
+PYRAMID_DIR                 = "pyramid"
+
+CHUNK_SAMPLES               = 65536      # Samples per independently compressed chunk
+BASE_BUCKET                 = 16         # Samples per row of pyramid level 0
+PYRAMID_FACTOR              = 4          # Rows combined per level
+MIN_LEVEL_ROWS              = 128        # Smallest pyramid level kept
+COMPRESS_LEVEL              = 6
+SAMPLE_DTYPE                = np.dtype("<i2")
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def encode_chunk(samples):
+    """ Delta encode, byte shuffle and compress int16 samples """
+    samples = np.asarray(samples, dtype=SAMPLE_DTYPE).reshape(-1)
+    deltas  = np.diff(samples, prepend=SAMPLE_DTYPE.type(0))          # int16 differences (wrap around)
+    planes  = deltas.view(np.uint8).reshape(-1, 2).T                 # Low bytes, then high bytes
+    return zlib.compress(np.ascontiguousarray(planes).tobytes(), COMPRESS_LEVEL)
+
+# End def
+
+
+def decode_chunk(blob):
+    """ Inverse of encode_chunk() """
+    planes = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(2, -1)
+    deltas = np.ascontiguousarray(planes.T).view(SAMPLE_DTYPE).reshape(-1)
+    return np.cumsum(deltas, dtype=SAMPLE_DTYPE)
+
+# End def
+
+
+def build_pyramid(audio):
+    """ Return the (rows, 2) min/max pyramid and its [row offset, rows, bucket] levels """
+    audio  = np.asarray(audio).reshape(-1)
+    count  = -(-len(audio) // BASE_BUCKET)
+    mins   = np.empty(count, dtype=SAMPLE_DTYPE)
+    maxs   = np.empty(count, dtype=SAMPLE_DTYPE)
+
+    # Level 0, one chunk at a time (the audio may be a memmap)
+    for start in range(0, len(audio), CHUNK_SAMPLES):
+        chunk = audio[start:start + CHUNK_SAMPLES]
+        first = start // BASE_BUCKET
+        rows  = -(-len(chunk) // BASE_BUCKET)
+        edges = np.arange(rows) * BASE_BUCKET
+        mins[first:first + rows] = np.minimum.reduceat(chunk, edges)
+        maxs[first:first + rows] = np.maximum.reduceat(chunk, edges)
+
+    levels = [(mins, maxs)]
+    while len(levels[-1][0]) > MIN_LEVEL_ROWS * PYRAMID_FACTOR:
+        mins, maxs = levels[-1]
+        edges      = np.arange(0, len(mins), PYRAMID_FACTOR)
+        levels.append((np.minimum.reduceat(mins, edges), np.maximum.reduceat(maxs, edges)))
+
+    table  = []
+    offset = 0
+    for i, (mins, maxs) in enumerate(levels):
+        table.append([offset, len(mins), BASE_BUCKET * PYRAMID_FACTOR ** i])
+        offset += len(mins)
+
+    pyramid = np.empty((offset, 2), dtype=SAMPLE_DTYPE)
+    for (start, rows, bucket), (mins, maxs) in zip(table, levels):
+        pyramid[start:start + rows, 0] = mins
+        pyramid[start:start + rows, 1] = maxs
+
+    return pyramid, table
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Recording Archive Class
+# ------------------------------------------------------------------------
+
+class RecordingArchive():
+    """ Append-only compressed recording store with an index and min/max pyramids """
+
+    def __init__(self, path):
+        """ Open (or create) the archive directory """
+        self.path     = path
+        self._lock    = threading.Lock()
+        self._entries = []
+        self._pyramids = {}
+
+        os.makedirs(os.path.join(path, PYRAMID_DIR), exist_ok=True)
+
+        index = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index):
+            with open(index) as f:
+                self._entries = [json.loads(line) for line in f if line.strip()]
+
+    # End def
+
+    def add(self, audio, fs, bpm=None, timestamp=None, **info):
+        """ Compress and index one recording; returns its index entry """
+        audio = np.asarray(audio).reshape(-1)
+        if len(audio) == 0:
+            raise ValueError("Cannot archive an empty recording")
+
+        with self._lock:
+            session_id = (self._entries[-1]["id"] + 1) if self._entries else 1
+            timestamp  = time.time() if timestamp is None else timestamp
+
+            # Compressed audio chunks, appended to audio.bin
+            chunks = []
+            with open(os.path.join(self.path, AUDIO_FILE), "ab") as f:
+                offset = f.tell()
+                for start in range(0, len(audio), CHUNK_SAMPLES):
+                    blob = encode_chunk(audio[start:start + CHUNK_SAMPLES])
+                    f.write(blob)
+                    chunks.append(len(blob))
+
+            pyramid, levels = build_pyramid(audio)
+            pyramid_file    = os.path.join(PYRAMID_DIR, "{0:06d}.npy".format(session_id))
+            np.save(os.path.join(self.path, pyramid_file), pyramid)
+
+            top   = pyramid[levels[-1][0]:]
+            entry = {
+                "id":         session_id,
+                "timestamp":  timestamp,
+                "time":       time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+                "duration_s": len(audio) / float(fs),
+                "fs":         fs,
+                "samples":    len(audio),
+                "peak":       max(int(top[:, 1].max()), -int(top[:, 0].min())),
+                "bpm":        None if bpm is None else round(float(bpm), 1),
+                "offset":     offset,
+                "chunks":     chunks,
+                "pyramid":    pyramid_file,
+                "levels":     levels,
+            }
+            entry.update(info)
+
+            with open(os.path.join(self.path, INDEX_FILE), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._entries.append(entry)
+
+        return entry
+
+    # End def
+
+    def sessions(self):
+        """ Return the index entries, oldest first """
+        return list(self._entries)
+
+    # End def
+
+    def get(self, session_id):
+        """ Return the index entry of one session """
+        for entry in self._entries:
+            if entry["id"] == session_id:
+                return entry
+        raise KeyError("No session {0} in {1}".format(session_id, self.path))
+
+    # End def
+
+    def read_audio(self, session_id, start=0, stop=None):
+        """ Decode samples [start, stop) (only the chunks that cover them) """
+        entry = self.get(session_id)
+        stop  = entry["samples"] if stop is None else min(stop, entry["samples"])
+        start = max(0, start)
+        if stop <= start:
+            return np.zeros(0, dtype=SAMPLE_DTYPE)
+
+        first  = start // CHUNK_SAMPLES
+        last   = (stop - 1) // CHUNK_SAMPLES
+        offset = entry["offset"] + sum(entry["chunks"][:first])
+        parts  = []
+
+        with open(os.path.join(self.path, AUDIO_FILE), "rb") as f:
+            f.seek(offset)
+            for chunk in range(first, last + 1):
+                parts.append(decode_chunk(f.read(entry["chunks"][chunk])))
+
+        audio = np.concatenate(parts)
+        base  = first * CHUNK_SAMPLES
+        return audio[start - base:stop - base]
+
+    # End def
+
+    def _pyramid(self, entry):
+        """ Memory mapped pyramid of a session (cached) """
+        pyramid = self._pyramids.get(entry["id"])
+        if pyramid is None:
+            pyramid = np.load(os.path.join(self.path, entry["pyramid"]), mmap_mode="r")
+            self._pyramids[entry["id"]] = pyramid
+        return pyramid
+
+    # End def
+
+    def envelope(self, session_id, columns, start=0, stop=None):
+        """ Return (mins, maxs, edges) for columns columns of samples [start, stop) """
+        entry = self.get(session_id)
+        stop  = entry["samples"] if stop is None else min(stop, entry["samples"])
+        start = max(0, min(start, stop - 1))
+        edges = start + (np.arange(columns + 1, dtype=np.int64) * (stop - start)) // columns
+
+        # Coarsest level with at least one row per column
+        per_column = (stop - start) / float(columns)
+        usable     = [level for level in entry["levels"] if level[2] <= per_column]
+        if not usable:
+            mins, maxs = minmax_columns(self.read_audio(session_id, start, stop), columns)
+            return mins, maxs, edges
+
+        # Inner column edges rounded to rows of that level; the partial rows
+        # at start and stop are decoded from the audio so the outer edges are exact
+        row_offset, rows, bucket = usable[-1]
+        row_edges     = edges // bucket
+        row_edges[0]  = -(-start // bucket)
+        row_edges[-1] = stop // bucket
+        first, last   = row_edges[0], row_edges[-1]
+        view          = self._pyramid(entry)[row_offset + first:row_offset + last]
+        row_mins      = [view[:, 0]]
+        row_maxs      = [view[:, 1]]
+        starts        = row_edges[:-1] - first
+        if start < first * bucket:
+            head = self.read_audio(session_id, start, first * bucket)
+            row_mins.insert(0, [head.min()])
+            row_maxs.insert(0, [head.max()])
+            starts[1:] += 1
+        if last * bucket < stop:
+            tail = self.read_audio(session_id, last * bucket, stop)
+            row_mins.append([tail.min()])
+            row_maxs.append([tail.max()])
+        mins, maxs = reduce_minmax(np.concatenate(row_mins).astype(SAMPLE_DTYPE),
+                                   np.concatenate(row_maxs).astype(SAMPLE_DTYPE), starts)
+
+        edges[1:-1] = row_edges[1:-1] * bucket
+        return mins, maxs, edges
+
+    # End def
+
+    def rasterize(self, session_id, width=128, height=64, start=0, stop=None, axis=True):
+        """ Return an OLED framebuffer of samples [start, stop) """
+        from oled_raster import rasterize_minmax
+
+        mins, maxs, edges = self.envelope(session_id, width, start, stop)
+        return rasterize_minmax(mins, maxs, height, axis)
+
+    # End def
+
+    def render_png(self, session_id, output_file, start=0.0, stop=None, figsize=(10, 4), dpi=100):
+        """ Save the waveform of seconds [start, stop) as a PNG """
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        entry = self.get(session_id)
+        fs    = entry["fs"]
+        mins, maxs, edges = self.envelope(session_id, PLOT_COLUMNS, int(start * fs),
+                                          None if stop is None else int(stop * fs))
+
+        # Min/max pairs drawn as vertical strokes (as decimate.minmax_envelope)
+        x       = np.repeat((edges[:-1] + edges[1:] - 1) / 2.0 / fs, 2)
+        y       = np.empty(2 * len(mins), dtype=mins.dtype)
+        y[0::2] = mins
+        y[1::2] = maxs
+
+        figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(figure)
+        axes   = figure.add_subplot(1, 1, 1)
+        axes.plot(x, y, color='blue')
+        axes.set_title("Recording {0} ({1})".format(entry["id"], entry["time"]))
+        axes.set_xlabel("Time (s)")
+        axes.set_ylabel("Amplitude")
+        figure.tight_layout()
+        figure.savefig(output_file)
+
+        return output_file
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+def _self_test():
+    import tempfile
+    from hw_sim import HeartbeatSource
+
+    print("RecordingArchive Test")
+
+    fs      = 4000
+    archive = RecordingArchive(tempfile.mkdtemp(prefix="archive_"))
+    audio   = HeartbeatSource(fs, bpm=72).read(fs * 300)          # 5 minutes
+
+    start = time.perf_counter()
+    entry = archive.add(audio, fs, bpm=72.0)
+    add_time = time.perf_counter() - start
+
+    size = sum(entry["chunks"])
+    print("    Added {0:.0f} s: {1} bytes -> {2} bytes ({3:.1f}x), {4} pyramid levels, {5:.0f} ms".format(
+          entry["duration_s"], audio.nbytes, size, audio.nbytes / size, len(entry["levels"]), add_time * 1000))
+
+    # Lossless, also for a window that spans chunks
+    archive = RecordingArchive(archive.path)
+    assert np.array_equal(archive.read_audio(entry["id"]), audio)
+    assert np.array_equal(archive.read_audio(entry["id"], 60000, 140000), audio[60000:140000])
+
+    # Pyramid envelopes match the envelope of the decoded audio at every zoom
+    for span in (len(audio), fs * 10, 1000):
+        start = time.perf_counter()
+        mins, maxs, edges = archive.envelope(entry["id"], 128, 5000, 5000 + span)
+        elapsed = time.perf_counter() - start
+        assert np.array_equal(mins, [audio[a:b].min() for a, b in zip(edges[:-1], edges[1:])])
+        assert np.array_equal(maxs, [audio[a:b].max() for a, b in zip(edges[:-1], edges[1:])])
+        print("    Envelope of {0:7d} samples: {1:.2f} ms".format(span, elapsed * 1000))
+
+    # Window that starts and stops inside pyramid rows: exact outer edges
+    for start, stop, columns in ((101, 777, 36), (5003, 5003 + fs * 10 + 7, 128)):
+        mins, maxs, edges = archive.envelope(entry["id"], columns, start, stop)
+        assert edges[0] == start and edges[-1] == stop and len(mins) == columns
+        assert np.array_equal(mins, [audio[a:b].min() for a, b in zip(edges[:-1], edges[1:])])
+        assert np.array_equal(maxs, [audio[a:b].max() for a, b in zip(edges[:-1], edges[1:])])
+
+    print("Test Complete")
+
+# End def
+
+
+if __name__ == '__main__':
+    parser   = argparse.ArgumentParser(description="Stethoscope recording archive")
+    parser.add_argument("--archive", default="recordings", help="Archive directory")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("list", help="List the archived recordings")
+    render   = commands.add_parser("render", help="Render a recording (or part of it) to a PNG")
+    render.add_argument("id", type=int)
+    render.add_argument("output_file")
+    render.add_argument("--start", type=float, default=0.0, help="Start time (s)")
+    render.add_argument("--stop", type=float, default=None, help="Stop time (s)")
+    commands.add_parser("test", help="Run the self test")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for entry in RecordingArchive(args.archive).sessions():
+            print("{0:4d}  {1}  {2:7.1f} s  peak {3:5d}  {4}".format(
+                  entry["id"], entry["time"], entry["duration_s"], entry["peak"],
+                  "{0:.0f} BPM".format(entry["bpm"]) if entry["bpm"] else "-- BPM"))
+    elif args.command == "render":
+        RecordingArchive(args.archive).render_png(args.id, args.output_file, args.start, args.stop)
+        print("Saved {0}".format(args.output_file))
+    elif args.command == "test":
+        _self_test()
+    else:
+        parser.print_help()
+        sys.exit(1)
@@ -4,6 +4,9 @@ import matplotlib
 matplotlib.use('Agg')  # Use non-GUI backend
 import matplotlib.pyplot as plt
 
+from decimate import minmax_envelope, PLOT_COLUMNS
+from spectrogram import StreamingSTFT, render_spectrogram_png
+
 # ----------------------------
 # USER CONFIGURATION
 # ----------------------------
@@ -11,6 +14,7 @@ fs = 44100         # Sampling rate (Hz)
 duration = 20        # Recording duration (seconds)
 device = 'hw:1,0'   # Your USB microphone device
 output_file = "waveform.png"
+spectrogram_file = "spectrogram.png"
 # ----------------------------
 
 print(f"Recording {duration} seconds from device {device}...")
@@ -24,7 +28,9 @@ print("Recording complete. Saving waveform...")
 
 # Plot waveform
 plt.figure(figsize=(10, 4))
-plt.plot(audio, color='blue')
+# Only plot one min/max pair per pixel column (keeps peaks, cost ~ image width)
+plot_x, plot_y = minmax_envelope(audio, PLOT_COLUMNS)
+plt.plot(plot_x, plot_y, color='blue')
 plt.title("Audio Waveform")
 plt.xlabel("Sample Number")
 plt.ylabel("Amplitude")
@@ -32,3 +38,10 @@ plt.tight_layout()
 plt.savefig(output_file)
 
 print(f"Waveform saved as {output_file}")
+
+# Spectrogram (2048 point FFT: ~22 Hz frequency resolution at 44.1 kHz)
+spectrogram = StreamingSTFT(fs, nfft=2048, hop=512)
+spectrogram.push_block(audio)
+render_spectrogram_png(spectrogram.result(), spectrogram_file, max_freq=2000)
+
+print(f"Spectrogram saved as {spectrogram_file}")
@@ -0,0 +1,339 @@
+"""
+--------------------------------------------------------------------------
+Stethoscope Pipeline Benchmark
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Stethoscope Pipeline Benchmark
+
+  Replays recordings of different lengths through the OLED.py pipeline and
+reports how long each stage takes, so regressions show up before deploying.
+
+  Two pipelines are measured:
+    - "legacy":   The original OLED.py flow.  Blocks are appended to a list,
+                  concatenated, plotted with pyplot, saved to PNG, loaded back
+                  with PIL, resized / thresholded and sent with disp.image().
+    - "current":  Blocks are decimated to TARGET_FS, band-pass filtered
+                  (FILTER_PRESET) and streamed to a WAV file
+                  (RecordingSink), mapped back as a memmap, rasterized
+                  straight into the OLED framebuffer and sent with
+                  OLEDDisplay (changed pages only).  As in OLED.py, the
+                  heart rate (HEART_RATE) and spectrogram (SPECTROGRAM)
+                  are computed block by block by sink consumers;
+                  "spectrogram" is the copy of the finished result.
+                  The PNG is rendered off the critical path (background
+                  worker in OLED.py) and is reported as "png_render".
+                  The blocks are queued all at once, so the time the
+                  writer thread needs to decimate / filter / write /
+                  analyse them is reported as "stages".  On the device
+                  this work is done while recording, so it is not part of
+                  "release_to_display"; "concat" only covers finishing
+                  the file and mapping it back.
+
+  "release_to_display" is the button release to waveform on screen latency:
+the sum of the stages between the end of capture and the display transfer.
+
+  Audio comes from the simulator's heartbeat source and the display is the
+virtual SSD1306 from hw_sim.py, so the benchmark runs on any Linux machine
+(the display stage measures CPU time only; "i2c_bus_ms" estimates the time
+the bytes would take on a 400 kHz I2C bus).
+
+  Each (pipeline, duration) case runs in a fresh process, so "peak_rss_kb" is
+the peak memory of that case alone.
+
+Usage:
+
+  python3 bench_pipeline.py [--durations 1,5,10,30,60,120] [--repeats 3]
+                            [--pipelines legacy,current] [--output results.json]
+
+  Results are printed as a table and written as JSON (stdout if no --output).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import resource
+import multiprocessing
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+FS                          = 44100
+TARGET_FS                   = 4000       # OLED.py TARGET_FS (None = no decimation)
+FILTER_PRESET               = "heart"    # OLED.py FILTER_PRESET (None = no filter)
+HEART_RATE                  = True       # OLED.py HEART_RATE (live BPM consumer)
+SPECTROGRAM                 = True       # OLED.py SPECTROGRAM (streaming STFT consumer)
+BLOCK_SIZE                  = 1024
+I2C_HZ                      = 400000
+I2C_BITS_PER_BYTE           = 9          # 8 data bits + ACK
+
+DEFAULT_DURATIONS           = [1, 5, 10, 30, 60, 120]
+DEFAULT_REPEATS             = 3
+PIPELINES                   = ("legacy", "current")
+PERCENTILES                 = (50, 90, 99)
+
+RELEASE_TO_DISPLAY          = {
+    "legacy":  ("concat", "plot", "savefig", "image_load", "resize", "i2c_push"),
+    "current": ("concat", "spectrogram", "raster", "i2c_push"),     # "stages" runs during capture
+}
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+class _Stopwatch():
+    """ Collects named stage durations for one run """
+
+    def __init__(self):
+        self.times = {}
+
+    def time(self, stage, function, *args, **kwargs):
+        start  = time.perf_counter()
+        result = function(*args, **kwargs)
+        self.times[stage] = time.perf_counter() - start
+        return result
+
+# End class
+
+
+def _make_blocks(duration):
+    """ Blocks of synthetic heart sounds as delivered by the audio callback """
+    from hw_sim import HeartbeatSource
+    source = HeartbeatSource(FS)
+    count  = int(duration * FS / BLOCK_SIZE)
+    return [source.read(BLOCK_SIZE).reshape(-1, 1) for i in range(count)]
+
+# End def
+
+
+def _run_legacy(blocks, work_dir):
+    """ One pass through the original OLED.py pipeline """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from PIL import Image
+    import hw_sim
+
+    disp        = hw_sim.Adafruit_SSD1306.SSD1306_128_64(rst=None, i2c_bus=1)
+    output_file = os.path.join(work_dir, "legacy.png")
+    watch       = _Stopwatch()
+    resample    = getattr(Image, "ANTIALIAS", Image.LANCZOS)
+
+    def capture():
+        chunks = []
+        for block in blocks:
+            chunks.append(block.copy())
+        return chunks
+
+    def plot(audio):
+        plt.figure(figsize=(10, 4))
+        plt.plot(audio, color='blue')
+        plt.title("Audio Waveform")
+        plt.xlabel("Sample Number")
+        plt.ylabel("Amplitude")
+        plt.tight_layout()
+
+    def savefig():
+        plt.savefig(output_file)
+        plt.close()
+
+    def i2c_push(img):
+        disp.image(img)
+        disp.display()
+
+    chunks = watch.time("capture", capture)
+    audio  = watch.time("concat", lambda: np.concatenate(chunks).flatten())
+    watch.time("plot", plot, audio)
+    watch.time("savefig", savefig)
+    img    = watch.time("image_load", lambda: Image.open(output_file).convert('RGBA'))
+    img    = watch.time("resize", lambda: img.resize((disp.width, disp.height), resample).convert('1'))
+    watch.time("i2c_push", i2c_push, img)
+
+    return watch.times, disp._i2c.bytes
+
+# End def
+
+
+def _run_current(blocks, work_dir):
+    """ One pass through the current OLED.py pipeline """
+    import hw_sim
+    from recording_sink import RecordingSink
+    from resample import StreamingDecimator
+    from sos_filter import from_preset
+    from heart_rate import HeartRateEstimator
+    from spectrogram import StreamingSTFT
+    from oled_raster import rasterize_waveform
+    from oled_display import OLEDDisplay
+    from render_worker import render_waveform_png
+
+    disp = hw_sim.Adafruit_SSD1306.SSD1306_128_64(rst=None, i2c_bus=1)
+    oled = OLEDDisplay(disp)
+    oled.message("Processing...", "Please wait.")
+    start_bytes = disp._i2c.bytes
+
+    watch       = _Stopwatch()
+    stages      = [StreamingDecimator(FS, TARGET_FS)] if TARGET_FS else []
+    if FILTER_PRESET:
+        stages.append(from_preset(FILTER_PRESET, TARGET_FS or FS, "numpy"))
+    heart_rate  = HeartRateEstimator(TARGET_FS or FS)
+    spectrogram = StreamingSTFT(TARGET_FS or FS)
+    consumers   = ([heart_rate] if HEART_RATE else []) + ([spectrogram] if SPECTROGRAM else [])
+    sink        = RecordingSink(os.path.join(work_dir, "current.wav"), TARGET_FS or FS,
+                                stages=stages, consumers=consumers)
+
+    def capture():
+        for block in blocks:
+            sink.write(block)
+
+    watch.time("capture", capture)
+    watch.time("stages", sink.wait)
+    audio       = watch.time("concat", sink.finish)
+    if sink.consumer_errors:        # A dropped consumer would make "stages" look faster
+        raise sink.consumer_errors[0][1]
+    watch.time("spectrogram", spectrogram.result if SPECTROGRAM else lambda: None)
+    framebuffer = watch.time("raster", rasterize_waveform, audio, axis=True)
+    watch.time("i2c_push", oled.show, framebuffer)
+    watch.time("png_render", render_waveform_png, audio, os.path.join(work_dir, "current.png"))
+
+    return watch.times, disp._i2c.bytes - start_bytes
+
+# End def
+
+
+def _run_case(pipeline, duration, repeats, results):
+    """ Child process: run one (pipeline, duration) case and report back """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    blocks   = _make_blocks(duration)
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    runner   = _run_legacy if pipeline == "legacy" else _run_current
+    runs     = []
+
+    for i in range(repeats):
+        times, i2c_bytes = runner(blocks, work_dir)
+        times["release_to_display"] = sum(times[stage] for stage in RELEASE_TO_DISPLAY[pipeline])
+        runs.append(times)
+
+    results.put({
+        "pipeline":    pipeline,
+        "duration_s":  duration,
+        "samples":     len(blocks) * BLOCK_SIZE,
+        "repeats":     repeats,
+        "stages_ms":   _summarize(runs),
+        "i2c_bytes":   i2c_bytes,
+        "i2c_bus_ms":  i2c_bytes * I2C_BITS_PER_BYTE * 1000.0 / I2C_HZ,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    })
+
+# End def
+
+
+def _summarize(runs):
+    """ Per-stage latency percentiles (milliseconds) """
+    summary = {}
+    for stage in runs[0]:
+        values = np.array([run[stage] for run in runs]) * 1000.0
+        summary[stage] = {"p{0}".format(p): float(np.percentile(values, p)) for p in PERCENTILES}
+        summary[stage]["min"] = float(values.min())
+        summary[stage]["max"] = float(values.max())
+    return summary
+
+# End def
+
+
+def run_benchmark(durations=DEFAULT_DURATIONS, repeats=DEFAULT_REPEATS, pipelines=PIPELINES):
+    """ Run every (pipeline, duration) case in its own process """
+    context = multiprocessing.get_context("spawn")
+    results = []
+
+    for pipeline in pipelines:
+        for duration in durations:
+            queue   = context.Queue()
+            process = context.Process(target=_run_case, args=(pipeline, duration, repeats, queue))
+            process.start()
+            results.append(queue.get())
+            process.join()
+            _print_case(results[-1])
+
+    return results
+
+# End def
+
+
+def _print_case(case):
+    stages = case["stages_ms"]
+    print("{0:<8s} {1:5.0f} s  release->display p50 {2:9.1f} ms  p90 {3:9.1f} ms  peak RSS {4:7.1f} MB".format(
+          case["pipeline"], case["duration_s"],
+          stages["release_to_display"]["p50"], stages["release_to_display"]["p90"],
+          case["peak_rss_kb"] / 1024.0), file=sys.stderr)
+    for stage, values in stages.items():
+        if stage != "release_to_display":
+            print("             {0:<12s} p50 {1:9.1f} ms".format(stage, values["p50"]), file=sys.stderr)
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stethoscope pipeline latency benchmark")
+    parser.add_argument("--durations", default=",".join(str(d) for d in DEFAULT_DURATIONS),
+                        help="Recording lengths in seconds (comma separated)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                        help="Runs per case (percentiles are taken over these)")
+    parser.add_argument("--pipelines", default=",".join(PIPELINES),
+                        help="Pipelines to run: legacy, current")
+    parser.add_argument("--output", default=None,
+                        help="JSON results file (default: stdout)")
+    args = parser.parse_args()
+
+    pipelines = [p.strip() for p in args.pipelines.split(",") if p.strip()]
+    for pipeline in pipelines:
+        if pipeline not in PIPELINES:
+            parser.error("Unknown pipeline: {0}".format(pipeline))
+
+    results = run_benchmark([float(d) for d in args.durations.split(",")], args.repeats, pipelines)
+    report  = {"fs": FS, "target_fs": TARGET_FS, "filter": FILTER_PRESET, "block_size": BLOCK_SIZE, "results": results}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
@@ -1,16 +1,22 @@
 import sounddevice as sd
-import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-GUI backend
 import matplotlib.pyplot as plt
 import Adafruit_BBIO.GPIO as GPIO # <-- Import the GPIO library
 
+from decimate import minmax_envelope, PLOT_COLUMNS
+from recording_sink import RecordingSink
+from xrun_monitor import XrunMonitor
+import metrics  # Per-stage timing and counters (EDES301_METRICS=stdout or a file path)
+
 # ----------------------------
 # USER CONFIGURATION
 # ----------------------------
 fs = 44100          # Sampling rate (Hz)
 device = 'hw:1,0'   # Your USB microphone device
 output_file = "waveform.png"
+recording_file = "recording.wav"  # Audio is streamed here while the button is held
+health_file = "recording_health.json"  # Overflow/gap report for the last recording
 BUTTON_PIN = "P1_36" # <-- Your button pin (P2.02 maps to GPIO 59)
 # ----------------------------
 
@@ -28,6 +34,9 @@ except Exception as e:
     print("  2. The 'Adafruit-BBIO' library is installed ('pip install Adafruit-BBIO')")
     exit(1)
 
+# Records overflows and gaps from the audio callback (no printing in the callback)
+xrun_monitor = XrunMonitor(fs)
+
 print("Stethoscope script initialized.")
 print(f"Press and hold the button on {BUTTON_PIN} to record.")
 
@@ -42,18 +51,24 @@ try:
         
         print("Recording started. Release button to stop.")
 
-        # This list will store all the audio chunks we record
-        recorded_chunks = []
+        # Audio chunks are written to this file as they arrive
+        # (memory use stays the same no matter how long the button is held)
+        sink = RecordingSink(recording_file, fs)
+        xrun_monitor.reset()
 
         # 2. Define a callback function
         # This function will be called by 'sounddevice' every time
         # it gets a new block of audio data from the microphone.
         def audio_callback(indata, frames, time, status):
             """This is called for each audio block."""
-            if status:
-                print(status, flush=True)
-            # Add the new audio data (indata) to our list
-            recorded_chunks.append(indata.copy())
+            metrics.count("blocks_captured")
+            # Record status flags and gaps; lost samples are replaced
+            # with silence so the rest of the recording stays in time
+            missing = xrun_monitor.on_callback(frames, time, status)
+            if missing:
+                sink.write_gap(missing)
+            # Queue a copy of the new audio data (indata) for the writer thread
+            sink.write(indata)
 
         # 3. Start the audio stream
         stream = sd.InputStream(
@@ -63,12 +78,13 @@ try:
             dtype='int16',
             callback=audio_callback
         )
-        stream.start()
+        with metrics.span("capture"):
+            stream.start()
 
-        # 4. Wait for button release (a RISING edge, from LOW back to HIGH)
-        # The stream will keep running and calling the 'audio_callback'
-        # in the background while we wait here.
-        GPIO.wait_for_edge(BUTTON_PIN, GPIO.RISING)
+            # 4. Wait for button release (a RISING edge, from LOW back to HIGH)
+            # The stream will keep running and calling the 'audio_callback'
+            # in the background while we wait here.
+            GPIO.wait_for_edge(BUTTON_PIN, GPIO.RISING)
         
         print("Recording stopped.")
         
@@ -76,27 +92,34 @@ try:
         stream.stop()
         stream.close()
 
+        # 6. Process the audio
+        # Close the file and map it back as a 1D array (not loaded into RAM)
+        with metrics.span("concat"):
+            audio = sink.finish()
+
         # Check if we actually recorded anything
-        if not recorded_chunks:
+        if len(audio) == 0:
             print("No audio recorded (button press was too short).")
             continue # Go back to the start of the 'while True' loop
 
-        # 6. Process the audio
-        # Combine all the small chunks into one big NumPy array
-        audio = np.concatenate(recorded_chunks)
-        audio = audio.flatten() # Make it a 1D array
-
         print(f"Recording complete. {len(audio)} samples captured.")
+        print(xrun_monitor.report())
+        xrun_monitor.save(health_file)
         print("Saving waveform...")
 
         # 7. Plot waveform (this is your original code)
-        plt.figure(figsize=(10, 4))
-        plt.plot(audio, color='blue')
-        plt.title("Audio Waveform")
-        plt.xlabel("Sample Number")
-        plt.ylabel("Amplitude")
-        plt.tight_layout()
-        plt.savefig(output_file)
+        with metrics.span("plot"):
+            plt.figure(figsize=(10, 4))
+            # Only plot one min/max pair per pixel column (keeps peaks, cost ~ image width)
+            plot_x, plot_y = minmax_envelope(audio, PLOT_COLUMNS)
+            plt.plot(plot_x, plot_y, color='blue')
+            plt.title("Audio Waveform")
+            plt.xlabel("Sample Number")
+            plt.ylabel("Amplitude")
+            plt.tight_layout()
+        with metrics.span("savefig"):
+            plt.savefig(output_file)
+            plt.close()
 
         print(f"Waveform saved as {output_file}")
 
@@ -0,0 +1,218 @@
+"""
+--------------------------------------------------------------------------
+Waveform Decimation
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Waveform Decimation
+
+  Reduce a long recording to roughly one point per output pixel before it is
+plotted.  A 20 s clip at 44.1 kHz is 882,000 samples but the waveform image is
+only ~1000 px wide, so handing every sample to matplotlib wastes time and
+memory.  All functions are vectorized with NumPy.
+
+  - minmax_columns():  Split the signal into n equal columns and return the
+                       minimum and maximum of each column.  Every peak that
+                       would be visible in the full plot is preserved.
+  - minmax_envelope(): Same reduction, returned as (x, y) points ready for
+                       plt.plot() (min/max pairs drawn as vertical strokes).
+  - lttb():            Largest-Triangle-Three-Buckets downsampling; returns
+                       real samples that keep the visual shape of the line.
+
+Software API:
+
+  minmax_columns(signal, n_columns)
+    - Returns (mins, maxs), each of length n_columns
+
+  reduce_minmax(mins, maxs, starts)
+    - Combine existing (mins, maxs) pairs (e.g. a stored pyramid level):
+      column i covers pairs starts[i] up to starts[i + 1]
+
+  minmax_envelope(signal, n_columns=PLOT_COLUMNS, x_offset=0)
+    - Returns (x, y) with at most 2 * n_columns points
+
+  lttb(signal, n_out=PLOT_COLUMNS, x_offset=0)
+    - Returns (x, y) with at most n_out points
+
+  decimate_for_plot(signal, n_columns=PLOT_COLUMNS, method="minmax")
+    - Dispatch to minmax_envelope() or lttb()
+"""
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# Default waveform image is 10 inches wide at 100 dpi
+PLOT_COLUMNS                = 1000
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def _column_edges(length, n_columns):
+    """ Sample index where each of the n_columns columns starts (plus the end) """
+    return (np.arange(n_columns + 1, dtype=np.int64) * length) // n_columns
+
+# End def
+
+
+def minmax_columns(signal, n_columns):
+    """ Return the per-column (mins, maxs) of the signal.
+
+    If the signal is shorter than n_columns, columns repeat the nearest sample.
+    """
+    signal = np.asarray(signal).reshape(-1)
+
+    if len(signal) == 0:
+        raise ValueError("Cannot decimate an empty signal")
+
+    starts = _column_edges(len(signal), n_columns)[:-1]
+
+    return np.minimum.reduceat(signal, starts), np.maximum.reduceat(signal, starts)
+
+# End def
+
+
+def reduce_minmax(mins, maxs, starts):
+    """ Combine runs of (mins, maxs) pairs; run i starts at pair starts[i] """
+    mins = np.asarray(mins).reshape(-1)
+    maxs = np.asarray(maxs).reshape(-1)
+
+    if len(mins) == 0:
+        raise ValueError("Cannot decimate an empty signal")
+
+    return np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts)
+
+# End def
+
+
+def minmax_envelope(signal, n_columns=PLOT_COLUMNS, x_offset=0):
+    """ Return (x, y) min/max pairs for plotting the signal n_columns wide """
+    signal = np.asarray(signal).reshape(-1)
+    length = len(signal)
+
+    # Nothing to gain for short signals
+    if length <= 2 * n_columns:
+        return np.arange(length) + x_offset, signal
+
+    edges      = _column_edges(length, n_columns)
+    mins, maxs = minmax_columns(signal, n_columns)
+
+    y       = np.empty(2 * n_columns, dtype=signal.dtype)
+    y[0::2] = mins
+    y[1::2] = maxs
+
+    # Both points of a column share its centre, drawing a vertical stroke
+    x = np.repeat((edges[:-1] + edges[1:] - 1) / 2.0, 2) + x_offset
+
+    return x, y
+
+# End def
+
+
+def lttb(signal, n_out=PLOT_COLUMNS, x_offset=0):
+    """ Largest-Triangle-Three-Buckets downsampling of the signal to n_out points """
+    signal = np.asarray(signal).reshape(-1)
+    length = len(signal)
+
+    if (n_out < 3) or (length <= n_out):
+        return np.arange(length) + x_offset, signal
+
+    y     = signal.astype(np.float64)
+    edges = 1 + (np.arange(n_out - 1, dtype=np.int64) * (length - 2)) // (n_out - 2)
+
+    index     = np.empty(n_out, dtype=np.int64)
+    index[0]  = 0
+    index[-1] = length - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point)
+        if i < n_out - 3:
+            next_x = (edges[i + 1] + edges[i + 2] - 1) / 2.0
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x = length - 1
+            next_y = y[-1]
+
+        # Point in this bucket with the largest triangle area
+        xs   = np.arange(start, end)
+        area = np.abs((prev - next_x) * (y[start:end] - y[prev]) -
+                      (prev - xs) * (next_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        index[i + 1] = prev
+
+    return index + x_offset, signal[index]
+
+# End def
+
+
+def decimate_for_plot(signal, n_columns=PLOT_COLUMNS, method="minmax", x_offset=0):
+    """ Reduce the signal for plotting using "minmax" or "lttb" """
+    if method == "minmax":
+        return minmax_envelope(signal, n_columns, x_offset)
+    elif method == "lttb":
+        return lttb(signal, n_columns, x_offset)
+    else:
+        raise ValueError("Unknown decimation method: {0}".format(method))
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+
+    print("Decimation Test")
+
+    fs    = 44100
+    rng   = np.random.default_rng(0)
+    audio = (rng.standard_normal(20 * fs) * 2000).astype(np.int16)
+    audio[123456] = 32767                      # Single sample spike
+
+    start = time.perf_counter()
+    x, y  = minmax_envelope(audio)
+    print("    minmax: {0} -> {1} points in {2:.1f} ms".format(len(audio), len(y), (time.perf_counter() - start) * 1000))
+    assert y.max() == 32767 and y.min() == audio.min()
+
+    start = time.perf_counter()
+    x, y  = lttb(audio)
+    print("    lttb:   {0} -> {1} points in {2:.1f} ms".format(len(audio), len(y), (time.perf_counter() - start) * 1000))
+    assert len(y) == PLOT_COLUMNS
+
+    print("Test Complete")
@@ -0,0 +1,261 @@
+"""
+--------------------------------------------------------------------------
+Heart Rate
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Heart Rate
+
+  Incremental heart rate (BPM) estimator for the stethoscope stream, so the
+device shows a reading while the button is held instead of only after the
+recording has been processed.
+
+  Every block is turned into an envelope as it arrives:
+    - The samples are normalized by a slowly decaying peak level and their
+      Shannon energy, -x^2 * log(x^2), is computed.  Shannon energy boosts
+      medium intensity sounds (S1 / S2) over both low-level noise and the
+      occasional loud click, which gives a steadier envelope than x^2.
+    - The energy is averaged over short frames (ENVELOPE_FS frames per
+      second) and the frames are appended to a RingBuffer that keeps the
+      last "window" seconds.
+
+  Once per "interval" seconds of audio the envelope window is autocorrelated
+(FFT, fixed size) and the strongest peak between the lags of max_bpm and
+min_bpm is taken as the beat period (refined with a parabola through the
+peak).  A peak below MIN_CONFIDENCE of the zero-lag value is reported as no
+reading (None).
+
+  The per-block work is proportional to the block length, and the periodic
+estimate always works on the same fixed-size window, so the CPU cost per
+block is bounded no matter how long the recording runs.
+
+Software API:
+
+  HeartRateEstimator(fs, window=6.0, interval=1.0, min_bpm=40, max_bpm=200,
+                     on_update=None)
+    - on_update:  Called as on_update(bpm) after every estimate (bpm is None
+                  when there is no clear beat)
+    push_block(block)
+      - Add one block of audio (RecordingSink consumer API)
+    estimate()
+      - Estimate the heart rate from the current window now
+    reset()
+      - Clear the envelope for a new recording
+    bpm / confidence
+      - Latest estimate (bpm is None when there is no reading)
+"""
+import math
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+ENVELOPE_FS                 = 100        # Envelope frames per second
+MIN_SECONDS                 = 3.0        # Audio needed before the first estimate
+MIN_CONFIDENCE              = 0.2        # Autocorrelation peak / zero lag
+PEAK_DECAY                  = 0.999      # Per block decay of the normalization peak
+MIN_PEAK                    = 100.0      # Smallest normalization peak (int16 units)
+
+
+# ------------------------------------------------------------------------
+# Heart Rate Estimator Class
+# ------------------------------------------------------------------------
+
+class HeartRateEstimator():
+    """ Shannon energy envelope + autocorrelation heart rate estimator """
+
+    def __init__(self, fs, window=6.0, interval=1.0, min_bpm=40, max_bpm=200, on_update=None):
+        """ Initialize variables and preallocate the envelope window """
+        self.fs        = fs
+        self.window    = window
+        self.interval  = interval
+        self.min_bpm   = min_bpm
+        self.max_bpm   = max_bpm
+        self.on_update = on_update
+
+        self.frame     = max(1, int(round(fs / ENVELOPE_FS)))   # Samples per envelope frame
+        self.env_fs    = fs / self.frame
+
+        self._envelope = RingBuffer(int(math.ceil(window * self.env_fs)), dtype=np.float32, keep_last=True)
+        self._nfft     = 1 << int(math.ceil(math.log2(2 * self._envelope.capacity)))
+        self._min_lag  = int(math.floor(60.0 * self.env_fs / max_bpm))
+        self._max_lag  = min(int(math.ceil(60.0 * self.env_fs / min_bpm)), self._envelope.capacity - 1)
+        self._energy   = np.zeros(0, dtype=np.float32)   # Work buffers, grown to the block size
+        self._log      = np.zeros(0, dtype=np.float32)
+        self._frames   = np.zeros(0, dtype=np.float32)
+        self._first    = np.zeros(1, dtype=np.float32)
+
+        self.reset()
+
+    # End def
+
+    def reset(self):
+        """ Clear the envelope and the latest estimate """
+        self._envelope.clear()
+        self._peak          = MIN_PEAK
+        self._partial_sum   = 0.0
+        self._partial_count = 0
+        self._samples       = 0
+        self._next_update   = int(MIN_SECONDS * self.fs)
+
+        self.bpm        = None
+        self.confidence = 0.0
+        self.estimates  = 0
+
+    # End def
+
+    def _shannon_energy(self, samples):
+        """ Shannon energy of the normalized samples (no allocation per block) """
+        count = len(samples)
+        if len(self._energy) < count:
+            self._energy = np.zeros(count, dtype=np.float32)
+            self._log    = np.zeros(count, dtype=np.float32)
+            self._frames = np.zeros(count // self.frame + 1, dtype=np.float32)
+        energy = self._energy[:count]
+        log    = self._log[:count]
+
+        # max / min instead of np.abs(): no temporary (and no int16 overflow)
+        peak       = max(float(samples.max()), -float(samples.min()))
+        self._peak = max(self._peak * PEAK_DECAY, peak, MIN_PEAK)
+
+        np.multiply(samples, np.float32(1.0 / self._peak), out=energy)
+        np.square(energy, out=energy)
+        np.minimum(energy, 1.0, out=energy)
+        np.maximum(energy, 1e-12, out=log)
+        np.log(log, out=log)
+        np.multiply(energy, log, out=energy)
+        np.negative(energy, out=energy)
+
+        return energy
+
+    # End def
+
+    def push_block(self, block):
+        """ Add one block of audio to the envelope """
+        samples = np.asarray(block).reshape(-1)
+        if len(samples) == 0:
+            return
+
+        energy = self._shannon_energy(samples)
+        frame  = self.frame
+
+        # Finish the frame carried over from the last block
+        need = frame - self._partial_count
+        if len(energy) < need:
+            self._partial_sum   += float(energy.sum())
+            self._partial_count += len(energy)
+        else:
+            self._first[0] = (self._partial_sum + float(energy[:need].sum())) / frame
+            whole  = (len(energy) - need) // frame
+            frames = self._frames[:whole]
+            np.sum(energy[need:need + whole * frame].reshape(whole, frame), axis=1, out=frames)
+            np.multiply(frames, 1.0 / frame, out=frames)
+            rest   = energy[need + whole * frame:]
+
+            self._envelope.write(self._first)
+            self._envelope.write(frames)
+            self._partial_sum   = float(rest.sum())
+            self._partial_count = len(rest)
+
+        self._samples += len(samples)
+        if self._samples >= self._next_update:
+            self._next_update += int(self.interval * self.fs)
+            self.estimate()
+
+    # End def
+
+    def estimate(self):
+        """ Estimate the heart rate from the current envelope window """
+        envelope = self._envelope.view()
+        bpm      = None
+
+        if len(envelope) > 2 * self._min_lag:
+            centred  = envelope - envelope.mean()
+            spectrum = np.fft.rfft(centred, self._nfft)
+            autocorr = np.fft.irfft(spectrum * np.conj(spectrum), self._nfft)
+
+            # Lags beyond the data (or beyond max_lag) cannot be estimated
+            max_lag  = min(self._max_lag, len(envelope) // 2)
+            if (autocorr[0] > 0) and (max_lag > self._min_lag + 1):
+                search = autocorr[self._min_lag:max_lag + 1]
+                lag    = self._min_lag + int(np.argmax(search))
+                self.confidence = float(autocorr[lag] / autocorr[0])
+
+                if (self.confidence >= MIN_CONFIDENCE) and (self._min_lag < lag < max_lag):
+                    # Parabolic interpolation through the peak
+                    left, centre, right = autocorr[lag - 1:lag + 2]
+                    shift = 0.5 * (left - right) / (left - 2 * centre + right)
+                    bpm   = 60.0 * self.env_fs / (lag + shift)
+
+        self.bpm        = bpm
+        self.estimates += 1
+        if self.on_update is not None:
+            self.on_update(bpm)
+
+        return bpm
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+    from hw_sim import HeartbeatSource
+
+    print("HeartRateEstimator Test")
+
+    fs = 4000
+    for true_bpm in (50, 72, 120, 170):
+        source    = HeartbeatSource(fs, bpm=true_bpm, noise=1500)
+        estimator = HeartRateEstimator(fs)
+        readings  = []
+        estimator.on_update = readings.append
+
+        start = time.perf_counter()
+        for i in range(int(20 * fs / 1024)):
+            estimator.push_block(source.read(1024))
+        elapsed = time.perf_counter() - start
+
+        assert abs(estimator.bpm - true_bpm) < 3, (true_bpm, readings)
+        print("    {0:3d} BPM: estimate {1:6.1f} BPM (confidence {2:.2f}), {3} updates, "
+              "{4:.0f} us per block".format(true_bpm, estimator.bpm, estimator.confidence,
+              len(readings), elapsed * 1e6 / (20 * fs / 1024)))
+
+    print("Test Complete")
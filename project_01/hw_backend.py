@@ -0,0 +1,127 @@
+"""
+--------------------------------------------------------------------------
+Hardware Backend Selection
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Hardware Backend Selection
+
+  Chooses between the real PocketBeagle libraries and the in-process simulator
+(hw_sim.py).  Scripts load their hardware modules through this file instead of
+importing Adafruit_BBIO / sounddevice / Adafruit_SSD1306 directly, so the same
+script runs on the board and on an ordinary Linux machine.
+
+  The backend is selected with the EDES301_BACKEND environment variable:
+    - "hardware" (default):  Adafruit_BBIO, sounddevice, Adafruit_SSD1306
+    - "sim":                 hw_sim.GPIO, hw_sim.sounddevice, hw_sim.Adafruit_SSD1306
+                             (see hw_sim.py for the EDES301_SIM_* settings)
+
+  Only the requested library is imported, so nothing heavy is loaded until it
+is needed.
+
+Software API:
+
+  SIMULATED
+    - True if the simulator backend is selected
+
+  load_gpio(), load_sounddevice(), load_ssd1306(), load_adc(), load_pwm()
+    - Return the module (or module-like simulator object) for the backend
+
+  SOUNDDEVICE_MODULE
+    - Name of the module load_sounddevice() imports (for warm-up imports)
+"""
+import os
+import importlib
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+BACKEND_HARDWARE            = "hardware"
+BACKEND_SIM                 = "sim"
+
+BACKEND                     = os.environ.get("EDES301_BACKEND", BACKEND_HARDWARE)
+
+if BACKEND not in (BACKEND_HARDWARE, BACKEND_SIM):
+    raise ValueError("EDES301_BACKEND must be '{0}' or '{1}', not '{2}'".format(
+                     BACKEND_HARDWARE, BACKEND_SIM, BACKEND))
+
+SIMULATED                   = (BACKEND == BACKEND_SIM)
+
+SOUNDDEVICE_MODULE          = "hw_sim" if SIMULATED else "sounddevice"
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def _load(hardware_module, sim_attribute):
+    """ Import the hardware module, or return the simulator's stand-in """
+    if SIMULATED:
+        return getattr(importlib.import_module("hw_sim"), sim_attribute)
+    return importlib.import_module(hardware_module)
+
+# End def
+
+
+def load_gpio():
+    """ Adafruit_BBIO.GPIO (or the simulated GPIO) """
+    return _load("Adafruit_BBIO.GPIO", "GPIO")
+
+# End def
+
+
+def load_sounddevice():
+    """ sounddevice (or the simulated audio input) """
+    return _load("sounddevice", "sounddevice")
+
+# End def
+
+
+def load_ssd1306():
+    """ Adafruit_SSD1306 (or the virtual display) """
+    return _load("Adafruit_SSD1306", "Adafruit_SSD1306")
+
+# End def
+
+
+def load_adc():
+    """ Adafruit_BBIO.ADC (or the simulated ADC) """
+    return _load("Adafruit_BBIO.ADC", "ADC")
+
+# End def
+
+
+def load_pwm():
+    """ Adafruit_BBIO.PWM (or the simulated PWM) """
+    return _load("Adafruit_BBIO.PWM", "PWM")
+
+# End def
@@ -0,0 +1,778 @@
+"""
+--------------------------------------------------------------------------
+Hardware Simulator
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Hardware Simulator
+
+  In-process stand-ins for the PocketBeagle hardware libraries so the
+stethoscope (and the other class projects) can run, be profiled and be
+benchmarked on an ordinary Linux machine.
+
+  - GPIO:             Replaces Adafruit_BBIO.GPIO.  Input pins follow a
+                      scripted button timeline (press time, hold time);
+                      wait_for_edge() and input() follow the script.
+  - sounddevice:      Replaces sounddevice.  InputStream runs the callback
+                      from a thread with blocks from a synthetic or WAV file
+                      audio source; rec() / wait() are also supported.
+  - Adafruit_SSD1306: Replaces the SSD1306 driver.  The virtual display
+                      decodes the same I2C command / data bytes as the real
+                      controller into a display RAM and records a frame every
+                      time a write window is completed.
+  - ADC / PWM:        Minimal Adafruit_BBIO.ADC / Adafruit_BBIO.PWM stand-ins.
+
+  All simulated time comes from one SimClock.  With rate > 1 the simulation
+runs faster than real time (audio blocks, button edges and sleeps are all
+scaled), which makes long recordings quick to benchmark.
+
+  The simulator is normally selected with environment variables (see
+hw_backend.py):
+    EDES301_BACKEND=sim
+    EDES301_SIM_PRESSES="1.0:3.0,8.0:5.0"  Press at 1 s for 3 s, at 8 s for 5 s
+    EDES301_SIM_AUDIO="heartbeat:72"       heartbeat:<bpm>, sine:<Hz>, noise or
+                                           the path of a 16-bit WAV file
+    EDES301_SIM_RATE=10                    Run 10x faster than real time
+    EDES301_SIM_XRUNS="2.0,2.5"            Drop the audio block at 2 s and at
+                                           2.5 s (input overflow)
+
+Software API:
+
+  configure(presses=None, audio=None, rate=None, end_action="interrupt", xruns=None)
+    - Reset the simulator with a new button script / audio source / rate
+    - xruns:      Simulated times at which an InputStream loses a block; the
+                  next callback reports input_overflow and its ADC time
+                  shows the gap, like a real overflow
+    - end_action: What wait_for_edge() does after the last scripted edge:
+                  "interrupt" raises KeyboardInterrupt (ends a script's main
+                  loop cleanly), "block" waits forever
+
+  make_source(spec, fs)
+    - Create an audio source from a "heartbeat:72" style string
+
+  HeartbeatSource(fs, bpm=72), SineSource(fs, freq), NoiseSource(fs),
+  WavSource(path)
+    read(frames)
+      - Return the next "frames" int16 samples
+"""
+import os
+import time
+import types
+import traceback
+import threading
+import collections
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH                        = 1
+LOW                         = 0
+IN                          = 0
+OUT                         = 1
+PUD_OFF                     = 0
+PUD_DOWN                    = 1
+PUD_UP                      = 2
+RISING                      = 1
+FALLING                     = 2
+BOTH                        = 3
+
+END_INTERRUPT               = "interrupt"
+END_BLOCK                   = "block"
+
+DEFAULT_PRESSES             = [(1.0, 3.0)]
+DEFAULT_AUDIO               = "heartbeat:72"
+DEFAULT_BLOCK_SIZE          = 1024
+FULL_SCALE                  = 32767
+
+# SSD1306 commands followed by argument bytes (all others have none)
+SSD1306_COMMAND_ARGS        = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1,
+                               0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+SSD1306_COLUMNADDR          = 0x21
+SSD1306_PAGEADDR            = 0x22
+SSD1306_DISPLAYON           = 0xAF
+SSD1306_DISPLAYOFF          = 0xAE
+SSD1306_I2C_ADDRESS         = 0x3C
+SSD1306_MAX_FRAMES          = 1000       # Frames kept by the virtual display
+
+
+# ------------------------------------------------------------------------
+# Clock
+# ------------------------------------------------------------------------
+
+class SimClock():
+    """ Simulated time; runs "rate" times faster than real time """
+
+    def __init__(self, rate=1.0):
+        self.rate   = float(rate)
+        self._start = time.monotonic()
+
+    def now(self):
+        """ Simulated seconds since the clock was created """
+        return (time.monotonic() - self._start) * self.rate
+
+    def sleep(self, seconds):
+        """ Sleep for a simulated duration """
+        if seconds > 0:
+            time.sleep(seconds / self.rate)
+
+    def sleep_until(self, sim_time):
+        """ Sleep until the simulated time is reached """
+        self.sleep(sim_time - self.now())
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Audio Sources
+# ------------------------------------------------------------------------
+
+class HeartbeatSource():
+    """ Synthetic "lub-dub" heart sounds with a little background noise """
+
+    def __init__(self, fs, bpm=72, amplitude=12000, noise=200, seed=0):
+        self.fs        = fs
+        self.bpm       = bpm
+        self.amplitude = amplitude
+        self.noise     = noise
+        self._position = 0
+        self._rng      = np.random.default_rng(seed)
+
+    def read(self, frames):
+        t      = (self._position + np.arange(frames)) / self.fs
+        phase  = np.mod(t, 60.0 / self.bpm)
+        s1     = np.exp(-((phase - 0.05) / 0.020) ** 2) * np.sin(2 * np.pi * 55 * t)
+        s2     = np.exp(-((phase - 0.35) / 0.015) ** 2) * np.sin(2 * np.pi * 80 * t) * 0.6
+        signal = self.amplitude * (s1 + s2) + self._rng.standard_normal(frames) * self.noise
+        self._position += frames
+        return np.clip(signal, -FULL_SCALE, FULL_SCALE).astype(np.int16)
+
+# End class
+
+
+class SineSource():
+    """ Constant sine tone """
+
+    def __init__(self, fs, freq=440.0, amplitude=10000):
+        self.fs        = fs
+        self.freq      = freq
+        self.amplitude = amplitude
+        self._position = 0
+
+    def read(self, frames):
+        t = (self._position + np.arange(frames)) / self.fs
+        self._position += frames
+        return (self.amplitude * np.sin(2 * np.pi * self.freq * t)).astype(np.int16)
+
+# End class
+
+
+class NoiseSource():
+    """ White noise """
+
+    def __init__(self, fs, amplitude=3000, seed=0):
+        self.fs        = fs
+        self.amplitude = amplitude
+        self._rng      = np.random.default_rng(seed)
+
+    def read(self, frames):
+        signal = self._rng.standard_normal(frames) * self.amplitude
+        return np.clip(signal, -FULL_SCALE, FULL_SCALE).astype(np.int16)
+
+# End class
+
+
+class WavSource():
+    """ Samples from a 16-bit WAV file (looped) """
+
+    def __init__(self, path, loop=True):
+        from recording_sink import open_recording
+        self.audio     = open_recording(path)
+        self.loop      = loop
+        self._position = 0
+        if self.audio.ndim > 1:
+            self.audio = self.audio[:, 0]
+        if len(self.audio) == 0:
+            raise ValueError("WAV file {0} has no audio".format(path))
+
+    def read(self, frames):
+        out = np.zeros(frames, dtype=np.int16)
+        filled = 0
+        while filled < frames:
+            if self._position >= len(self.audio):
+                if not self.loop:
+                    break
+                self._position = 0
+            count = min(frames - filled, len(self.audio) - self._position)
+            out[filled:filled + count] = self.audio[self._position:self._position + count]
+            filled         += count
+            self._position += count
+        return out
+
+# End class
+
+
+def make_source(spec, fs):
+    """ Create an audio source from a "kind:parameter" string or WAV path """
+    kind, _, arg = spec.partition(":")
+
+    if kind == "heartbeat":
+        return HeartbeatSource(fs, bpm=float(arg or 72))
+    elif kind == "sine":
+        return SineSource(fs, freq=float(arg or 440))
+    elif kind == "noise":
+        return NoiseSource(fs)
+    elif os.path.exists(spec):
+        return WavSource(spec)
+    else:
+        raise ValueError("Unknown simulated audio source: {0}".format(spec))
+
+# End def
+
+
+def parse_presses(spec):
+    """ Parse "press:hold,press:hold" (seconds) into a list of tuples """
+    presses = []
+    for item in spec.split(","):
+        if item.strip():
+            start, _, hold = item.partition(":")
+            presses.append((float(start), float(hold)))
+    return presses
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# GPIO
+# ------------------------------------------------------------------------
+
+class SimGPIO():
+    """ Adafruit_BBIO.GPIO stand-in with a scripted button timeline """
+
+    HIGH     = HIGH
+    LOW      = LOW
+    IN       = IN
+    OUT      = OUT
+    PUD_OFF  = PUD_OFF
+    PUD_DOWN = PUD_DOWN
+    PUD_UP   = PUD_UP
+    RISING   = RISING
+    FALLING  = FALLING
+    BOTH     = BOTH
+
+    def __init__(self, simulator):
+        self._sim     = simulator
+        self._pins    = {}         # pin -> (direction, pull)
+        self._outputs = {}         # pin -> last output value
+        self.edges_waited = 0
+
+    def setup(self, pin, direction, pull_up_down=PUD_OFF, initial=None, delay=None):
+        self._pins[pin] = (direction, pull_up_down)
+        if direction == OUT:
+            self._outputs[pin] = LOW if initial is None else initial
+
+    def _pressed(self, t):
+        return any(start <= t < start + hold for start, hold in self._sim.presses)
+
+    def _level(self, pin, t):
+        direction, pull = self._pins.get(pin, (IN, PUD_UP))
+        if direction == OUT:
+            return self._outputs.get(pin, LOW)
+        # Buttons connect the pin to ground when the pull-up is used
+        idle = LOW if pull == PUD_DOWN else HIGH
+        return (1 - idle) if self._pressed(t) else idle
+
+    def input(self, pin):
+        return self._level(pin, self._sim.clock.now())
+
+    def output(self, pin, value):
+        self._outputs[pin] = value
+
+    def _edges(self, pin):
+        """ (time, new level) of every scripted edge on the pin """
+        direction, pull = self._pins.get(pin, (IN, PUD_UP))
+        press = HIGH if pull == PUD_DOWN else LOW
+        edges = []
+        for start, hold in sorted(self._sim.presses):
+            edges.append((start, press))
+            edges.append((start + hold, 1 - press))
+        return edges
+
+    def wait_for_edge(self, pin, edge, timeout=-1):
+        """ Block until the next scripted edge of the requested type """
+        now = self._sim.clock.now()
+        self.edges_waited += 1
+
+        for t, level in self._edges(pin):
+            if (t > now) and ((edge == BOTH) or ((edge == RISING) == (level == HIGH))):
+                if (timeout is not None) and (timeout >= 0) and (t - now > timeout / 1000.0):
+                    self._sim.clock.sleep(timeout / 1000.0)
+                    return None
+                self._sim.clock.sleep_until(t)
+                return pin
+
+        # No more scripted edges
+        if self._sim.end_action == END_INTERRUPT:
+            raise KeyboardInterrupt("Simulated button script finished")
+        while True:
+            time.sleep(3600)
+
+    def cleanup(self, pin=None):
+        if pin is None:
+            self._pins.clear()
+        else:
+            self._pins.pop(pin, None)
+
+# End class
+
+
+class SimADC():
+    """ Adafruit_BBIO.ADC stand-in; values come from a function of time """
+
+    def __init__(self, simulator):
+        self._sim  = simulator
+        self.value = lambda pin, t: 0.5
+
+    def setup(self):
+        pass
+
+    def read(self, pin):
+        return float(self.value(pin, self._sim.clock.now()))
+
+    def read_raw(self, pin):
+        return self.read(pin) * 4095.0
+
+# End class
+
+
+class SimPWM():
+    """ Adafruit_BBIO.PWM stand-in that records duty cycles """
+
+    def __init__(self, simulator):
+        self._sim = simulator
+        self.duty = {}
+
+    def start(self, pin, duty_cycle=0.0, frequency=2000, polarity=0):
+        self.duty[pin] = duty_cycle
+
+    def set_duty_cycle(self, pin, duty_cycle):
+        self.duty[pin] = duty_cycle
+
+    def set_frequency(self, pin, frequency):
+        pass
+
+    def stop(self, pin):
+        self.duty.pop(pin, None)
+
+    def cleanup(self):
+        self.duty.clear()
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Audio (sounddevice)
+# ------------------------------------------------------------------------
+
+class SimCallbackFlags():
+    """ Stand-in for sounddevice.CallbackFlags """
+
+    def __init__(self, input_overflow=False, input_underflow=False):
+        self.input_overflow  = input_overflow
+        self.input_underflow = input_underflow
+
+    def __bool__(self):
+        return self.input_overflow or self.input_underflow
+
+    def __repr__(self):
+        flags = [name for name in ("input_overflow", "input_underflow") if getattr(self, name)]
+        return "<SimCallbackFlags: {0}>".format(" | ".join(flags) or "none")
+
+# End class
+
+
+class SimInputStream():
+    """ sounddevice.InputStream stand-in driven by the simulator's audio source """
+
+    def __init__(self, samplerate=None, blocksize=None, device=None, channels=1,
+                       dtype='int16', callback=None, **kwargs):
+        self._sim       = _simulator()
+        self.samplerate = samplerate or 44100
+        self.blocksize  = blocksize or DEFAULT_BLOCK_SIZE
+        self.channels   = channels
+        self.dtype      = dtype
+        self.callback   = callback
+        self.active     = False
+        self._source    = self._sim.audio_source(self.samplerate)
+        self._thread    = None
+        self._stop      = threading.Event()
+
+    def _run(self):
+        clock    = self._sim.clock
+        period   = self.blocksize / self.samplerate
+        start    = clock.now()
+        count    = 0
+        xruns    = [t for t in self._sim.xruns if t >= start]
+        overflow = False
+
+        while not self._stop.is_set():
+            count += 1
+            clock.sleep_until(start + count * period)
+            if self._stop.is_set():
+                break
+
+            block    = self._source.read(self.blocksize)
+            adc_time = start + (count - 1) * period
+
+            # Scripted overflow: this block is lost, the next one reports it
+            if xruns and (adc_time + period > xruns[0]):
+                while xruns and (adc_time + period > xruns[0]):
+                    xruns.pop(0)
+                overflow = True
+                continue
+
+            indata    = np.repeat(block[:, None], self.channels, axis=1).astype(self.dtype)
+            time_info = types.SimpleNamespace(inputBufferAdcTime=adc_time, currentTime=clock.now())
+            try:
+                self.callback(indata, self.blocksize, time_info, SimCallbackFlags(input_overflow=overflow))
+            except Exception:
+                # Like PortAudio: print the traceback and abort the stream
+                traceback.print_exc()
+                self.active = False
+                break
+            overflow = False
+
+    def start(self):
+        self._stop.clear()
+        self.active  = True
+        self._thread = threading.Thread(target=self._run, name="sim-audio", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.active = False
+
+    def close(self):
+        self.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+# End class
+
+
+class SimSoundDevice():
+    """ Module-like stand-in for sounddevice """
+
+    InputStream   = SimInputStream
+    CallbackFlags = SimCallbackFlags
+
+    def __init__(self, simulator):
+        self._sim      = simulator
+        self._deadline = None
+
+    def rec(self, frames, samplerate=None, channels=1, dtype='int16', device=None, **kwargs):
+        """ Record "frames" samples; call wait() for the recording time to pass """
+        samplerate = samplerate or 44100
+        block      = self._sim.audio_source(samplerate).read(int(frames))
+        self._deadline = self._sim.clock.now() + frames / samplerate
+        return np.repeat(block[:, None], channels, axis=1).astype(dtype)
+
+    def wait(self):
+        if self._deadline is not None:
+            self._sim.clock.sleep_until(self._deadline)
+            self._deadline = None
+
+    def query_devices(self, *args, **kwargs):
+        return [{"name": "Simulated microphone", "max_input_channels": 1}]
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# SSD1306 Display
+# ------------------------------------------------------------------------
+
+class SimI2CDevice():
+    """ Adafruit_GPIO.I2C device stand-in feeding the virtual display """
+
+    def __init__(self, display):
+        self._display     = display
+        self.transactions = 0
+        self.bytes        = 0
+
+    def write8(self, register, value):
+        self.writeList(register, [value])
+
+    def writeList(self, register, data):
+        self.transactions += 1
+        self.bytes        += 1 + len(data)
+        if register == 0x40:
+            self._display._write_ram(data)
+        else:
+            for value in data:
+                self._display._write_command(value)
+
+# End class
+
+
+class SimSSD1306():
+    """ Virtual SSD1306 display that decodes I2C traffic and records frames """
+
+    def __init__(self, width, height, rst=None, i2c_bus=None, i2c_address=SSD1306_I2C_ADDRESS, **kwargs):
+        self._sim    = _simulator()
+        self.width   = width
+        self.height  = height
+        self._pages  = height // 8
+        self._buffer = [0] * (width * self._pages)
+        self._i2c    = SimI2CDevice(self)
+
+        self.ram     = bytearray(width * self._pages)
+        self.frames  = collections.deque(maxlen=SSD1306_MAX_FRAMES)   # (sim time, page bytes)
+        self.frames_completed = 0
+        self.on      = False
+
+        self._pending = []         # Command being assembled (with arguments)
+        self._columns = (0, width - 1)
+        self._window  = (0, self._pages - 1)
+        self._column  = 0
+        self._page    = 0
+
+    # --- Controller emulation ---
+
+    def _write_command(self, value):
+        self._pending.append(value)
+        command = self._pending[0]
+        if len(self._pending) <= SSD1306_COMMAND_ARGS.get(command, 0):
+            return
+
+        if command == SSD1306_COLUMNADDR:
+            self._columns = (self._pending[1], self._pending[2])
+            self._column  = self._pending[1]
+        elif command == SSD1306_PAGEADDR:
+            self._window = (self._pending[1], self._pending[2])
+            self._page   = self._pending[1]
+        elif command == SSD1306_DISPLAYON:
+            self.on = True
+        elif command == SSD1306_DISPLAYOFF:
+            self.on = False
+        self._pending = []
+
+    def _write_ram(self, data):
+        for value in data:
+            self.ram[self._page * self.width + self._column] = value
+            self._column += 1
+            if self._column > self._columns[1]:
+                self._column = self._columns[0]
+                self._page  += 1
+                if self._page > self._window[1]:
+                    self._page = self._window[0]
+                    self.frames.append((self._sim.clock.now(), bytes(self.ram)))
+                    self.frames_completed += 1
+
+    # --- Adafruit_SSD1306 API ---
+
+    def begin(self, vccstate=None):
+        for command in (0xAE, 0xD5, 0x80, 0xA8, self.height - 1, 0xD3, 0x00, 0x40,
+                        0x8D, 0x14, 0x20, 0x00, 0xA1, 0xC8, 0xAF):
+            self.command(command)
+
+    def command(self, c):
+        self._i2c.write8(0x00, c)
+
+    def data(self, c):
+        self._i2c.write8(0x40, c)
+
+    def display(self):
+        for command in (SSD1306_COLUMNADDR, 0, self.width - 1, SSD1306_PAGEADDR, 0, self._pages - 1):
+            self.command(command)
+        for i in range(0, len(self._buffer), 16):
+            self._i2c.writeList(0x40, self._buffer[i:i + 16])
+
+    def image(self, image):
+        from PIL import Image
+        if (image.mode != '1') or (image.size != (self.width, self.height)):
+            raise ValueError("Image must be mode '1' and {0}x{1}".format(self.width, self.height))
+        self._buffer = list(b"".join(
+            image.crop((0, page * 8, self.width, page * 8 + 8)).transpose(Image.ROTATE_270).tobytes()
+            for page in range(self._pages)))
+
+    def clear(self):
+        self._buffer = [0] * (self.width * self._pages)
+
+    def set_contrast(self, contrast):
+        self.command(0x81)
+        self.command(contrast)
+
+    def dim(self, dim):
+        self.set_contrast(0 if dim else 0xCF)
+
+    # --- Inspection ---
+
+    def frame_array(self, index=-1):
+        """ Return a recorded frame as a (height, width) boolean array """
+        pages = np.frombuffer(self.frames[index][1], dtype=np.uint8).reshape(self._pages, self.width)
+        bits  = np.unpackbits(pages[:, :, None], axis=2, bitorder='little')
+        return bits.transpose(0, 2, 1).reshape(self.height, self.width).astype(bool)
+
+    def save_frame(self, path, index=-1):
+        """ Save a recorded frame as a PNG """
+        from PIL import Image
+        Image.fromarray(self.frame_array(index).astype(np.uint8) * 255).save(path)
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Simulator
+# ------------------------------------------------------------------------
+
+class Simulator():
+    """ Shared state of the simulated hardware """
+
+    def __init__(self, presses=None, audio=None, rate=None, end_action=END_INTERRUPT, xruns=None):
+        if presses is None:
+            presses = parse_presses(os.environ["EDES301_SIM_PRESSES"]) \
+                      if "EDES301_SIM_PRESSES" in os.environ else DEFAULT_PRESSES
+        if audio is None:
+            audio = os.environ.get("EDES301_SIM_AUDIO", DEFAULT_AUDIO)
+        if rate is None:
+            rate = float(os.environ.get("EDES301_SIM_RATE", "1"))
+        if xruns is None:
+            xruns = [float(t) for t in os.environ.get("EDES301_SIM_XRUNS", "").split(",") if t.strip()]
+
+        self.presses    = list(presses)
+        self.xruns      = sorted(xruns)
+        self.audio      = audio
+        self.end_action = end_action
+        self.clock      = SimClock(rate)
+
+    def audio_source(self, fs):
+        """ New audio source; "audio" may be a spec string or a source factory """
+        if callable(self.audio):
+            return self.audio(fs)
+        return make_source(self.audio, fs)
+
+# End class
+
+
+_SIMULATOR = None
+
+
+def _simulator():
+    global _SIMULATOR
+    if _SIMULATOR is None:
+        _SIMULATOR = Simulator()
+    return _SIMULATOR
+
+# End def
+
+
+def configure(presses=None, audio=None, rate=None, end_action=END_INTERRUPT, xruns=None):
+    """ Reset the simulator (restarts the simulated clock) """
+    global _SIMULATOR
+    _SIMULATOR = Simulator(presses, audio, rate, end_action, xruns)
+    GPIO._sim        = _SIMULATOR
+    ADC._sim         = _SIMULATOR
+    PWM._sim         = _SIMULATOR
+    sounddevice._sim = _SIMULATOR
+    return _SIMULATOR
+
+# End def
+
+
+def clock():
+    """ The simulated clock """
+    return _simulator().clock
+
+# End def
+
+
+class _LazySimulator():
+    """ Resolves the shared simulator on first use (after any configure()) """
+    def __getattr__(self, name):
+        return getattr(_simulator(), name)
+
+
+GPIO             = SimGPIO(_LazySimulator())
+ADC              = SimADC(_LazySimulator())
+PWM              = SimPWM(_LazySimulator())
+sounddevice      = SimSoundDevice(_LazySimulator())
+Adafruit_SSD1306 = types.SimpleNamespace(
+    SSD1306_128_64 = lambda **kwargs: SimSSD1306(128, 64, **kwargs),
+    SSD1306_128_32 = lambda **kwargs: SimSSD1306(128, 32, **kwargs),
+)
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Hardware Simulator Test")
+
+    configure(presses=[(0.5, 2.0)], audio="heartbeat:60", rate=10)
+
+    GPIO.setup("P1_36", GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    blocks = []
+
+    GPIO.wait_for_edge("P1_36", GPIO.FALLING)
+    print("    Pressed at {0:.2f} s (simulated)".format(clock().now()))
+
+    stream = sounddevice.InputStream(samplerate=44100, channels=1, dtype='int16',
+                                     callback=lambda indata, frames, t, status: blocks.append(indata.copy()))
+    stream.start()
+    GPIO.wait_for_edge("P1_36", GPIO.RISING)
+    stream.stop()
+    print("    Released at {0:.2f} s, {1} blocks captured".format(clock().now(), len(blocks)))
+
+    disp = Adafruit_SSD1306.SSD1306_128_64(rst=None, i2c_bus=1)
+    disp.begin()
+    disp.clear()
+    disp.display()
+    print("    Display frames = {0}, I2C bytes = {1}".format(disp.frames_completed, disp._i2c.bytes))
+
+    try:
+        GPIO.wait_for_edge("P1_36", GPIO.FALLING)
+    except KeyboardInterrupt:
+        print("    Button script finished")
+
+    print("Test Complete")
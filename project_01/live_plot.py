@@ -0,0 +1,203 @@
+"""
+--------------------------------------------------------------------------
+Live Waveform Plot
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Live Waveform Plot
+
+  Persistent matplotlib renderer for the live waveform.  Instead of creating a
+new figure for every block, one figure / axes / line artist is created up front
+and only the line data is updated:
+
+  - The axes limits are fixed when the plot is created, so the background
+    (axes, ticks, labels) is drawn once and cached with copy_from_bbox().
+  - Each update restores the cached background, draws just the line artist
+    (blitting) and leaves the result in the Agg canvas buffer.
+  - The canvas buffer is encoded to PNG at most "max_save_rate" times per
+    second; updates in between only touch the in-memory canvas.
+
+Software API:
+
+  LiveWaveformPlot(output_file, num_samples, max_save_rate=1.0,
+                   figsize=(10, 4), dpi=100, ylim=(-32768, 32767))
+    - output_file:   PNG file written by the plot
+    - num_samples:   Width of the x axis in samples (e.g. session length)
+    - max_save_rate: Maximum PNG writes per second (None = every update)
+
+    update(samples)
+      - Replace the line data with "samples" and redraw.  Samples are reduced
+        to min/max pairs per pixel column of the axes before drawing.
+        Returns True if the PNG was written.
+
+    save()
+      - Force the PNG to be written (e.g. at the end of a session)
+
+    close()
+      - Release the figure
+"""
+import time
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Non-GUI backend
+import matplotlib.image
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import metrics
+from decimate import minmax_envelope
+
+
+# ------------------------------------------------------------------------
+# Live Waveform Plot Class
+# ------------------------------------------------------------------------
+
+class LiveWaveformPlot():
+    """ Single figure waveform plot with incremental redraw """
+
+    def __init__(self, output_file, num_samples, max_save_rate=1.0,
+                       figsize=(10, 4), dpi=100, ylim=(-32768, 32767),
+                       title="Live Audio Waveform"):
+        """ Create the figure and cache its background """
+        self.output_file   = output_file
+        self.num_samples   = num_samples
+        self.max_save_rate = max_save_rate
+        self.frames_drawn  = 0
+        self.frames_saved  = 0
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.axes   = self.figure.add_subplot(1, 1, 1)
+
+        self.axes.set_title(title)
+        self.axes.set_xlabel("Sample Number")
+        self.axes.set_ylabel("Amplitude")
+        self.axes.set_xlim(0, num_samples)
+        self.axes.set_ylim(*ylim)
+        self.figure.tight_layout()
+
+        self.line, = self.axes.plot([], [], color='blue', animated=True)
+
+        # Draw everything except the (animated) line once and cache it
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.axes.bbox)
+        self._axes_width = max(1, int(self.axes.bbox.width))
+        self._last_save  = None
+
+    # End def
+
+    def update(self, samples, x=None):
+        """ Redraw the line with new data; save the PNG if it is due """
+        if x is None:
+            # Only as many points as the data spans in pixel columns
+            columns = max(1, int(self._axes_width * len(samples) / self.num_samples))
+            x, samples = minmax_envelope(samples, columns)
+
+        with metrics.span("plot"):
+            self.line.set_data(x, samples)
+
+            self.canvas.restore_region(self._background)
+            self.axes.draw_artist(self.line)
+            self.canvas.blit(self.axes.bbox)
+            self.frames_drawn += 1
+
+        now = time.monotonic()
+        if (self.max_save_rate is None) or (self._last_save is None) or \
+           (now - self._last_save >= 1.0 / self.max_save_rate):
+            self.save()
+            return True
+
+        return False
+
+    # End def
+
+    def save(self):
+        """ Encode the current canvas buffer to the output PNG """
+        with metrics.span("savefig"):
+            matplotlib.image.imsave(self.output_file, np.asarray(self.canvas.buffer_rgba()))
+        self._last_save    = time.monotonic()
+        self.frames_saved += 1
+
+    # End def
+
+    def close(self):
+        """ Release the figure """
+        self.figure.clear()
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    import matplotlib.pyplot as plt
+
+    print("LiveWaveformPlot Benchmark")
+
+    fs         = 44100
+    block_size = 2048
+    frames     = 40
+    rng        = np.random.default_rng(0)
+    audio      = (rng.standard_normal(frames * block_size) * 3000).astype(np.int16)
+    out_dir    = tempfile.mkdtemp()
+
+    # Before: new figure, full re-plot, tight_layout and savefig per block
+    output_file = os.path.join(out_dir, "naive.png")
+    start = time.perf_counter()
+    for i in range(1, frames + 1):
+        plt.figure(figsize=(10, 4))
+        plt.plot(audio[:i * block_size], color='blue')
+        plt.title("Live Audio Waveform")
+        plt.xlabel("Sample Number")
+        plt.ylabel("Amplitude")
+        plt.tight_layout()
+        plt.savefig(output_file)
+        plt.close()
+    naive_fps = frames / (time.perf_counter() - start)
+
+    # After: persistent figure, blitting, PNG at most once per second
+    plot  = LiveWaveformPlot(os.path.join(out_dir, "live.png"), len(audio))
+    start = time.perf_counter()
+    for i in range(1, frames + 1):
+        plot.update(audio[:i * block_size])
+    plot.save()
+    live_fps = frames / (time.perf_counter() - start)
+    plot.close()
+
+    print("    Before: {0:6.1f} frames/s".format(naive_fps))
+    print("    After:  {0:6.1f} frames/s ({1} PNG writes)".format(live_fps, plot.frames_saved))
+    print("    Real time requires {0:.1f} frames/s".format(fs / block_size))
@@ -0,0 +1,287 @@
+"""
+--------------------------------------------------------------------------
+Live Level View
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Live Level View
+
+  Scrolling waveform and level meter shown on the SSD1306 while a recording
+is in progress.
+
+  The audio callback calls push_block() for every block.  It only computes the
+block's peak and RMS level and stores them in preallocated arrays (one display
+column per block), which takes a few microseconds.  A separate display thread
+redraws the 128x64 framebuffer and sends it over I2C at a capped frame rate,
+so a slow display update never delays the audio callback.
+
+Screen layout:
+  - Rows 0-5:   Level meter.  The bar shows the RMS of the newest block and a
+                one pixel marker shows its peak.
+  - Rows 8-63:  Scrolling waveform; one column per block, newest on the right.
+                Each column is a bar of +/- the block's peak.
+  - Text:       An optional label (e.g. the heart rate) in the top left
+                corner of the waveform area, on a black background.  The
+                label is only re-drawn with PIL when its text changes.
+
+Software API:
+
+  LiveLevelView(disp, fps=10, full_scale=None)
+    - disp:       Adafruit_SSD1306 display or OLEDDisplay wrapper
+    - fps:        Maximum display updates per second
+    - full_scale: Amplitude mapped to a full height bar
+                  (None = scale to the loudest block seen so far)
+
+    start() / stop()
+      - Start / stop the display thread.  stop() waits for the thread, so
+        the display is free to use as soon as it returns.
+
+    push_block(block)
+      - Add one block of audio (call from the audio callback)
+
+    set_text(text)
+      - Show a short label over the waveform ("" for none; any thread)
+
+    render()
+      - Return the current (height, width) boolean framebuffer
+"""
+import time
+import threading
+
+import numpy as np
+
+from oled_raster import OLED_WIDTH, OLED_HEIGHT, show_framebuffer
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+METER_ROWS                  = 6          # Height of the level meter
+WAVE_TOP                    = 8          # First row of the scrolling waveform
+MIN_FULL_SCALE              = 1000       # Smallest auto-scale amplitude (keeps silence quiet)
+
+
+# ------------------------------------------------------------------------
+# Live Level View Class
+# ------------------------------------------------------------------------
+
+class LiveLevelView():
+    """ Scrolling waveform and level meter updated from the audio callback """
+
+    def __init__(self, disp, fps=10, full_scale=None, width=OLED_WIDTH, height=OLED_HEIGHT):
+        """ Initialize variables and preallocate the column history """
+        self.disp       = disp
+        self.fps        = fps
+        self.full_scale = full_scale
+        self.width      = width
+        self.height     = height
+
+        self.frames_shown = 0
+
+        self._peaks     = np.zeros(width, dtype=np.float32)
+        self._rms       = np.zeros(width, dtype=np.float32)
+        self._count     = 0            # Blocks pushed (only written by the audio callback)
+        self._max_peak  = 0.0
+        self._rows      = np.arange(height)[:, None]
+        self._text      = ""
+        self._changed   = False
+        self._label     = ("", None)   # (text, boolean bitmap) drawn by the display thread
+        self._stop      = threading.Event()
+        self._thread    = None
+
+    # End def
+
+    def push_block(self, block):
+        """ Record the peak / RMS level of one block (audio callback) """
+        samples = block.reshape(-1)
+        if len(samples) == 0:
+            return
+
+        peak = float(max(int(samples.max()), -int(samples.min())))
+        rms  = float(np.sqrt(np.mean(np.square(samples, dtype=np.float32))))
+
+        column = self._count % self.width
+        self._peaks[column] = peak
+        self._rms[column]   = rms
+        self._max_peak      = max(self._max_peak, peak)
+        self._count        += 1
+
+    # End def
+
+    def _scale(self):
+        if self.full_scale is not None:
+            return float(self.full_scale)
+        return max(self._max_peak, MIN_FULL_SCALE)
+
+    # End def
+
+    def render(self):
+        """ Return the current framebuffer """
+        count       = self._count
+        scale       = self._scale()
+        framebuffer = np.zeros((self.height, self.width), dtype=bool)
+
+        if count == 0:
+            return framebuffer
+
+        # Columns oldest -> newest, right aligned until the screen has filled
+        shown = min(count, self.width)
+        order = (np.arange(count - shown, count)) % self.width
+        peaks = np.zeros(self.width, dtype=np.float32)
+        peaks[self.width - shown:] = self._peaks[order]
+
+        # Scrolling waveform: bar of +/- peak around the centre row
+        centre = (WAVE_TOP + self.height - 1) / 2.0
+        half   = np.minimum(peaks / scale, 1.0) * (self.height - 1 - WAVE_TOP) / 2.0
+        top    = np.rint(centre - half)[None, :]
+        bottom = np.rint(centre + half)[None, :]
+        framebuffer[:] = (self._rows >= top) & (self._rows <= bottom)
+        framebuffer[:WAVE_TOP, :] = False
+        framebuffer[int(round(centre)), self.width - shown:] = True
+
+        # Level meter for the newest block
+        newest = (count - 1) % self.width
+        level  = int(round(min(self._rms[newest] / scale, 1.0) * (self.width - 1)))
+        marker = int(round(min(self._peaks[newest] / scale, 1.0) * (self.width - 1)))
+        framebuffer[:METER_ROWS, :level + 1] = True
+        framebuffer[:METER_ROWS, marker]     = True
+
+        # Label on a black background
+        bitmap = self._label_bitmap(self._text)
+        if bitmap is not None:
+            rows, columns = bitmap.shape
+            framebuffer[WAVE_TOP:WAVE_TOP + rows + 1, :columns + 1] = False
+            framebuffer[WAVE_TOP:WAVE_TOP + rows, :columns] = bitmap
+
+        return framebuffer
+
+    # End def
+
+    def set_text(self, text):
+        """ Show a short label over the waveform ("" for none) """
+        self._text    = text
+        self._changed = True
+
+    # End def
+
+    def _label_bitmap(self, text):
+        """ Boolean bitmap of the label text (cached until the text changes) """
+        if not text:
+            return None
+        if self._label[0] == text:
+            return self._label[1]
+
+        from PIL import Image, ImageDraw, ImageFont
+
+        font    = ImageFont.load_default()
+        box     = ImageDraw.Draw(Image.new('1', (1, 1))).textbbox((0, 0), text, font=font)
+        image   = Image.new('1', (min(box[2], self.width - 1), min(box[3], self.height - WAVE_TOP - 1)))
+        ImageDraw.Draw(image).text((0, 0), text, font=font, fill=255)
+        bitmap  = np.array(image, dtype=bool)
+
+        self._label = (text, bitmap)
+        return bitmap
+
+    # End def
+
+    def _run(self):
+        """ Display thread: redraw at most fps times per second """
+        period     = 1.0 / self.fps
+        last_count = -1
+
+        while not self._stop.is_set():
+            start = time.monotonic()
+
+            if (self._count != last_count) or self._changed:
+                last_count    = self._count
+                self._changed = False
+                show_framebuffer(self.disp, self.render())
+                self.frames_shown += 1
+
+            self._stop.wait(max(0.0, period - (time.monotonic() - start)))
+
+    # End def
+
+    def start(self):
+        """ Reset the history and start the display thread """
+        self._peaks[:]  = 0
+        self._rms[:]    = 0
+        self._count     = 0
+        self._max_peak  = 0.0
+        self._text      = ""
+        self._changed   = True
+        self._stop.clear()
+
+        self._thread = threading.Thread(target=self._run, name="live-view", daemon=True)
+        self._thread.start()
+
+    # End def
+
+    def stop(self):
+        """ Stop the display thread and wait for it to finish """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("LiveLevelView Test")
+
+    view = LiveLevelView(disp=None)
+    rng  = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    for i in range(200):
+        view.push_block((rng.standard_normal(2048) * 1000 * (1 + i % 20)).astype(np.int16))
+    push_time = (time.perf_counter() - start) / 200
+
+    view.set_text("72 BPM")
+    view.render()                    # First render draws the label bitmap
+
+    start       = time.perf_counter()
+    framebuffer = view.render()
+    render_time = time.perf_counter() - start
+
+    for row in framebuffer[::2]:
+        print("    " + "".join("#" if pixel else "." for pixel in row[::2]))
+
+    print("    push_block(): {0:.1f} us/block, render(): {1:.2f} ms".format(push_time * 1e6, render_time * 1e3))
+    print("Test Complete")
@@ -0,0 +1,371 @@
+"""
+--------------------------------------------------------------------------
+Metrics
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Metrics
+
+  Lightweight timing and counter instrumentation for the stethoscope scripts.
+
+  - span(name):      Context manager that times a named stage
+                     (capture, concat, plot, savefig, raster, i2c_push, ...)
+  - count(name, n):  Add n to a named counter
+                     (blocks_captured, input_overflows, bytes_written, ...)
+
+  Metrics are disabled by default.  When disabled, span() returns a shared
+no-op context manager and count() returns after one flag check, so the calls
+can stay in the code (including the audio callback) at near-zero cost.
+
+  When enabled, each span keeps its count, total, maximum and its most recent
+durations (for percentiles), the CPU time of the thread that ran it, and how
+much the process' peak memory (ru_maxrss) grew while it ran.  The summary also
+includes the current peak memory of the process.  Metrics are reported either:
+    - to stdout:  a summary table when report() is called / at exit, or
+    - to a file:  one JSON line per "interval" seconds appended by a
+                  background thread; the file is rotated (to <path>.1) when it
+                  grows past max_bytes, so it can be left running in the field.
+
+  Enable from the environment (read at import):
+    EDES301_METRICS=stdout                   Summary to stdout at exit
+    EDES301_METRICS=/path/to/metrics.jsonl   Rolling metrics file
+    EDES301_METRICS_INTERVAL=10              Seconds between file records
+
+Software API:
+
+  enable(path=None, interval=10.0, max_bytes=1000000)
+  disable()
+  span(name)
+  count(name, n=1)
+  summary()
+    - Return the current metrics as a dict
+  report()
+    - Print the summary table
+  flush()
+    - Append one record to the metrics file now
+"""
+import os
+import sys
+import json
+import time
+import resource
+import atexit
+import threading
+import collections
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+RECENT_SAMPLES              = 256        # Durations kept per span for percentiles
+DEFAULT_INTERVAL            = 10.0
+DEFAULT_MAX_BYTES           = 1000000
+
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+enabled     = False
+
+_lock       = threading.Lock()
+_spans      = {}                         # name -> _SpanStats
+_counters   = collections.defaultdict(int)
+_path       = None
+_interval   = DEFAULT_INTERVAL
+_max_bytes  = DEFAULT_MAX_BYTES
+_flusher    = None
+_stop       = threading.Event()
+_started    = time.time()
+
+
+# ------------------------------------------------------------------------
+# Classes
+# ------------------------------------------------------------------------
+
+class _NullSpan():
+    """ Shared no-op span used while metrics are disabled """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+# End class
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _maxrss_kb():
+    """ Peak resident memory of the process so far (kB on Linux) """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+# End def
+
+
+class _SpanStats():
+    """ Running statistics for one span name """
+
+    def __init__(self):
+        self.count      = 0
+        self.total      = 0.0
+        self.max        = 0.0
+        self.cpu_total  = 0.0
+        self.rss_growth = 0                  # kB the peak memory grew inside this span
+        self.rss_max    = 0                  # Largest growth in one execution (kB)
+        self.recent     = collections.deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, seconds, cpu_seconds, rss_growth_kb):
+        self.count      += 1
+        self.total      += seconds
+        self.max         = max(self.max, seconds)
+        self.cpu_total  += cpu_seconds
+        self.rss_growth += rss_growth_kb
+        self.rss_max     = max(self.rss_max, rss_growth_kb)
+        self.recent.append(seconds)
+
+    def as_dict(self):
+        recent = sorted(self.recent)
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(p / 100.0 * len(recent)))] * 1000.0
+        return {
+            "count":                self.count,
+            "total_ms":             self.total * 1000.0,
+            "mean_ms":              self.total * 1000.0 / self.count,
+            "p50_ms":               percentile(50),
+            "p90_ms":               percentile(90),
+            "max_ms":               self.max * 1000.0,
+            "cpu_mean_ms":          self.cpu_total * 1000.0 / self.count,
+            "maxrss_growth_kb":     self.rss_growth,
+            "maxrss_growth_max_kb": self.rss_max,
+        }
+
+# End class
+
+
+class _Span():
+    """ Times one execution of a named stage """
+
+    __slots__ = ("name", "start", "cpu_start", "rss_start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.rss_start = _maxrss_kb()
+        self.cpu_start = time.thread_time()
+        self.start     = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        seconds = time.perf_counter() - self.start
+        cpu     = time.thread_time() - self.cpu_start
+        growth  = _maxrss_kb() - self.rss_start
+        with _lock:
+            stats = _spans.get(self.name)
+            if stats is None:
+                stats = _spans[self.name] = _SpanStats()
+            stats.add(seconds, cpu, growth)
+        return False
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def span(name):
+    """ Context manager timing the named stage """
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+# End def
+
+
+def count(name, n=1):
+    """ Add n to the named counter """
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] += n
+
+# End def
+
+
+def summary():
+    """ Return the current metrics as a dict """
+    with _lock:
+        return {
+            "time":      time.time(),
+            "uptime_s":  time.time() - _started,
+            "maxrss_kb": _maxrss_kb(),
+            "spans":     {name: stats.as_dict() for name, stats in _spans.items()},
+            "counters":  dict(_counters),
+        }
+
+# End def
+
+
+def report(file=None):
+    """ Print the metrics summary table """
+    data = summary()
+    file = file or sys.stdout
+
+    print("Metrics ({0:.0f} s, peak memory {1:.1f} MB):".format(data["uptime_s"], data["maxrss_kb"] / 1024.0), file=file)
+    for name, stats in sorted(data["spans"].items()):
+        print("    {0:<20s} n={1:<6d} mean {2:9.2f} ms  p50 {3:9.2f} ms  p90 {4:9.2f} ms  max {5:9.2f} ms  cpu {6:9.2f} ms  peak mem +{7} kB".format(
+              name, stats["count"], stats["mean_ms"], stats["p50_ms"], stats["p90_ms"], stats["max_ms"],
+              stats["cpu_mean_ms"], stats["maxrss_growth_kb"]), file=file)
+    for name, value in sorted(data["counters"].items()):
+        print("    {0:<20s} {1}".format(name, value), file=file)
+
+# End def
+
+
+def flush():
+    """ Append one JSON record to the metrics file (rotating it if too big) """
+    if _path is None:
+        return
+
+    line = json.dumps(summary()) + "\n"
+
+    try:
+        if os.path.exists(_path) and (os.path.getsize(_path) + len(line) > _max_bytes):
+            os.replace(_path, _path + ".1")
+        with open(_path, "a") as f:
+            f.write(line)
+    except OSError as e:
+        print("Metrics: could not write {0}: {1}".format(_path, e), file=sys.stderr)
+
+# End def
+
+
+def _flush_loop():
+    while not _stop.wait(_interval):
+        flush()
+
+# End def
+
+
+def _at_exit():
+    if not enabled:
+        return
+    if _path is None:
+        report()
+    else:
+        flush()
+
+# End def
+
+
+def enable(path=None, interval=DEFAULT_INTERVAL, max_bytes=DEFAULT_MAX_BYTES):
+    """ Start collecting metrics (path=None reports to stdout at exit) """
+    global enabled, _path, _interval, _max_bytes, _flusher
+
+    disable()
+
+    _path      = path
+    _interval  = interval
+    _max_bytes = max_bytes
+    enabled    = True
+
+    if path is not None:
+        _stop.clear()
+        _flusher = threading.Thread(target=_flush_loop, name="metrics", daemon=True)
+        _flusher.start()
+
+# End def
+
+
+def disable():
+    """ Stop collecting metrics (collected values are kept) """
+    global enabled, _flusher
+
+    enabled = False
+    if _flusher is not None:
+        _stop.set()
+        _flusher.join()
+        _flusher = None
+
+# End def
+
+
+def reset():
+    """ Discard all collected metrics """
+    global _started
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _started = time.time()
+
+# End def
+
+
+atexit.register(_at_exit)
+
+if os.environ.get("EDES301_METRICS"):
+    _setting = os.environ["EDES301_METRICS"]
+    enable(None if _setting == "stdout" else _setting,
+           float(os.environ.get("EDES301_METRICS_INTERVAL", DEFAULT_INTERVAL)))
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    loops = 100000
+
+    print("Metrics Overhead Test")
+
+    disable()
+    start = time.perf_counter()
+    for i in range(loops):
+        with span("test"):
+            pass
+        count("test")
+    disabled_ns = (time.perf_counter() - start) / loops * 1e9
+
+    enable()
+    start = time.perf_counter()
+    for i in range(loops):
+        with span("test"):
+            pass
+        count("test")
+    enabled_ns = (time.perf_counter() - start) / loops * 1e9
+
+    print("    span + count: disabled {0:.0f} ns, enabled {1:.0f} ns".format(disabled_ns, enabled_ns))
+    report()
+    disable()
@@ -0,0 +1,292 @@
+"""
+--------------------------------------------------------------------------
+OLED Display Wrapper
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+OLED Display Wrapper
+
+  Wraps an Adafruit_SSD1306 display so that only the parts of the screen that
+changed are sent over I2C.
+
+  Adafruit_SSD1306.display() always sends the whole 1024 byte buffer.  This
+wrapper keeps a shadow copy of what is currently on the screen.  For every new
+frame it compares each of the 8 pages (8 pixel rows, one byte per column) with
+the shadow and, for each page that changed, sets the SSD1306 column / page
+address window to the changed column range and sends just those bytes.  A frame
+that is identical to the screen sends nothing at all.
+
+  Text messages are rendered once with PIL and cached as page bytes, so fixed
+messages ("Press button", "RECORDING...", "Processing...") can be pre-rendered
+at startup and shown without drawing anything.
+
+  The wrapper only needs PIL at startup; NumPy is imported the first time a
+NumPy framebuffer is shown.
+
+Software API:
+
+  OLEDDisplay(disp, messages=None, cache_size=16)
+    - disp:     Adafruit_SSD1306 display (begin() already called)
+    - messages: (line1, line2) pairs to pre-render
+
+    show(framebuffer)
+      - Show a (height, width) boolean NumPy framebuffer
+    show_pages(pages)
+      - Show SSD1306 page bytes (width * height / 8 bytes)
+    message(line1, line2="")
+      - Show 1 or 2 lines of text
+    clear()
+      - Blank the screen
+    invalidate()
+      - Forget the shadow copy; the next frame is sent in full
+"""
+import collections
+
+from PIL import Image, ImageDraw, ImageFont
+
+import metrics
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+SSD1306_COLUMNADDR          = 0x21
+SSD1306_PAGEADDR            = 0x22
+
+I2C_DATA_CONTROL            = 0x40       # Control byte for display RAM data
+I2C_CHUNK_SIZE              = 16         # Bytes per I2C write (as in Adafruit_SSD1306)
+
+PAGE_HEIGHT                 = 8
+TEXT_LINE_HEIGHT            = 10
+
+
+# ------------------------------------------------------------------------
+# OLED Display Class
+# ------------------------------------------------------------------------
+
+class OLEDDisplay():
+    """ SSD1306 display with a shadow framebuffer and dirty-page updates """
+
+    def __init__(self, disp, messages=None, cache_size=16):
+        """ Initialize variables and pre-render the fixed messages """
+        self.disp       = disp
+        self.width      = disp.width
+        self.height     = disp.height
+        self.pages      = disp.height // PAGE_HEIGHT
+        self.cache_size = cache_size
+
+        self.frames_sent    = 0        # show_pages() calls that sent data
+        self.frames_skipped = 0        # show_pages() calls with nothing to send
+        self.bytes_sent     = 0        # Display RAM bytes sent
+
+        # Assume the screen was cleared by the caller (disp.clear(); disp.display())
+        self._shadow     = bytearray(self.width * self.pages)
+        self._valid      = True
+        self._text_cache = collections.OrderedDict()
+
+        self._font  = ImageFont.load_default()
+        self._image = Image.new('1', (self.width, self.height))
+        self._draw  = ImageDraw.Draw(self._image)
+
+        for lines in (messages or []):
+            self._text_pages(*lines)
+
+    # End def
+
+    # -------------------------------------------------------------------
+    # Frame Output
+    # -------------------------------------------------------------------
+
+    def show_pages(self, pages):
+        """ Send only the changed columns of each changed page """
+        pages = bytes(pages)
+
+        if len(pages) != len(self._shadow):
+            raise ValueError("Expected {0} bytes of page data".format(len(self._shadow)))
+
+        with metrics.span("i2c_push"):
+            sent = self._send_changed(pages)
+
+        self._shadow[:] = pages
+        self._valid     = True
+
+        if sent:
+            self.frames_sent += 1
+            self.bytes_sent  += sent
+            metrics.count("i2c_bytes", sent)
+        else:
+            self.frames_skipped += 1
+
+        return sent
+
+    # End def
+
+    def _send_changed(self, pages):
+        """ Send the changed column range of every changed page """
+        width = self.width
+        sent  = 0
+
+        for page in range(self.pages):
+            start = page * width
+            new   = pages[start:start + width]
+            old   = self._shadow[start:start + width]
+
+            if self._valid and (new == old):
+                continue
+
+            # Changed column range on this page
+            first, last = 0, width - 1
+            if self._valid:
+                while new[first] == old[first]:
+                    first += 1
+                while new[last] == old[last]:
+                    last -= 1
+
+            self._send(page, first, last, new[first:last + 1])
+            sent += last - first + 1
+
+        return sent
+
+    # End def
+
+    def _send(self, page, first, last, data):
+        """ Write data to the given page / column window of the display """
+        self.disp.command(SSD1306_COLUMNADDR)
+        self.disp.command(first)
+        self.disp.command(last)
+        self.disp.command(SSD1306_PAGEADDR)
+        self.disp.command(page)
+        self.disp.command(page)
+
+        i2c = getattr(self.disp, "_i2c", None)
+        if i2c is not None:
+            for i in range(0, len(data), I2C_CHUNK_SIZE):
+                i2c.writeList(I2C_DATA_CONTROL, list(data[i:i + I2C_CHUNK_SIZE]))
+        else:
+            for value in data:
+                self.disp.data(value)
+
+    # End def
+
+    def show(self, framebuffer):
+        """ Show a (height, width) boolean NumPy framebuffer """
+        from oled_raster import pack_pages
+        return self.show_pages(pack_pages(framebuffer).tobytes())
+
+    # End def
+
+    def clear(self):
+        """ Blank the screen """
+        return self.show_pages(bytes(len(self._shadow)))
+
+    # End def
+
+    def invalidate(self):
+        """ Forget what is on the screen; the next frame is sent in full """
+        self._valid = False
+
+    # End def
+
+    # -------------------------------------------------------------------
+    # Text
+    # -------------------------------------------------------------------
+
+    def _text_pages(self, line1, line2=""):
+        """ Return the (cached) page bytes for 1 or 2 lines of text """
+        key = (line1, line2)
+
+        if key in self._text_cache:
+            self._text_cache.move_to_end(key)
+            return self._text_cache[key]
+
+        self._draw.rectangle((0, 0, self.width, self.height), outline=0, fill=0)
+        self._draw.text((0, 0), line1, font=self._font, fill=255)
+        self._draw.text((0, TEXT_LINE_HEIGHT), line2, font=self._font, fill=255)
+
+        # Rotating each 8 row strip clockwise turns every column into one
+        # byte with the top row in bit 0, which is the SSD1306 page format
+        pages = b"".join(
+            self._image.crop((0, page * PAGE_HEIGHT, self.width, (page + 1) * PAGE_HEIGHT))
+                       .transpose(Image.ROTATE_270).tobytes()
+            for page in range(self.pages))
+
+        self._text_cache[key] = pages
+        if len(self._text_cache) > self.cache_size:
+            self._text_cache.popitem(last=False)
+
+        return pages
+
+    # End def
+
+    def message(self, line1, line2=""):
+        """ Show 1 or 2 lines of text """
+        return self.show_pages(self._text_pages(line1, line2))
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    class _CountingDisplay():
+        """ Minimal stand-in for Adafruit_SSD1306 that counts I2C bytes """
+        width  = 128
+        height = 64
+
+        def __init__(self):
+            self.bytes = 0
+
+        def command(self, c):
+            self.bytes += 2
+
+        def data(self, c):
+            self.bytes += 2
+
+    print("OLEDDisplay Test")
+
+    disp = _CountingDisplay()
+    oled = OLEDDisplay(disp, messages=[("Press button", "to record."),
+                                       ("RECORDING...", "(Hold button)"),
+                                       ("Processing...", "Please wait.")])
+
+    for lines in [("Press button", "to record."), ("RECORDING...", "(Hold button)"),
+                  ("Processing...", "Please wait."), ("Processing...", "Please wait.")]:
+        disp.bytes = 0
+        sent = oled.message(*lines)
+        print("    {0:<14s} {1:4d} RAM bytes, {2:4d} I2C bytes (full frame: {3})".format(
+              lines[0], sent, disp.bytes, 1024 + 1024 // 16 + 6))
+
+    print("Test Complete")
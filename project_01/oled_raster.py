@@ -0,0 +1,225 @@
+"""
+--------------------------------------------------------------------------
+OLED Waveform Rasterizer
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+OLED Waveform Rasterizer
+
+  Draw a recording straight into a 1-bit framebuffer for the SSD1306 display,
+without going through matplotlib, a PNG file and PIL resizing.
+
+  The recording is reduced to one min/max pair per display column and each
+column is drawn as a vertical bar between its min and max, so short peaks
+remain visible.  The framebuffer is a (height, width) boolean NumPy array and
+is packed into the SSD1306 page layout:  the display RAM is split into
+height / 8 pages of "width" bytes, and bit n of a byte is row (page * 8 + n).
+
+Software API:
+
+  rasterize_waveform(audio, width=128, height=64, axis=False, full_scale=None)
+    - Return a (height, width) boolean framebuffer of the waveform
+    - axis:       Draw the zero line across the display
+    - full_scale: Amplitude mapped to the top/bottom row
+                  (None = scale to the peak of the recording)
+
+  rasterize_spectrogram(magnitudes_db, freqs=None, max_freq=None, width=128,
+                        height=64, range_db=40.0)
+    - Return a (height, width) boolean heatmap of a spectrogram (one row per
+      frame, one column per bin), low frequencies at the bottom.  Frames /
+      bins are averaged down to the display size and the levels (the top
+      range_db dB) are turned into on / off pixels with an 8x8 ordered
+      (Bayer) dither, so louder areas are denser.
+    - max_freq:   Highest frequency shown (needs freqs)
+
+  rasterize_minmax(mins, maxs, height=64, axis=False, full_scale=None)
+    - Same drawing from per-column (mins, maxs) that are already reduced
+      (e.g. read from a recording archive pyramid); one column per pair
+
+  pack_pages(framebuffer)
+    - Return the SSD1306 page bytes (width * height / 8) for the framebuffer
+
+  show_framebuffer(disp, framebuffer)
+    - Display the framebuffer on an Adafruit_SSD1306 driver, or on an
+      OLEDDisplay wrapper (which only sends the changed pages)
+"""
+import numpy as np
+
+from decimate import minmax_columns
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+OLED_WIDTH                  = 128
+OLED_HEIGHT                 = 64
+OLED_PAGE_HEIGHT            = 8          # Rows per SSD1306 page (one byte)
+
+# 8x8 Bayer ordered dither thresholds (0 .. 1)
+BAYER_8X8                   = np.array([[ 0, 32,  8, 40,  2, 34, 10, 42],
+                                        [48, 16, 56, 24, 50, 18, 58, 26],
+                                        [12, 44,  4, 36, 14, 46,  6, 38],
+                                        [60, 28, 52, 20, 62, 30, 54, 22],
+                                        [ 3, 35, 11, 43,  1, 33,  9, 41],
+                                        [51, 19, 59, 27, 49, 17, 57, 25],
+                                        [15, 47,  7, 39, 13, 45,  5, 37],
+                                        [63, 31, 55, 23, 61, 29, 53, 21]]) / 64.0 + 1.0 / 128
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def rasterize_waveform(audio, width=OLED_WIDTH, height=OLED_HEIGHT, axis=False, full_scale=None):
+    """ Return a (height, width) boolean framebuffer showing the waveform """
+    audio      = np.asarray(audio).reshape(-1)
+    mins, maxs = minmax_columns(audio, width)
+
+    return rasterize_minmax(mins, maxs, height, axis, full_scale)
+
+# End def
+
+
+def rasterize_minmax(mins, maxs, height=OLED_HEIGHT, axis=False, full_scale=None):
+    """ Return a (height, len(mins)) boolean framebuffer of min/max column bars """
+    if full_scale is None:
+        full_scale = max(int(np.max(maxs)), -int(np.min(mins)), 1)
+
+    # Map amplitude to row: +full_scale -> row 0, -full_scale -> bottom row
+    half   = (height - 1) / 2.0
+    top    = np.rint(half - maxs.astype(np.float64) * half / full_scale)
+    bottom = np.rint(half - mins.astype(np.float64) * half / full_scale)
+    top    = np.clip(top, 0, height - 1)
+    bottom = np.clip(bottom, 0, height - 1)
+
+    rows        = np.arange(height)[:, None]
+    framebuffer = (rows >= top[None, :]) & (rows <= bottom[None, :])
+
+    if axis:
+        framebuffer[int(round(half)), :] = True
+
+    return framebuffer
+
+# End def
+
+
+def _mean_bins(values, n_bins, axis):
+    """ Average values down (or repeat them up) to n_bins along axis """
+    length = values.shape[axis]
+    edges  = (np.arange(n_bins + 1, dtype=np.int64) * length) // n_bins
+    starts = np.minimum(edges[:-1], length - 1)
+    counts = np.maximum(edges[1:] - edges[:-1], 1)
+    shape  = [1, 1]
+    shape[axis] = n_bins
+    # reduceat returns the single value at "start" for an empty bin (count 1)
+    return np.add.reduceat(values, starts, axis=axis) / counts.reshape(shape)
+
+# End def
+
+
+def rasterize_spectrogram(magnitudes_db, freqs=None, max_freq=None, width=OLED_WIDTH,
+                          height=OLED_HEIGHT, range_db=40.0):
+    """ Return a (height, width) boolean dithered heatmap of a spectrogram """
+    magnitudes = np.asarray(magnitudes_db, dtype=np.float32)
+    if magnitudes.size == 0:
+        return np.zeros((height, width), dtype=bool)
+
+    if (max_freq is not None) and (freqs is not None):
+        magnitudes = magnitudes[:, :max(1, int(np.searchsorted(freqs, max_freq, side="right")))]
+
+    # (frames, bins) -> (height, width), lowest frequency on the bottom row
+    heatmap = _mean_bins(_mean_bins(magnitudes, width, axis=0), height, axis=1).T[::-1]
+
+    top     = heatmap.max()
+    levels  = np.clip((heatmap - (top - range_db)) / range_db, 0.0, 1.0)
+    bayer   = np.tile(BAYER_8X8, (height // 8 + 1, width // 8 + 1))[:height, :width]
+
+    return levels > bayer
+
+# End def
+
+
+def pack_pages(framebuffer):
+    """ Pack a (height, width) boolean framebuffer into SSD1306 page bytes """
+    height, width = framebuffer.shape
+
+    if height % OLED_PAGE_HEIGHT:
+        raise ValueError("Framebuffer height must be a multiple of {0}".format(OLED_PAGE_HEIGHT))
+
+    pages = framebuffer.reshape(height // OLED_PAGE_HEIGHT, OLED_PAGE_HEIGHT, width)
+
+    # (page, column, bit) -> one byte per column with row 0 of the page in bit 0
+    return np.packbits(pages.transpose(0, 2, 1), axis=-1, bitorder='little').reshape(-1)
+
+# End def
+
+
+def show_framebuffer(disp, framebuffer):
+    """ Send a framebuffer to an Adafruit_SSD1306 display or OLEDDisplay """
+    if hasattr(disp, "show_pages"):
+        disp.show(framebuffer)
+        return
+
+    disp._buffer = pack_pages(framebuffer).tolist()
+    disp.display()
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+
+    print("OLED Rasterizer Test")
+
+    fs    = 44100
+    t     = np.arange(20 * fs) / fs
+    audio = (np.sin(2 * np.pi * 1.2 * t) ** 31 * 30000).astype(np.int16)
+
+    start       = time.perf_counter()
+    framebuffer = rasterize_waveform(audio, axis=True)
+    pages       = pack_pages(framebuffer)
+    print("    {0} samples -> {1} bytes in {2:.1f} ms".format(len(audio), len(pages), (time.perf_counter() - start) * 1000))
+
+    for row in framebuffer[::2]:
+        print("    " + "".join("#" if pixel else "." for pixel in row[::2]))
+
+    # Spectrogram of a rising tone: a dithered diagonal line
+    frames  = np.linspace(0, 1, 500)[:, None]
+    bins    = np.linspace(0, 1, 129)[None, :]
+    heatmap = rasterize_spectrogram(-200.0 * np.abs(bins - frames))
+    for row in heatmap[::4]:
+        print("    " + "".join("#" if pixel else "." for pixel in row[::2]))
+
+    print("Test Complete")
@@ -0,0 +1,372 @@
+"""
+--------------------------------------------------------------------------
+Recording Sink
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Recording Sink
+
+  Streams a recording to disk while it is being captured instead of keeping
+every block in a Python list.  The audio callback only hands a copy of each
+block to a queue; a writer thread appends the int16 frames to the file.  Memory
+use during a recording is therefore bounded by the few blocks waiting in the
+queue, no matter how long the button is held.
+
+  When the recording is finished the file is closed (the WAV header is patched
+with the final length) and the audio is returned as a read-only np.memmap, so
+plotting and analysis code can use it like a normal array without loading it
+into RAM.
+
+  The file is written under a temporary name and renamed into place when the
+recording is finished.  A memmap of the previous recording (e.g. still being
+rendered by a background worker) stays valid, because it keeps referring to
+the old file.
+
+Formats:
+  - "wav":  16-bit PCM WAV file (44 byte header)
+  - "raw":  Headerless int16 samples
+
+Software API:
+
+  RecordingSink(path, fs, channels=1, fmt="wav", stages=(), consumers=())
+    - fs:      Sample rate of the file (the output rate of the stages)
+    - stages:  Processing applied to every block in the writer thread, in
+               order (e.g. resample.StreamingDecimator, mono only).  Each
+               stage has process(block) -> block and flush() -> block
+    - consumers: Objects whose push_block(block) is called from the writer
+                 thread with every block written (e.g. live analysis).
+                 A consumer that raises is dropped and listed in
+                 consumer_errors; the recording continues.
+    write(block)
+      - Queue a block of int16 samples (safe to call from the audio callback)
+    write_gap(frames)
+      - Queue "frames" frames of silence in place of samples lost in an
+        input overflow (safe to call from the audio callback)
+    wait()
+      - Block until every block queued so far has been processed and written
+    finish()
+      - Wait for the writer, close the file and return the recording as a
+        np.memmap (1D for mono, (frames, channels) otherwise).  Raises the
+        first error of the writer thread (file write or stage) after
+        removing the partial file
+
+  open_recording(path, channels=1)
+    - Return an existing WAV / raw recording as a read-only np.memmap
+"""
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+import metrics
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+WAV_HEADER_SIZE             = 44
+SAMPLE_WIDTH                = 2          # Bytes per int16 sample
+
+FORMAT_WAV                  = "wav"
+FORMAT_RAW                  = "raw"
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def wav_header(fs, channels, data_bytes):
+    """ Return a 44 byte header for a 16-bit PCM WAV file """
+    block_align = channels * SAMPLE_WIDTH
+    return struct.pack("<4sI4s4sIHHIIHH4sI",
+                       b"RIFF", 36 + data_bytes, b"WAVE",
+                       b"fmt ", 16, 1, channels, fs, fs * block_align, block_align, 8 * SAMPLE_WIDTH,
+                       b"data", data_bytes)
+
+# End def
+
+
+def _wav_data_chunk(f):
+    """ Return (offset, size, channels, fs) of the data chunk of a WAV file """
+    riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+    if (riff != b"RIFF") or (wave != b"WAVE"):
+        raise ValueError("Not a WAV file")
+
+    channels = fs = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("WAV file has no data chunk")
+        chunk_id, size = struct.unpack("<4sI", header)
+
+        if chunk_id == b"fmt ":
+            fmt = f.read(size)
+            audio_format, channels, fs = struct.unpack("<HHI", fmt[:8])
+            bits = struct.unpack("<H", fmt[14:16])[0]
+            if (audio_format != 1) or (bits != 8 * SAMPLE_WIDTH):
+                raise ValueError("Only 16-bit PCM WAV files are supported")
+        elif chunk_id == b"data":
+            return f.tell(), size, channels, fs
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+# End def
+
+
+def open_recording(path, channels=1):
+    """ Return a WAV or raw int16 recording as a read-only np.memmap """
+    offset = 0
+    size   = os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        if f.read(4) == b"RIFF":
+            f.seek(0)
+            offset, size, channels, _ = _wav_data_chunk(f)
+
+    frames = size // (SAMPLE_WIDTH * channels)
+    if frames == 0:
+        return np.zeros(0 if channels == 1 else (0, channels), dtype=np.int16)
+
+    shape = (frames,) if channels == 1 else (frames, channels)
+    return np.memmap(path, dtype=np.int16, mode='r', offset=offset, shape=shape)
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Recording Sink Class
+# ------------------------------------------------------------------------
+
+class RecordingSink():
+    """ Writes a recording to disk from a writer thread """
+
+    def __init__(self, path, fs, channels=1, fmt=FORMAT_WAV, stages=(), consumers=()):
+        """ Open the file and start the writer thread """
+        if fmt not in (FORMAT_WAV, FORMAT_RAW):
+            raise ValueError("Unknown recording format: {0}".format(fmt))
+
+        self.path      = path
+        self.fs        = fs
+        self.channels  = channels
+        self.fmt       = fmt
+        self.stages    = list(stages)
+        self.consumers = list(consumers)
+
+        self.blocks_written  = 0
+        self.bytes_written   = 0
+        self.error           = None
+        self.consumer_errors = []        # (consumer, exception) of dropped consumers
+
+        self._temp_path = path + ".part"
+        self._file      = open(self._temp_path, "wb")
+        if fmt == FORMAT_WAV:
+            self._file.write(wav_header(fs, channels, 0))
+
+        # SimpleQueue.put() never blocks, so it is safe in the audio callback
+        self._queue  = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="recording-sink", daemon=True)
+        self._thread.start()
+
+    # End def
+
+    def write(self, block):
+        """ Queue a block of samples to be written """
+        self._queue.put(np.array(block, dtype=np.int16, copy=True))
+
+    # End def
+
+    def write_gap(self, frames):
+        """ Queue frames of silence (samples lost by the audio input) """
+        self._queue.put(int(frames))
+
+    # End def
+
+    def wait(self):
+        """ Wait until the writer thread has written every block queued so far """
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    # End def
+
+    def _run(self):
+        """ Writer thread: append queued blocks until the None sentinel
+
+        An exception in a stage stops the recording (it is raised by
+        finish()), but the thread keeps draining the queue so finish()
+        still returns.
+        """
+        while True:
+            block = self._queue.get()
+            if block is None:
+                if self.error is None:
+                    try:
+                        self._flush_stages()
+                    except Exception as e:
+                        self.error = e
+                return
+            if isinstance(block, threading.Event):
+                block.set()
+                continue
+            if self.error is not None:
+                continue
+            if isinstance(block, int):
+                block = np.zeros(block * self.channels, dtype=np.int16)
+
+            try:
+                for stage in self.stages:
+                    block = stage.process(block)
+            except Exception as e:
+                self.error = e
+                continue
+            self._write_block(block)
+
+    # End def
+
+    def _flush_stages(self):
+        """ Push the samples still held by the stages through to the file """
+        block = np.zeros(0, dtype=np.int16)
+        for stage in self.stages:
+            if len(block):
+                block = stage.process(block)
+            block = np.concatenate((block, stage.flush()))
+        self._write_block(block)
+
+    # End def
+
+    def _write_block(self, block):
+        """ Append one block to the file (writer thread) """
+        if (self.error is not None) or (len(block) == 0):
+            return
+
+        try:
+            self._file.write(block.tobytes())
+            self.blocks_written += 1
+            self.bytes_written  += block.nbytes
+            metrics.count("bytes_written", block.nbytes)
+        except OSError as e:
+            self.error = e
+
+        for consumer in list(self.consumers):
+            try:
+                consumer.push_block(block)
+            except Exception as e:
+                # Live analysis is optional: drop the consumer, keep recording
+                self.consumers.remove(consumer)
+                self.consumer_errors.append((consumer, e))
+
+    # End def
+
+    def finish(self):
+        """ Close the file and return the recording as a np.memmap """
+        self._queue.put(None)
+        self._thread.join()
+
+        if self.fmt == FORMAT_WAV:
+            self._file.seek(0)
+            self._file.write(wav_header(self.fs, self.channels, self.bytes_written))
+        self._file.close()
+
+        if self.error is not None:
+            os.remove(self._temp_path) # The partial file is not a usable recording
+            raise self.error
+
+        os.replace(self._temp_path, self.path)
+
+        return open_recording(self.path, self.channels)
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import wave
+    import tempfile
+
+    print("RecordingSink Test")
+
+    path  = os.path.join(tempfile.mkdtemp(), "recording.wav")
+    block = (np.arange(2048 * 10) % 2000 - 1000).astype(np.int16).reshape(-1, 1)
+
+    sink = RecordingSink(path, 44100)
+    for i in range(100):
+        sink.write(block)
+    audio = sink.finish()
+
+    assert isinstance(audio, np.memmap) and len(audio) == 100 * len(block)
+    assert np.array_equal(audio[:len(block)], block.reshape(-1))
+
+    with wave.open(path) as w:
+        assert w.getnframes() == len(audio) and w.getframerate() == 44100
+
+    print("    {0} blocks, {1} bytes written".format(sink.blocks_written, sink.bytes_written))
+
+    # Decimated to 4 kHz in the writer thread
+    from resample import StreamingDecimator
+    sink = RecordingSink(path, 4000, stages=[StreamingDecimator(44100, 4000)])
+    for i in range(100):
+        sink.write(block)
+    audio = sink.finish()
+
+    assert len(audio) == round(100 * len(block) * 4000 / 44100)
+    print("    Decimated: {0} samples, {1} bytes written".format(len(audio), sink.bytes_written))
+
+    # A failing consumer is dropped; a failing stage is raised by finish()
+    class Failing():
+        def push_block(self, block):
+            raise RuntimeError("consumer failed")
+        def process(self, block):
+            raise RuntimeError("stage failed")
+
+    sink = RecordingSink(path, 44100, consumers=[Failing()])
+    for i in range(10):
+        sink.write(block)
+    audio = sink.finish()
+    assert len(audio) == 10 * len(block) and len(sink.consumer_errors) == 1
+
+    sink = RecordingSink(path, 44100, stages=[Failing()])
+    for i in range(10):
+        sink.write(block)
+    try:
+        sink.finish()
+        raise AssertionError("stage error not raised")
+    except RuntimeError as e:
+        assert not os.path.exists(path + ".part")
+        print("    Stage error raised by finish(): {0}".format(e))
+
+    print("Test Complete")
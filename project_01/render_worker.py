@@ -0,0 +1,258 @@
+"""
+--------------------------------------------------------------------------
+Background Render Worker
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Background Render Worker
+
+  Runs slow rendering jobs (matplotlib plots, PNG encoding) on a background
+thread so the button loop can re-arm as soon as a recording is finished.
+
+  Jobs are held in a bounded queue.  When the queue is full, the "policy"
+decides what happens to a new job:
+    - "drop_oldest":  Discard the oldest waiting job and queue the new one
+                      (the newest recording always gets rendered)
+    - "drop_newest":  Discard the new job
+    - "block":        Wait until there is room in the queue
+
+  Rendering uses the matplotlib object API (Figure + FigureCanvasAgg) rather
+than pyplot, since pyplot's global state is not safe to use from a thread.
+
+Software API:
+
+  RenderWorker(render_function=render_waveform_png, max_pending=2,
+               policy="drop_oldest")
+
+    submit(*args, **kwargs)
+      - Queue render_function(*args, **kwargs).  Returns True if the job was
+        queued, False if it was dropped.
+
+    wait_idle(timeout=None)
+      - Wait until all queued jobs are finished
+
+    close(wait=True)
+      - Stop the worker (finishing queued jobs if wait is True)
+
+  render_waveform_png(audio, output_file, figsize=(10, 4), dpi=100)
+    - Save a waveform plot of the audio to output_file
+"""
+import threading
+import collections
+
+import metrics
+from decimate import minmax_envelope, PLOT_COLUMNS
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+POLICY_DROP_OLDEST          = "drop_oldest"
+POLICY_DROP_NEWEST          = "drop_newest"
+POLICY_BLOCK                = "block"
+
+POLICIES                    = (POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_BLOCK)
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def render_waveform_png(audio, output_file, figsize=(10, 4), dpi=100):
+    """ Save a waveform plot of the audio to output_file (thread safe) """
+    import matplotlib
+    matplotlib.use('Agg')  # Non-GUI backend
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    with metrics.span("plot"):
+        figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(figure)
+        axes   = figure.add_subplot(1, 1, 1)
+
+        plot_x, plot_y = minmax_envelope(audio, PLOT_COLUMNS)
+        axes.plot(plot_x, plot_y, color='blue')
+        axes.set_title("Audio Waveform")
+        axes.set_xlabel("Sample Number")
+        axes.set_ylabel("Amplitude")
+        figure.tight_layout()
+
+    with metrics.span("savefig"):
+        figure.savefig(output_file)
+
+    return output_file
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Render Worker Class
+# ------------------------------------------------------------------------
+
+class RenderWorker():
+    """ Background thread with a bounded render job queue """
+
+    def __init__(self, render_function=render_waveform_png, max_pending=2,
+                       policy=POLICY_DROP_OLDEST, name="render-worker"):
+        """ Initialize variables and start the worker thread """
+        if policy not in POLICIES:
+            raise ValueError("Unknown render queue policy: {0}".format(policy))
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self.render_function = render_function
+        self.max_pending     = max_pending
+        self.policy          = policy
+
+        self.jobs_submitted  = 0
+        self.jobs_completed  = 0
+        self.jobs_dropped    = 0
+        self.jobs_failed     = 0
+        self.last_error      = None
+
+        self._jobs      = collections.deque()
+        self._condition = threading.Condition()
+        self._busy      = False
+        self._running   = True
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # End def
+
+    def submit(self, *args, **kwargs):
+        """ Queue a render job; returns False if the job was dropped """
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("RenderWorker is closed")
+
+            self.jobs_submitted += 1
+
+            if len(self._jobs) >= self.max_pending:
+                if self.policy == POLICY_DROP_NEWEST:
+                    self.jobs_dropped += 1
+                    return False
+                elif self.policy == POLICY_DROP_OLDEST:
+                    self._jobs.popleft()
+                    self.jobs_dropped += 1
+                else:
+                    while self._running and (len(self._jobs) >= self.max_pending):
+                        self._condition.wait()
+
+            self._jobs.append((args, kwargs))
+            self._condition.notify_all()
+
+        return True
+
+    # End def
+
+    def pending(self):
+        """ Number of jobs waiting (not including a job being rendered) """
+        return len(self._jobs)
+
+    # End def
+
+    def wait_idle(self, timeout=None):
+        """ Wait until all queued jobs are finished; returns True if idle """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._jobs and not self._busy, timeout)
+
+    # End def
+
+    def close(self, wait=True):
+        """ Stop the worker thread """
+        with self._condition:
+            if not wait:
+                self.jobs_dropped += len(self._jobs)
+                self._jobs.clear()
+            self._running = False
+            self._condition.notify_all()
+
+        self._thread.join()
+
+    # End def
+
+    def _run(self):
+        """ Worker thread: render jobs until closed and the queue is empty """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._jobs or not self._running)
+
+                if not self._jobs:
+                    return
+
+                args, kwargs = self._jobs.popleft()
+                self._busy   = True
+                self._condition.notify_all()
+
+            try:
+                self.render_function(*args, **kwargs)
+                self.jobs_completed += 1
+            except Exception as e:
+                self.jobs_failed += 1
+                self.last_error   = e
+                print("Render job failed: {0}".format(e))
+
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import os
+    import time
+    import tempfile
+    import numpy as np
+
+    print("RenderWorker Test")
+
+    out_dir = tempfile.mkdtemp()
+    rng     = np.random.default_rng(0)
+    worker  = RenderWorker(max_pending=2, policy=POLICY_DROP_OLDEST)
+
+    start = time.perf_counter()
+    for i in range(5):
+        audio = (rng.standard_normal(44100 * 5) * 2000).astype(np.int16)
+        worker.submit(audio, os.path.join(out_dir, "waveform_{0}.png".format(i)))
+    print("    Submitted 5 jobs in {0:.1f} ms".format((time.perf_counter() - start) * 1000))
+
+    worker.close()
+    print("    Completed = {0}, Dropped = {1}, Failed = {2}".format(
+          worker.jobs_completed, worker.jobs_dropped, worker.jobs_failed))
+    print("Test Complete")
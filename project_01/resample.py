@@ -0,0 +1,280 @@
+"""
+--------------------------------------------------------------------------
+Resample
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Resample
+
+  Stateful polyphase anti-alias / sample rate conversion for the capture
+path.  Heart and lung sounds are below about 2 kHz, so recordings can be
+stored at 4 kHz or 8 kHz instead of 44.1 kHz; the file, memory use and every
+later step (plotting, analysis) get 5-10x cheaper.
+
+  The conversion is rational:  fs_out / fs_in = L / M in lowest terms
+(44100 -> 4000 is 40 / 441).  A Kaiser windowed-sinc low-pass prototype is
+designed at the up-sampled rate (fs_in * L) and split into L phases of
+"taps" coefficients each.  Every output sample only uses the one phase that
+lines up with it, so the work per output sample is "taps" multiply-adds, no
+matter how large L and M are (nothing is ever up-sampled or thrown away).
+
+  process() is called block-by-block.  The last (taps - 1) input samples and
+the position of the next output sample are carried over between calls, so
+the result is the same as converting the whole recording at once, whatever
+the block size.  The filter delay is removed:  the first outputs are
+skipped and flush() pushes the remaining ones out, so the output is time
+aligned with the input and has round(len * fs_out / fs_in) samples.
+
+Software API:
+
+  StreamingDecimator(fs_in, fs_out, passband=0.8, attenuation=60.0)
+    - passband:     Fraction of the output Nyquist frequency that is kept
+                    flat; the filter reaches "attenuation" dB at fs_out / 2
+    process(block)
+      - Convert one block of int16 samples (1D or (frames, 1)); returns an
+        int16 array (may be empty)
+    flush()
+      - Return the last output samples (call once at the end)
+    reset()
+      - Clear the filter state for a new recording
+
+  design_lowpass(cutoff, transition, fs, attenuation=60.0, gain=1.0)
+    - Kaiser windowed-sinc low-pass FIR taps
+"""
+import math
+from fractions import Fraction
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+DEFAULT_PASSBAND            = 0.8        # Of the output Nyquist frequency
+DEFAULT_ATTENUATION         = 60.0       # Stopband attenuation (dB)
+INT16_MIN                   = -32768
+INT16_MAX                   = 32767
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def kaiser_beta(attenuation):
+    """ Kaiser window beta for a stopband attenuation in dB """
+    if attenuation > 50:
+        return 0.1102 * (attenuation - 8.7)
+    if attenuation >= 21:
+        return 0.5842 * (attenuation - 21) ** 0.4 + 0.07886 * (attenuation - 21)
+    return 0.0
+
+# End def
+
+
+def kaiser_length(transition, fs, attenuation):
+    """ Taps needed for a transition band (Hz) at sample rate fs """
+    width = 2.0 * math.pi * transition / fs
+    return int(math.ceil((attenuation - 7.95) / (2.285 * width))) + 1
+
+# End def
+
+
+def design_lowpass(cutoff, transition, fs, attenuation=DEFAULT_ATTENUATION, gain=1.0, length=None):
+    """ Kaiser windowed-sinc low-pass FIR taps (cutoff / transition in Hz) """
+    if length is None:
+        length = kaiser_length(transition, fs, attenuation)
+
+    n    = np.arange(length) - (length - 1) / 2.0
+    taps = np.sinc(2.0 * cutoff / fs * n) * np.kaiser(length, kaiser_beta(attenuation))
+
+    return taps * (gain / taps.sum())
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Streaming Decimator Class
+# ------------------------------------------------------------------------
+
+class StreamingDecimator():
+    """ Block-by-block rational polyphase sample rate converter """
+
+    def __init__(self, fs_in, fs_out, passband=DEFAULT_PASSBAND, attenuation=DEFAULT_ATTENUATION):
+        """ Design the polyphase filter bank """
+        if fs_out > fs_in:
+            raise ValueError("fs_out ({0}) must not be above fs_in ({1})".format(fs_out, fs_in))
+
+        ratio       = Fraction(int(fs_out), int(fs_in))
+        self.fs_in  = fs_in
+        self.fs_out = fs_out
+        self.up     = ratio.numerator        # L
+        self.down   = ratio.denominator      # M
+
+        # Pass band edge .. output Nyquist, at the input rate
+        nyquist    = fs_out / 2.0
+        edge       = passband * nyquist
+        self.taps  = kaiser_length(nyquist - edge, fs_in, attenuation)
+
+        # Prototype at the up-sampled rate, odd length (whole-sample delay),
+        # zero padded to L * taps coefficients
+        length     = self.up * self.taps - (1 - (self.up * self.taps) % 2)
+        prototype  = np.zeros(self.up * self.taps)
+        prototype[:length] = design_lowpass((edge + nyquist) / 2.0, nyquist - edge, fs_in * self.up,
+                                            attenuation, gain=self.up, length=length)
+
+        # phases[p, k] = prototype[p + k * L]; reversed so a window of input
+        # samples (oldest first) can be multiplied directly
+        self._phases  = prototype.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+        self._offsets = np.arange(self.taps)
+
+        # Filter delay (up-sampled units): whole output samples are skipped,
+        # the remainder is the position of the first output
+        center      = (length - 1) // 2
+        self.delay  = center // self.down
+        self._start = center %  self.down
+
+        self.reset()
+
+    # End def
+
+    def reset(self):
+        """ Clear the filter state """
+        self._history     = np.zeros(self.taps - 1, dtype=np.float32)
+        self._position    = self._start      # Next output, in up-sampled units from the block start
+        self._skip        = self.delay       # Delayed outputs still to drop
+        self._samples_in  = 0
+        self._samples_out = 0
+
+    # End def
+
+    def process(self, block):
+        """ Convert one block of samples; return the new int16 output samples """
+        block = np.asarray(block).reshape(-1)
+        count = len(block)
+        self._samples_in += count
+
+        # Input window: carried history, then the new block
+        signal = np.concatenate((self._history, block.astype(np.float32)))
+
+        # Output positions in this block (up-sampled units)
+        up     = self.up * count
+        stops  = np.arange(self._position, up, self.down)
+        index  = stops // self.up
+        phase  = stops %  self.up
+
+        # window[n] = the taps input samples ending at index[n] (oldest first)
+        window = signal[index[:, None] + self._offsets]
+        output = np.einsum("ij,ij->i", window, self._phases[phase])
+
+        self._position = (self._position + len(stops) * self.down) - up
+        self._history  = signal[count:]
+
+        return self._emit(output)
+
+    # End def
+
+    def flush(self):
+        """ Return the remaining (delayed) output samples """
+        samples_in = self._samples_in
+        target     = int(round(samples_in * self.up / self.down))
+        output     = []
+        while self._samples_out < target:
+            output.append(self.process(np.zeros(self.taps, dtype=np.int16)))
+        self._samples_in = samples_in
+
+        output = np.concatenate(output) if output else np.zeros(0, dtype=np.int16)
+        extra  = self._samples_out - target
+        if extra > 0:
+            output = output[:len(output) - extra]
+            self._samples_out = target
+
+        return output
+
+    # End def
+
+    def _emit(self, output):
+        """ Drop the filter delay, round and clip to int16 """
+        if self._skip:
+            skip        = min(self._skip, len(output))
+            output      = output[skip:]
+            self._skip -= skip
+
+        self._samples_out += len(output)
+
+        return np.clip(np.rint(output), INT16_MIN, INT16_MAX).astype(np.int16)
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+
+    print("StreamingDecimator Test")
+
+    fs_in    = 44100
+    seconds  = 10
+    t        = np.arange(fs_in * seconds) / fs_in
+    # 100 Hz "heart" tone (keep) + 5 kHz tone (must be removed)
+    signal   = (8000 * np.sin(2 * np.pi * 100 * t) + 8000 * np.sin(2 * np.pi * 5000 * t)).astype(np.int16)
+
+    for fs_out in (4000, 8000):
+        decimator = StreamingDecimator(fs_in, fs_out)
+        start     = time.perf_counter()
+        blocks    = [decimator.process(signal[i:i + 1024]) for i in range(0, len(signal), 1024)]
+        blocks.append(decimator.flush())
+        elapsed   = time.perf_counter() - start
+        output    = np.concatenate(blocks)
+
+        # Same result as one big block
+        decimator.reset()
+        whole     = np.concatenate((decimator.process(signal), decimator.flush()))
+        assert np.array_equal(output, whole)
+        assert len(output) == round(len(signal) * fs_out / fs_in)
+
+        # 100 Hz tone kept (time aligned), 5 kHz removed
+        t_out     = np.arange(len(output)) / fs_out
+        reference = 8000 * np.sin(2 * np.pi * 100 * t_out)
+        middle    = slice(fs_out, len(output) - fs_out)
+        error     = np.abs(output[middle] - reference[middle]).max()
+        assert error < 80, error
+
+        print("    {0:5d} Hz: L/M = {1}/{2}, {3} taps per phase, {4:.1f} ms per {5} s "
+              "({6:.0f}x real time), max error {7:.0f}".format(
+              fs_out, decimator.up, decimator.down, decimator.taps, elapsed * 1000.0, seconds,
+              seconds / elapsed, error))
+
+    print("Test Complete")
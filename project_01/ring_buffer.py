@@ -0,0 +1,233 @@
+"""
+--------------------------------------------------------------------------
+Ring Buffer
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Ring Buffer
+
+  Fixed capacity sample buffer used to hold live audio without growing a NumPy
+array on every block.  Storage is allocated once, so the cost of writing a block
+is constant no matter how long the session runs.
+
+  Two modes are supported:
+    - keep_last=False:  The buffer fills up to its capacity and then refuses
+                        more data (raises a ValueError).  Use this when the
+                        session length is known in advance.
+    - keep_last=True:   Once full, the oldest samples are overwritten so the
+                        buffer always holds the most recent "capacity" samples
+                        (e.g. "keep the last 10 seconds").
+
+  Every sample is stored twice (at index i and i + capacity) so the valid data
+is always available as one contiguous slice.  view() therefore returns a
+zero-copy NumPy view, oldest sample first, that can be handed straight to
+plotting or analysis code.
+
+Software API:
+
+  RingBuffer(capacity, dtype=np.int16, keep_last=False)
+    - capacity:  Maximum number of samples held
+    - dtype:     NumPy sample type
+    - keep_last: Overwrite the oldest samples once full
+
+  RingBuffer.from_seconds(seconds, fs, dtype=np.int16, keep_last=True)
+    - Create a buffer that holds "seconds" of audio at sample rate "fs"
+
+    write(samples)
+      - Append samples (any shape, flattened).  Returns number of samples written.
+
+    view()
+      - Contiguous read-only view of the buffered samples (oldest first).
+        The view is only valid until the next write().
+
+    clear()
+      - Discard all samples
+"""
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# Ring Buffer Class
+# ------------------------------------------------------------------------
+
+class RingBuffer():
+    """ Fixed capacity sample buffer with a zero-copy contiguous view """
+
+    def __init__(self, capacity, dtype=np.int16, keep_last=False):
+        """ Allocate storage for the buffer """
+        if capacity <= 0:
+            raise ValueError("RingBuffer capacity must be greater than 0")
+
+        self.capacity      = int(capacity)
+        self.keep_last     = keep_last
+        self.total_written = 0             # Samples written since creation / clear()
+
+        # Storage is doubled so the valid data is always one contiguous slice
+        self._data   = np.zeros(2 * self.capacity, dtype=dtype)
+        self._end    = 0                   # Next write position in [0, capacity)
+        self._length = 0                   # Number of valid samples
+
+    # End def
+
+    @classmethod
+    def from_seconds(cls, seconds, fs, dtype=np.int16, keep_last=True):
+        """ Create a buffer that holds the given number of seconds of audio """
+        return cls(int(round(seconds * fs)), dtype=dtype, keep_last=keep_last)
+
+    # End def
+
+    def __len__(self):
+        """ Number of samples currently held """
+        return self._length
+
+    # End def
+
+    @property
+    def dtype(self):
+        """ NumPy type of the stored samples """
+        return self._data.dtype
+
+    # End def
+
+    def is_full(self):
+        """ Return True if the buffer holds "capacity" samples """
+        return self._length == self.capacity
+
+    # End def
+
+    def write(self, samples):
+        """ Append samples to the buffer.
+
+        :param samples: Array of samples (any shape; it is flattened)
+
+        Returns the number of samples written.  Will throw a ValueError if the
+        buffer is not in keep_last mode and the samples do not fit.
+        """
+        samples = np.asarray(samples).reshape(-1)
+        count   = len(samples)
+
+        if count == 0:
+            return 0
+
+        if not self.keep_last and (self._length + count > self.capacity):
+            raise ValueError("RingBuffer full ({0} samples)".format(self.capacity))
+
+        self.total_written += count
+
+        # Only the newest "capacity" samples can survive the write
+        if count > self.capacity:
+            samples = samples[-self.capacity:]
+            self._end += count - self.capacity
+            count     = self.capacity
+
+        cap   = self.capacity
+        start = self._end % cap
+        first = min(count, cap - start)
+
+        # Write each sample to both halves of the storage
+        self._data[start:start + first]             = samples[:first]
+        self._data[start + cap:start + cap + first] = samples[:first]
+
+        if first < count:
+            rest = count - first
+            self._data[:rest]           = samples[first:]
+            self._data[cap:cap + rest]  = samples[first:]
+
+        self._end    = (start + count) % cap
+        self._length = min(self._length + count, cap)
+
+        return count
+
+    # End def
+
+    def view(self):
+        """ Return a contiguous, read-only view of the buffered samples """
+        end = self._end
+        if end < self._length:
+            end += self.capacity
+
+        out = self._data[end - self._length:end]
+        out.flags.writeable = False
+        return out
+
+    # End def
+
+    def clear(self):
+        """ Discard all samples """
+        self._end          = 0
+        self._length       = 0
+        self.total_written = 0
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+
+    print("RingBuffer Test")
+
+    block = np.arange(2048, dtype=np.int16)
+
+    # Fixed size session
+    buf = RingBuffer(10 * 2048)
+    for i in range(10):
+        buf.write(block)
+    assert buf.is_full()
+    assert np.array_equal(buf.view(), np.tile(block, 10))
+
+    # Keep the last N samples
+    buf = RingBuffer(5000, keep_last=True)
+    data = np.arange(12345, dtype=np.int16)
+    for i in range(0, len(data), 1000):
+        buf.write(data[i:i + 1000])
+    assert np.array_equal(buf.view(), data[-5000:])
+
+    # Constant cost per block vs. np.concatenate
+    blocks = 2000
+    buf    = RingBuffer(blocks * len(block))
+    start  = time.perf_counter()
+    for i in range(blocks):
+        buf.write(block)
+    ring_time = time.perf_counter() - start
+
+    audio = np.array([], dtype=np.int16)
+    start = time.perf_counter()
+    for i in range(blocks):
+        audio = np.concatenate((audio, block))
+    concat_time = time.perf_counter() - start
+
+    print("    {0} blocks: RingBuffer {1:.3f} s, np.concatenate {2:.3f} s".format(blocks, ring_time, concat_time))
+    print("Test Complete")
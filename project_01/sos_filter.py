@@ -0,0 +1,357 @@
+"""
+--------------------------------------------------------------------------
+SOS Filter
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+SOS Filter
+
+  Streaming band-pass filter for stethoscope audio.  Handling noise and low
+frequency rumble are removed before the recording is written, which also
+keeps them from stretching the waveform plots.
+
+  The filter is a digital Butterworth band-pass designed with the bilinear
+transform (no SciPy needed) and stored as second-order sections (SOS):
+each section is one transposed direct form II biquad,
+    y  = b0 * x + z1
+    z1 = b1 * x - a1 * y + z2
+    z2 = b2 * x - a2 * y
+and the two state values of every section are carried over between blocks.
+The state uses the same layout as scipy.signal.sosfilt's "zi".
+
+  An IIR filter is a recursion, so it cannot be vectorized sample by sample.
+Instead, the cascade is written as one state-space system and the signal is
+processed in sub-blocks of SUB_BLOCK samples:  the zero-state response of
+every sub-block is one matrix product with the (lower triangular) impulse
+response matrix, and only the state is stepped from sub-block to sub-block.
+The Python loop runs once per SUB_BLOCK samples instead of once per sample.
+
+  If SciPy is installed, scipy.signal.sosfilt() (compiled C) can be used
+instead; both give the same result and share the same state.  SciPy is only
+imported when a SciPy filter is created, because importing it takes about a
+second (much longer on the PocketBeagle) and the NumPy version is nearly as
+fast.
+
+Presets (low / high cut-off in Hz, Butterworth order):
+  - "heart":  25 - 400 Hz, heart sounds (S1 / S2, murmurs)
+  - "lung":   100 - 1000 Hz, breath sounds
+
+Software API:
+
+  SOSFilter(fs, low, high, order=2, backend="auto")
+    - backend:  "auto" (SciPy if installed), "scipy" or "numpy"
+    process(block)
+      - Filter one block (1D or (frames, 1)); int16 in -> int16 out
+        (clipped), float in -> float64 out
+    flush()
+      - Returns an empty block (no delayed samples; RecordingSink stage API)
+    reset()
+      - Clear the filter state
+    sos
+      - The (sections, 6) coefficients [b0, b1, b2, 1, a1, a2]
+
+  from_preset(name, fs, backend="auto")
+    - SOSFilter for "heart" or "lung"
+
+  butter_bandpass(low, high, fs, order=2)
+    - Band-pass SOS coefficients
+"""
+import math
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+PRESETS                     = {
+    "heart": (25.0, 400.0, 2),
+    "lung":  (100.0, 1000.0, 2),
+}
+
+SUB_BLOCK                   = 64         # Samples per state-space step
+INT16_MIN                   = -32768
+INT16_MAX                   = 32767
+
+BACKEND_AUTO                = "auto"
+BACKEND_SCIPY               = "scipy"
+BACKEND_NUMPY               = "numpy"
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def butter_bandpass(low, high, fs, order=2):
+    """ Butterworth band-pass as (order, 6) second-order sections """
+    if not (0 < low < high < fs / 2.0):
+        raise ValueError("Band edges must satisfy 0 < low < high < fs / 2")
+
+    # Pre-warped analog band edges
+    w_low  = 2.0 * fs * math.tan(math.pi * low / fs)
+    w_high = 2.0 * fs * math.tan(math.pi * high / fs)
+    w0     = math.sqrt(w_low * w_high)
+    bw     = w_high - w_low
+
+    # Low-pass prototype poles -> band-pass poles -> digital poles
+    k      = np.arange(order)
+    proto  = np.exp(1j * math.pi * (2 * k + order + 1) / (2.0 * order))
+    root   = np.sqrt((proto * bw) ** 2 - 4.0 * w0 ** 2 + 0j)
+    analog = np.concatenate(((proto * bw + root) / 2.0, (proto * bw - root) / 2.0))
+    poles  = (2.0 * fs + analog) / (2.0 * fs - analog)
+
+    # One conjugate pole pair per section; zeros at z = 1 and z = -1
+    upper  = poles[poles.imag > 0]
+    sos    = np.zeros((order, 6))
+    sos[:, 0] = 1.0
+    sos[:, 2] = -1.0
+    sos[:, 3] = 1.0
+    sos[:, 4] = -2.0 * upper.real
+    sos[:, 5] = np.abs(upper) ** 2
+
+    # Unity gain at the (pre-warped) center frequency, shared by the sections
+    z      = np.exp(1j * 2.0 * math.atan(w0 / (2.0 * fs)))
+    gain   = np.prod([np.polyval(s[2::-1], 1 / z) / np.polyval(s[5:2:-1], 1 / z) for s in sos])
+    sos[:, :3] /= abs(gain) ** (1.0 / order)
+
+    return sos
+
+# End def
+
+
+def _load_scipy():
+    """ scipy.signal.sosfilt, or None if SciPy is not installed """
+    try:
+        from scipy.signal import sosfilt
+    except ImportError:
+        return None
+    return sosfilt
+
+# End def
+
+
+def from_preset(name, fs, backend=BACKEND_AUTO):
+    """ SOSFilter for a named preset ("heart" or "lung") """
+    if name not in PRESETS:
+        raise ValueError("Unknown filter preset: {0}".format(name))
+    low, high, order = PRESETS[name]
+    return SOSFilter(fs, low, high, order, backend)
+
+# End def
+
+
+def _state_space(sos):
+    """ State-space (A, B, C, D) of a cascade of transposed direct form II sections """
+    n     = 2 * len(sos)
+    A     = np.zeros((n, n))
+    B     = np.zeros(n)
+    C_in  = np.zeros(n)                  # Input of the current section = C_in . z + D_in * x
+    D_in  = 1.0
+
+    for i, (b0, b1, b2, a0, a1, a2) in enumerate(sos):
+        idx     = slice(2 * i, 2 * i + 2)
+        b_sec   = np.array([b1 - a1 * b0, b2 - a2 * b0])
+        A[idx, idx] += np.array([[-a1, 1.0], [-a2, 0.0]])
+        A[idx, :]   += np.outer(b_sec, C_in)
+        B[idx]       = b_sec * D_in
+
+        # Output of this section (input of the next): z1 + b0 * input
+        C_in         = b0 * C_in
+        C_in[2 * i] += 1.0
+        D_in         = b0 * D_in
+
+    return A, B, C_in, D_in
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# SOS Filter Class
+# ------------------------------------------------------------------------
+
+class SOSFilter():
+    """ Block-by-block IIR filter (second-order sections) with carried state """
+
+    def __init__(self, fs, low, high, order=2, backend=BACKEND_AUTO):
+        """ Design the filter and precompute the sub-block matrices """
+        if backend not in (BACKEND_AUTO, BACKEND_SCIPY, BACKEND_NUMPY):
+            raise ValueError("Unknown backend: {0}".format(backend))
+
+        self._sosfilt = _load_scipy() if backend != BACKEND_NUMPY else None
+        if (backend == BACKEND_SCIPY) and (self._sosfilt is None):
+            raise ImportError("SciPy is not installed (use backend='numpy')")
+        if backend == BACKEND_AUTO:
+            backend = BACKEND_SCIPY if self._sosfilt is not None else BACKEND_NUMPY
+
+        self.fs      = fs
+        self.low     = low
+        self.high    = high
+        self.order   = order
+        self.backend = backend
+        self.sos     = butter_bandpass(low, high, fs, order)
+
+        A, B, C, D   = _state_space(self.sos)
+        size         = len(B)
+
+        # powers[k] = A^k for k = 0 .. SUB_BLOCK
+        powers       = [np.eye(size)]
+        for k in range(SUB_BLOCK):
+            powers.append(A @ powers[-1])
+        powers       = np.array(powers)
+
+        # Impulse response h[0] = D, h[k] = C A^(k-1) B
+        response     = np.concatenate(([D], (powers[:SUB_BLOCK - 1] @ B) @ C))
+        lags         = np.arange(SUB_BLOCK)[:, None] - np.arange(SUB_BLOCK)[None, :]
+
+        self._impulse = np.where(lags >= 0, response[np.maximum(lags, 0)], 0.0)  # y from x
+        self._observe = C @ powers[:SUB_BLOCK]                                   # y from state (rows C A^k)
+        self._input   = (powers[:SUB_BLOCK] @ B)[::-1]                           # state from x (A^(L-1-j) B)
+        self._powers  = powers                                                   # state from state
+
+        self.reset()
+
+    # End def
+
+    def reset(self):
+        """ Clear the filter state """
+        self.zi = np.zeros((len(self.sos), 2))
+
+    # End def
+
+    def process(self, block):
+        """ Filter one block; int16 in -> int16 out, float in -> float64 out """
+        block  = np.asarray(block).reshape(-1)
+        signal = block.astype(np.float64)
+
+        if self.backend == BACKEND_SCIPY:
+            output, self.zi = self._sosfilt(self.sos, signal, zi=self.zi)
+        else:
+            output = self._process_numpy(signal)
+
+        if np.issubdtype(block.dtype, np.integer):
+            return np.clip(np.rint(output), INT16_MIN, INT16_MAX).astype(np.int16)
+        return output
+
+    # End def
+
+    def _process_numpy(self, signal):
+        """ Sub-block state-space filter (NumPy only) """
+        state  = self.zi.reshape(-1).copy()
+        count  = len(signal)
+        full   = count - count % SUB_BLOCK
+        output = np.empty(count)
+
+        if full:
+            blocks  = signal[:full].reshape(-1, SUB_BLOCK)
+            forced  = blocks @ self._impulse.T               # Zero-state response of every sub-block
+            driven  = blocks @ self._input                   # State change from each sub-block's input
+            step    = self._powers[SUB_BLOCK]
+            states  = np.empty((len(blocks), len(state)))
+            for i in range(len(blocks)):
+                states[i] = state
+                state     = step @ state + driven[i]
+            output[:full] = (forced + states @ self._observe.T).reshape(-1)
+
+        rest = count - full
+        if rest:
+            tail          = signal[full:]
+            output[full:] = self._impulse[:rest, :rest] @ tail + self._observe[:rest] @ state
+            state         = self._powers[rest] @ state + self._input[SUB_BLOCK - rest:].T @ tail
+
+        self.zi = state.reshape(-1, 2)
+        return output
+
+    # End def
+
+    def flush(self):
+        """ No delayed samples to return """
+        return np.zeros(0, dtype=np.int16)
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+
+    print("SOSFilter Test")
+
+    rng    = np.random.default_rng(0)
+    signal = (rng.standard_normal(441000) * 4000).astype(np.int16)
+    sizes  = [1024, 1000, 37]            # Block sizes (not multiples of SUB_BLOCK too)
+
+    for preset in PRESETS:
+        fs       = 4000
+        low, high, order = PRESETS[preset]
+        numpy_f  = from_preset(preset, fs, backend=BACKEND_NUMPY)
+
+        # Blocks give the same result as one call; gain is 1 in the pass band
+        whole    = numpy_f.process(signal[:fs * 10].astype(np.float64))
+        numpy_f.reset()
+        parts    = []
+        position = 0
+        while position < len(whole):
+            size = sizes[len(parts) % len(sizes)]
+            parts.append(numpy_f.process(signal[position:min(position + size, len(whole))].astype(np.float64)))
+            position += size
+        assert np.allclose(np.concatenate(parts), whole, atol=1e-6)
+
+        t        = np.arange(fs) / fs
+        center   = math.sqrt(low * high)
+        numpy_f.reset()
+        tone     = numpy_f.process(np.sin(2 * np.pi * center * t))
+        assert abs(np.abs(tone[fs // 2:]).max() - 1.0) < 0.02
+
+        if _load_scipy() is not None:
+            scipy_f = from_preset(preset, fs, backend=BACKEND_SCIPY)
+            assert np.allclose(scipy_f.process(signal[:fs * 10].astype(np.float64)), whole, atol=1e-6)
+
+        print("    {0}: {1:.0f} - {2:.0f} Hz, {3} sections".format(preset, low, high, len(numpy_f.sos)))
+
+    # Throughput (samples / second) for 1024 sample blocks
+    for fs in (4000, 44100):
+        for backend in (BACKEND_NUMPY, BACKEND_SCIPY):
+            if (backend == BACKEND_SCIPY) and (_load_scipy() is None):
+                continue
+            sos_filter = from_preset("heart", fs, backend=backend)
+            start      = time.perf_counter()
+            for i in range(0, len(signal), 1024):
+                sos_filter.process(signal[i:i + 1024])
+            rate       = len(signal) / (time.perf_counter() - start)
+            print("    {0:5d} Hz {1:<5s}: {2:11,.0f} samples/s ({3:.0f}x real time)".format(
+                  fs, backend, rate, rate / fs))
+
+    print("Test Complete")
@@ -0,0 +1,295 @@
+"""
+--------------------------------------------------------------------------
+Spectrogram
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Spectrogram
+
+  Streaming short-time Fourier transform (STFT) of a recording, computed
+block by block while the recording is captured, so the spectrogram is ready
+as soon as the button is released instead of being computed over the whole
+array afterwards.
+
+  - The Hann window is computed once per FFT size and cached.
+  - Samples that do not fill a whole hop yet (the frame overlap) are carried
+    over to the next block in a preallocated buffer.
+  - The frames of a block are taken as a strided view (no copy), windowed
+    into a reused work buffer and transformed with one rfft call.  With
+    NumPy 2.0 or later the spectrum is written into a reused complex buffer
+    (the FFT itself still uses some scratch memory); older versions
+    allocate the spectrum of each block.
+  - Magnitudes are stored in dB in a preallocated array that grows by
+    doubling, so long recordings do not reallocate on every block.
+
+  The result is rendered to a PNG with render_spectrogram_png() and to the
+128x64 OLED with oled_raster.rasterize_spectrogram().
+
+Software API:
+
+  StreamingSTFT(fs, nfft=256, hop=64)
+    push_block(block)
+      - Add one block of audio (RecordingSink consumer API)
+    reset()
+      - Clear the spectrogram for a new recording
+    result()
+      - Return (times, freqs, magnitudes_db) copies; magnitudes_db has one
+        row per frame and one column per frequency bin
+
+  hann_window(nfft)
+    - Cached periodic Hann window
+
+  render_spectrogram_png(spectrogram, output_file, max_freq=None,
+                         figsize=(10, 4), dpi=100)
+    - Save a (times, freqs, magnitudes_db) result as a PNG
+"""
+import inspect
+import functools
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+import metrics
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+DEFAULT_NFFT                = 256
+DEFAULT_HOP                 = 64
+INITIAL_FRAMES              = 1024       # Rows preallocated for the result
+FLOOR_DB                    = -20.0      # dB value of a zero magnitude
+RANGE_DB                    = 60.0       # Dynamic range shown in the PNG
+
+RFFT_OUT                    = "out" in inspect.signature(np.fft.rfft).parameters   # NumPy >= 2.0
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=8)
+def hann_window(nfft):
+    """ Periodic Hann window (cached; do not modify the returned array) """
+    window = (0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(nfft) / nfft)).astype(np.float32)
+    window.setflags(write=False)
+    return window
+
+# End def
+
+
+def render_spectrogram_png(spectrogram, output_file, max_freq=None, figsize=(10, 4), dpi=100):
+    """ Save a spectrogram (times, freqs, magnitudes_db) as a PNG """
+    # Object-oriented API: no pyplot state, so this is safe on a worker thread
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    times, freqs, magnitudes = spectrogram
+    if len(times) == 0:
+        return None
+
+    with metrics.span("spectrogram_plot"):
+        figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(figure)
+        axes   = figure.add_subplot(1, 1, 1)
+
+        top    = float(magnitudes.max())
+        image  = axes.imshow(magnitudes.T, origin="lower", aspect="auto", cmap="magma",
+                             extent=(times[0], times[-1], freqs[0], freqs[-1]),
+                             vmin=top - RANGE_DB, vmax=top)
+        figure.colorbar(image, ax=axes, label="dB")
+        if max_freq is not None:
+            axes.set_ylim(0, max_freq)
+        axes.set_title("Spectrogram")
+        axes.set_xlabel("Time (s)")
+        axes.set_ylabel("Frequency (Hz)")
+        figure.tight_layout()
+
+    with metrics.span("spectrogram_savefig"):
+        figure.savefig(output_file)
+
+    return output_file
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Streaming STFT Class
+# ------------------------------------------------------------------------
+
+class StreamingSTFT():
+    """ Block-by-block STFT with carried overlap and reused buffers """
+
+    def __init__(self, fs, nfft=DEFAULT_NFFT, hop=DEFAULT_HOP):
+        """ Initialize variables and preallocate buffers """
+        if not (0 < hop <= nfft):
+            raise ValueError("hop must be between 1 and nfft")
+
+        self.fs     = fs
+        self.nfft   = nfft
+        self.hop    = hop
+        self.bins   = nfft // 2 + 1
+        self.window = hann_window(nfft)
+
+        # Window gain and int16 full scale folded into one dB offset
+        self._offset   = -20.0 * np.log10(self.window.sum() * 32768.0 / 2.0)
+        self._carry    = np.zeros(nfft, dtype=np.float32)
+        self._signal   = np.zeros(0, dtype=np.float32)
+        self._work     = np.zeros((0, nfft), dtype=np.float32)
+        self._spectrum = np.zeros((0, self.bins), dtype=np.complex64)
+        self._frames   = np.zeros((INITIAL_FRAMES, self.bins), dtype=np.float32)
+
+        self.reset()
+
+    # End def
+
+    def reset(self):
+        """ Clear the spectrogram """
+        self._carried = 0                # Samples waiting in _carry
+        self.frames   = 0
+
+    # End def
+
+    def _buffer(self, name, shape):
+        """ Reuse a work buffer, growing it if it is too small """
+        buffer = getattr(self, name)
+        if buffer.shape[0] < shape[0]:
+            buffer = np.zeros((max(shape[0], 2 * buffer.shape[0]),) + shape[1:], dtype=buffer.dtype)
+            setattr(self, name, buffer)
+        return buffer[:shape[0]]
+
+    # End def
+
+    def push_block(self, block):
+        """ Add one block of audio """
+        samples = np.asarray(block).reshape(-1)
+        total   = self._carried + len(samples)
+
+        signal  = self._buffer("_signal", (total,))
+        signal[:self._carried] = self._carry[:self._carried]
+        signal[self._carried:] = samples
+
+        if total < self.nfft:
+            self._carry[:total] = signal
+            self._carried       = total
+            return
+
+        # Frames start every hop samples; the rest is carried over
+        count   = (total - self.nfft) // self.hop + 1
+        step    = signal.strides[0]
+        frames  = as_strided(signal, shape=(count, self.nfft), strides=(self.hop * step, step),
+                             writeable=False)
+        work    = self._buffer("_work", (count, self.nfft))
+        np.multiply(frames, self.window, out=work)
+
+        output  = self._rows(count)
+        if RFFT_OUT:
+            spectrum = np.fft.rfft(work, axis=1, out=self._buffer("_spectrum", (count, self.bins)))
+        else:
+            spectrum = np.fft.rfft(work, axis=1)
+        np.abs(spectrum, out=output, casting="unsafe")
+        np.maximum(output, 10.0 ** (FLOOR_DB / 20.0), out=output)
+        np.log10(output, out=output)
+        output *= 20.0
+        output += self._offset
+
+        used          = count * self.hop
+        self._carried = total - used
+        self._carry[:self._carried] = signal[used:]
+
+    # End def
+
+    def _rows(self, count):
+        """ Next count rows of the result array (grown by doubling) """
+        needed = self.frames + count
+        if needed > len(self._frames):
+            grown = np.zeros((max(needed, 2 * len(self._frames)), self.bins), dtype=np.float32)
+            grown[:self.frames] = self._frames[:self.frames]
+            self._frames = grown
+
+        rows         = self._frames[self.frames:needed]
+        self.frames  = needed
+        return rows
+
+    # End def
+
+    def result(self):
+        """ Return copies of (times, freqs, magnitudes_db) """
+        times = (np.arange(self.frames) * self.hop + self.nfft / 2.0) / self.fs
+        freqs = np.arange(self.bins) * self.fs / self.nfft
+        return times, freqs, self._frames[:self.frames].copy()
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+    import tempfile
+    import os
+
+    print("StreamingSTFT Test")
+
+    fs     = 4000
+    t      = np.arange(fs * 60) / fs
+    chirp  = (10000 * np.sin(2 * np.pi * (50 + 15 * t) * t)).astype(np.int16)
+
+    stft   = StreamingSTFT(fs)
+    start  = time.perf_counter()
+    for i in range(0, len(chirp), 1000):
+        stft.push_block(chirp[i:i + 1000])
+    elapsed = time.perf_counter() - start
+    times, freqs, streamed = stft.result()
+
+    # Same frames as a one-shot STFT of the whole recording
+    signal = chirp.astype(np.float32)
+    frames = as_strided(signal, shape=((len(signal) - stft.nfft) // stft.hop + 1, stft.nfft),
+                        strides=(stft.hop * signal.strides[0], signal.strides[0]))
+    whole  = np.abs(np.fft.rfft(frames * stft.window, axis=1))
+    whole  = 20.0 * np.log10(np.maximum(whole, 10.0 ** (FLOOR_DB / 20.0))) + stft._offset
+    assert streamed.shape == whole.shape
+    assert np.allclose(streamed, whole, atol=1e-3)
+
+    peak = freqs[np.argmax(streamed[len(times) // 2])]
+    print("    {0} frames x {1} bins, {2:.1f} ms for 60 s ({3:.0f} us per 1000 sample block)".format(
+          len(times), len(freqs), elapsed * 1000.0, elapsed * 1e6 / (len(chirp) / 1000)))
+    print("    Peak at {0:.1f} s: {1:.0f} Hz (expected {2:.0f} Hz)".format(
+          times[len(times) // 2], peak, 50 + 30 * times[len(times) // 2]))
+
+    path = os.path.join(tempfile.mkdtemp(), "spectrogram.png")
+    render_spectrogram_png(stft.result(), path)
+    print("    Saved {0}".format(path))
+    print("Test Complete")
@@ -0,0 +1,231 @@
+"""
+--------------------------------------------------------------------------
+Startup Timing
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Startup Timing
+
+  Helpers to get the stethoscope to its "Press button" screen as quickly as
+possible and to measure where startup time goes.
+
+  - StartupTimer records how long each import / setup step takes, measured
+    from the moment the timer is created (normally the first line of the
+    script).  report() prints the breakdown plus the boot-to-ready time.
+  - WarmUp imports the heavy modules (NumPy, sounddevice, matplotlib, ...) on
+    a background thread while the main thread brings up GPIO and the display.
+    Once imported, modules are cached in sys.modules, so a later "import numpy"
+    in the main thread is instant.
+
+Software API:
+
+  StartupTimer()
+    import_module(name)
+      - Import and return a module, recording the time it took
+    call(label, function, *args, **kwargs)
+      - Call a function (e.g. a loader), recording the time it took
+    mark(label)
+      - Record a named step ending now
+    warm_up(names)
+      - Start a WarmUp thread importing the given modules; returns the WarmUp
+    report()
+      - Print the timing breakdown
+
+  WarmUp(timer, names)
+    join(timeout=None)
+      - Wait for the warm-up imports to finish.  Re-raises an import error.
+"""
+import time
+import threading
+import importlib
+
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def process_age():
+    """ Seconds since this process was started (Linux only; None elsewhere) """
+    try:
+        import os
+        with open("/proc/self/stat") as f:
+            # Field 22 (after the ")" ending the command name is field 3)
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Startup Timer Class
+# ------------------------------------------------------------------------
+
+class StartupTimer():
+    """ Records the duration of each startup step """
+
+    def __init__(self):
+        """ Start timing now """
+        self.start        = time.perf_counter()
+        self.start_offset = process_age()      # Interpreter start -> timer creation
+        self.steps        = []                 # (label, seconds, thread name)
+        self._last        = self.start
+        self._lock        = threading.Lock()
+
+    # End def
+
+    def _record(self, label, seconds):
+        with self._lock:
+            self.steps.append((label, seconds, threading.current_thread().name))
+
+    # End def
+
+    def call(self, label, function, *args, **kwargs):
+        """ Call a function, recording how long it took """
+        start  = time.perf_counter()
+        result = function(*args, **kwargs)
+        end    = time.perf_counter()
+        self._record(label, end - start)
+
+        # Keep the next mark() from counting this step again
+        if threading.current_thread() is threading.main_thread():
+            self._last = end
+
+        return result
+
+    # End def
+
+    def import_module(self, name):
+        """ Import a module, recording how long it took """
+        return self.call("import " + name, importlib.import_module, name)
+
+    # End def
+
+    def mark(self, label):
+        """ Record a step that ended now (measured from the previous mark) """
+        now = time.perf_counter()
+        self._record(label, now - self._last)
+        self._last = now
+
+    # End def
+
+    def elapsed(self):
+        """ Seconds since the timer was created """
+        return time.perf_counter() - self.start
+
+    # End def
+
+    def warm_up(self, names):
+        """ Import the given modules on a background thread """
+        return WarmUp(self, names)
+
+    # End def
+
+    def report(self, label="ready"):
+        """ Print the startup timing breakdown """
+        print("Startup timing:")
+        with self._lock:
+            steps = list(self.steps)
+        for step, seconds, thread in steps:
+            where = "" if thread == "MainThread" else " [{0}]".format(thread)
+            print("    {0:<40s} {1:7.3f} s{2}".format(step, seconds, where))
+
+        total = self.elapsed()
+        print("    {0:<40s} {1:7.3f} s".format("script start -> " + label, total))
+        if self.start_offset is not None:
+            print("    {0:<40s} {1:7.3f} s".format("process start -> " + label, total + self.start_offset))
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Warm Up Class
+# ------------------------------------------------------------------------
+
+class WarmUp():
+    """ Import modules on a background thread """
+
+    def __init__(self, timer, names):
+        """ Start importing the modules """
+        self.timer   = timer
+        self.names   = list(names)
+        self.error   = None
+        self._thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+        self._thread.start()
+
+    # End def
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            for name in self.names:
+                self.timer.import_module(name)
+        except Exception as e:
+            self.error = e
+        self.timer._record("warm-up total", time.perf_counter() - start)
+
+    # End def
+
+    def is_done(self):
+        """ Return True once all imports have finished """
+        return not self._thread.is_alive()
+
+    # End def
+
+    def join(self, timeout=None):
+        """ Wait for the imports; re-raise any import error """
+        self._thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    timer   = StartupTimer()
+    warm_up = timer.warm_up(["numpy", "matplotlib.figure", "matplotlib.backends.backend_agg"])
+    timer.import_module("json")
+    timer.mark("setup")
+    timer.report("main thread ready")
+
+    warm_up.join()
+    timer.report("warm-up done")
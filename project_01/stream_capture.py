@@ -0,0 +1,198 @@
+"""
+--------------------------------------------------------------------------
+Stream Capture
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Stream Capture
+
+  Continuous, gapless audio capture using a sounddevice.InputStream.  The
+stream is opened once and PortAudio calls the audio callback for every block,
+so no samples are lost while the consumer is busy (e.g. plotting).
+
+  The callback only copies the block into a preallocated slot and appends the
+slot index to a collections.deque.  deque.append() / deque.popleft() are atomic
+in CPython, so the producer (audio thread) and consumer (main loop) never take
+a lock.  If the consumer falls behind by more than "max_blocks" blocks the new
+block is dropped and counted instead of blocking the audio thread.
+
+Counters:
+  - blocks_captured:   Blocks delivered by the audio callback
+  - blocks_dropped:    Blocks discarded because the queue was full
+  - blocks_overflowed: Callbacks that reported an input overflow from PortAudio
+
+Software API:
+
+  StreamCapture(fs=44100, block_size=2048, device=None, channels=1,
+                dtype='int16', max_blocks=64)
+
+    start() / stop()
+      - Open and start / stop and close the input stream
+
+    get_block(timeout=None)
+      - Return the next block as a 1D array (a copy), or None on timeout
+
+    pending()
+      - Number of blocks waiting in the queue
+"""
+import time
+import collections
+
+import numpy as np
+import sounddevice as sd
+
+import metrics
+
+
+# ------------------------------------------------------------------------
+# Stream Capture Class
+# ------------------------------------------------------------------------
+
+class StreamCapture():
+    """ Gapless callback-driven audio capture """
+
+    def __init__(self, fs=44100, block_size=2048, device=None, channels=1,
+                       dtype='int16', max_blocks=64):
+        """ Initialize variables and preallocate block storage """
+        self.fs         = fs
+        self.block_size = block_size
+        self.device     = device
+        self.channels   = channels
+        self.dtype      = dtype
+        self.max_blocks = max_blocks
+
+        self.blocks_captured   = 0
+        self.blocks_dropped    = 0
+        self.blocks_overflowed = 0
+
+        # One extra slot so the block being read is never overwritten
+        self._slots  = np.zeros((max_blocks + 1, block_size * channels), dtype=dtype)
+        self._next   = 0
+        self._queue  = collections.deque()
+        self._stream = None
+
+    # End def
+
+    def _callback(self, indata, frames, time_info, status):
+        """ Called by sounddevice (audio thread) for every block """
+        if status and status.input_overflow:
+            self.blocks_overflowed += 1
+            metrics.count("input_overflows")
+
+        if len(self._queue) >= self.max_blocks:
+            self.blocks_dropped += 1
+            metrics.count("blocks_dropped")
+            return
+
+        slot = self._next
+        self._next = (slot + 1) % len(self._slots)
+
+        count = frames * self.channels
+        self._slots[slot, :count] = indata.reshape(-1)
+        self._queue.append((slot, count))
+        self.blocks_captured += 1
+        metrics.count("blocks_captured")
+
+    # End def
+
+    def start(self):
+        """ Open and start the input stream """
+        self._stream = sd.InputStream(
+            samplerate=self.fs,
+            blocksize=self.block_size,
+            device=self.device,
+            channels=self.channels,
+            dtype=self.dtype,
+            callback=self._callback
+        )
+        self._stream.start()
+
+    # End def
+
+    def stop(self):
+        """ Stop and close the input stream """
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    # End def
+
+    def pending(self):
+        """ Number of blocks waiting to be read """
+        return len(self._queue)
+
+    # End def
+
+    def get_block(self, timeout=None):
+        """ Return the next captured block, or None if none arrives in time """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        poll     = self.block_size / self.fs / 4
+
+        while not self._queue:
+            if (deadline is not None) and (time.monotonic() >= deadline):
+                return None
+            time.sleep(poll)
+
+        slot, count = self._queue.popleft()
+        return self._slots[slot, :count].copy()
+
+    # End def
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("StreamCapture Test")
+
+    capture = StreamCapture(device='hw:1,0')
+
+    with capture:
+        for i in range(50):
+            block = capture.get_block(timeout=1.0)
+            if block is None:
+                print("    Timeout waiting for audio")
+                break
+
+    print("    Captured = {0}, Dropped = {1}, Overflowed = {2}".format(
+          capture.blocks_captured, capture.blocks_dropped, capture.blocks_overflowed))
+    print("Test Complete")
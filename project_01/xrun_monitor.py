@@ -0,0 +1,315 @@
+"""
+--------------------------------------------------------------------------
+Xrun Monitor
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Daniel Gutierrez
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Xrun Monitor
+
+  Records audio callback problems (input overflows / underflows and gaps in
+the stream) without doing any slow work in the callback.  The previous
+callbacks printed the status flags, which is itself a slow call made from the
+real-time audio thread.
+
+  on_callback() is called at the start of every audio callback.  It:
+    - counts blocks and samples (the sample position in the recording)
+    - checks the sounddevice status flags (input_overflow / input_underflow)
+    - compares the ADC time of the block with the end of the previous block;
+      when samples are missing, a gap is recorded and the number of missing
+      samples is returned so the caller can pad the recording with silence
+      (this keeps the timing of the rest of the recording correct)
+    - tracks the longest time between callbacks
+
+  Events are written into preallocated arrays (time, sample position, flags,
+missing samples); nothing is allocated or printed in the callback.  After the
+recording, report() gives a short health summary and save() writes the
+summary and event list as JSON next to the recording, so block size / latency
+settings can be tuned from real data.
+
+Software API:
+
+  XrunMonitor(fs, max_events=64)
+    reset()
+      - Clear all counters (call before each recording)
+    on_callback(frames, time_info, status)
+      - Record one callback; returns the number of missing samples (0 if none)
+    intact
+      - True if no overflow, underflow or gap was recorded
+    events()
+      - List of recorded events (dicts)
+    summary()
+      - Health summary as a dict
+    report()
+      - Health summary as a printable string
+    save(path)
+      - Write the summary (with events) as JSON
+"""
+import json
+import time
+
+import numpy as np
+
+import metrics
+
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+FLAG_INPUT_OVERFLOW         = 0x01
+FLAG_INPUT_UNDERFLOW        = 0x02
+FLAG_GAP                    = 0x04
+
+FLAG_NAMES                  = [(FLAG_INPUT_OVERFLOW,  "input_overflow"),
+                               (FLAG_INPUT_UNDERFLOW, "input_underflow"),
+                               (FLAG_GAP,             "gap")]
+
+DEFAULT_MAX_EVENTS          = 64
+REPORT_EVENTS               = 5          # Events listed by report()
+
+
+# ------------------------------------------------------------------------
+# Xrun Monitor Class
+# ------------------------------------------------------------------------
+
+class XrunMonitor():
+    """ Records overflow / underflow / gap events from an audio callback """
+
+    def __init__(self, fs, max_events=DEFAULT_MAX_EVENTS):
+        """ Preallocate the event arrays """
+        self.fs         = fs
+        self.max_events = max_events
+
+        self._event_time     = np.zeros(max_events, dtype=np.float64)
+        self._event_position = np.zeros(max_events, dtype=np.int64)
+        self._event_flags    = np.zeros(max_events, dtype=np.uint8)
+        self._event_missing  = np.zeros(max_events, dtype=np.int64)
+
+        self.reset()
+
+    # End def
+
+    def reset(self):
+        """ Clear all counters and events """
+        self.blocks           = 0
+        self.samples          = 0        # Sample position, including padded gaps
+        self.input_overflows  = 0
+        self.input_underflows = 0
+        self.gaps             = 0
+        self.missing_samples  = 0
+        self.events_lost      = 0        # Events after the arrays were full
+        self.min_frames       = 0
+        self.max_frames       = 0
+        self.max_interval     = 0.0      # Longest time between callbacks (s)
+
+        self._count      = 0
+        self._start      = None
+        self._last_call  = None
+        self._next_adc   = None
+
+    # End def
+
+    def on_callback(self, frames, time_info, status):
+        """ Record one audio callback; return the number of missing samples """
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+            self.min_frames = frames
+        else:
+            self.max_interval = max(self.max_interval, now - self._last_call)
+        self._last_call = now
+
+        flags   = 0
+        missing = 0
+
+        if status:
+            if getattr(status, "input_overflow", False):
+                flags |= FLAG_INPUT_OVERFLOW
+                self.input_overflows += 1
+            if getattr(status, "input_underflow", False):
+                flags |= FLAG_INPUT_UNDERFLOW
+                self.input_underflows += 1
+
+        # Samples missing between the end of the last block and this one
+        # (some drivers report an ADC time of 0; gaps are not detected then)
+        adc = getattr(time_info, "inputBufferAdcTime", 0.0) if time_info is not None else 0.0
+        if adc:
+            if self._next_adc is not None:
+                missing = int(round((adc - self._next_adc) * self.fs))
+                if missing < (frames // 2):
+                    missing = 0          # Timestamp jitter, not a gap
+            self._next_adc = adc + frames / self.fs
+
+        if missing:
+            flags |= FLAG_GAP
+            self.gaps            += 1
+            self.missing_samples += missing
+
+        if flags:
+            self._record(now, flags, missing)
+
+        self.blocks     += 1
+        self.samples    += missing + frames
+        self.min_frames  = min(self.min_frames, frames)
+        self.max_frames  = max(self.max_frames, frames)
+
+        return missing
+
+    # End def
+
+    def _record(self, now, flags, missing):
+        """ Store one event in the preallocated arrays """
+        if flags & FLAG_INPUT_OVERFLOW:
+            metrics.count("input_overflows")
+        if flags & FLAG_INPUT_UNDERFLOW:
+            metrics.count("input_underflows")
+        if missing:
+            metrics.count("gap_samples", missing)
+
+        i = self._count
+        if i >= self.max_events:
+            self.events_lost += 1
+            return
+
+        self._event_time[i]     = now - self._start
+        self._event_position[i] = self.samples
+        self._event_flags[i]    = flags
+        self._event_missing[i]  = missing
+        self._count += 1
+
+    # End def
+
+    @property
+    def intact(self):
+        """ True if no overflow, underflow or gap was recorded """
+        return (self.input_overflows + self.input_underflows + self.gaps) == 0
+
+    # End def
+
+    def events(self):
+        """ Return the recorded events as a list of dicts """
+        return [{
+                    "time_s":     float(self._event_time[i]),
+                    "position_s": float(self._event_position[i]) / self.fs,
+                    "position":   int(self._event_position[i]),
+                    "flags":      [name for flag, name in FLAG_NAMES if self._event_flags[i] & flag],
+                    "missing":    int(self._event_missing[i]),
+                } for i in range(self._count)]
+
+    # End def
+
+    def summary(self):
+        """ Return the recording health summary as a dict """
+        return {
+            "intact":           self.intact,
+            "fs":               self.fs,
+            "blocks":           self.blocks,
+            "samples":          self.samples,
+            "duration_s":       self.samples / self.fs,
+            "input_overflows":  self.input_overflows,
+            "input_underflows": self.input_underflows,
+            "gaps":             self.gaps,
+            "missing_samples":  self.missing_samples,
+            "events_lost":      self.events_lost,
+            "block_frames":     [self.min_frames, self.max_frames],
+            "max_interval_ms":  self.max_interval * 1000.0,
+            "events":           self.events(),
+        }
+
+    # End def
+
+    def report(self):
+        """ Return the recording health summary as a printable string """
+        block_ms = 1000.0 * self.max_frames / self.fs
+        lines    = ["Recording health: {0} ({1} blocks, {2:.2f} s)".format(
+                        "OK" if self.intact else "DAMAGED", self.blocks, self.samples / self.fs),
+                    "    overflows {0}, underflows {1}, gaps {2} ({3} samples padded)".format(
+                        self.input_overflows, self.input_underflows, self.gaps, self.missing_samples),
+                    "    callback interval max {0:.1f} ms (block {1:.1f} ms)".format(
+                        self.max_interval * 1000.0, block_ms)]
+
+        for event in self.events()[:REPORT_EVENTS]:
+            lines.append("    {0:8.3f} s: {1}{2}".format(
+                         event["position_s"], " + ".join(event["flags"]),
+                         " ({0} samples missing)".format(event["missing"]) if event["missing"] else ""))
+        hidden = self._count + self.events_lost - REPORT_EVENTS
+        if hidden > 0:
+            lines.append("    ... {0} more events".format(hidden))
+
+        return "\n".join(lines)
+
+    # End def
+
+    def save(self, path):
+        """ Write the health summary (with events) as JSON """
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import types
+
+    print("XrunMonitor Test")
+
+    fs      = 44100
+    frames  = 1024
+    monitor = XrunMonitor(fs)
+
+    # 100 blocks; block 40 is lost (overflow reported on the next block)
+    adc = 0.0
+    for i in range(100):
+        if i == 40:
+            adc += frames / fs
+            continue
+        status = types.SimpleNamespace(input_overflow=(i == 41), input_underflow=False)
+        monitor.on_callback(frames, types.SimpleNamespace(inputBufferAdcTime=adc + 1.0),
+                                      status if status.input_overflow else None)
+        adc += frames / fs
+
+    print(monitor.report())
+    assert monitor.gaps == 1 and monitor.missing_samples == frames
+    assert monitor.samples == 100 * frames
+
+    loops = 100000
+    monitor.reset()
+    start = time.perf_counter()
+    for i in range(loops):
+        monitor.on_callback(frames, None, None)
+    print("    on_callback: {0:.0f} ns per call".format((time.perf_counter() - start) / loops * 1e9))
+
+    print("Test Complete")
@@ -43,10 +43,24 @@ button is not pressed) and will be connected to power when the button is pressed
 
   To select the pull up configuration, press_low=True.  To select the pull down
 configuration, press_low=False.
+
+  When project_01 is on the PYTHONPATH, GPIO is loaded through hw_backend.py:
+set EDES301_BACKEND=sim to run without a PocketBeagle (GPIO then comes from the
+hardware simulator, hw_sim.py, and the button follows the EDES301_SIM_PRESSES
+script, e.g. "1.0:0.5,3.0:2.5").  Otherwise Adafruit_BBIO.GPIO is used.
 """
 
 import time
-import Adafruit_BBIO.GPIO as GPIO
+
+try:
+    import hw_backend           # project_01 (simulator support)
+except ImportError:
+    hw_backend = None
+
+if hw_backend is not None:
+    GPIO = hw_backend.load_gpio()
+else:
+    import Adafruit_BBIO.GPIO as GPIO
 
 # ------------------------------------------------------------------------
 # Constants
@@ -59,6 +59,17 @@ Uses:
   - HT16K33 display library developed in class
     - Library updated to add "set_digit_raw()", "set_colon()"
 
+Simulation:
+  - With EDES301_BACKEND=sim (and project_01 on the PYTHONPATH) the button
+    driver uses the simulated GPIO from hw_sim.py, so the lock logic can be
+    run off the PocketBeagle with a scripted button (EDES301_SIM_PRESSES).
+  - Only the button is simulated.  The potentiometer, servo and LED drivers
+    are not part of this tree and still need their own Adafruit_BBIO.ADC /
+    Adafruit_BBIO.PWM setup; hw_backend.load_adc() / load_pwm() return
+    hw_sim stand-ins for drivers that load those modules through it.  The
+    HT16K33 display falls back to i2cset commands when /dev/i2c-<bus> is
+    not available.
+
 """
 import time
 
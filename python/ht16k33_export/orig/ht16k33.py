@@ -33,10 +33,31 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 --------------------------------------------------------------------------
 Software API:
 
-  HT16K33(bus, address=0x70)
+  HT16K33(bus, address=0x70, blink=HT16K33_BLINK_OFF,
+          brightness=HT16K33_BRIGHTNESS_HIGHEST, transport="device",
+          asynchronous=False, max_rate=ASYNC_MAX_RATE)
     - Provide i2c bus that dispaly is on
     - Provide i2c address for the display
-    
+    - transport:
+        "device"  - Open /dev/i2c-<bus> once and write to it directly
+                    (falls back to "command" if the device cannot be opened)
+        "command" - Run one i2cset process per write (slow; for debugging)
+    - asynchronous:
+        False     - Each change is written before the call returns
+        True      - Changes are posted to a writer thread and the call
+                    returns straight away.  Only the latest frame is kept;
+                    the thread sends it at most max_rate times per second
+                    and frames replaced before they were sent are dropped.
+                    Blink / brightness commands are queued with the frames,
+                    so all bus writes are made by the writer thread, in order.
+    - frames_requested / frames_written / frames_dropped count the frames
+      flushed by the caller, sent to the display, and replaced by a newer
+      frame before they were sent (asynchronous mode only)
+
+    close()
+      - Send any pending frame, stop the writer thread and close the
+        I2C device
+
     clear()
       - Sets value of display to "0000"
     
@@ -53,7 +74,65 @@ Software API:
       - Update the value on the display with text.
         The following characters are supported:
             "abcdefghijlnopqrstuyABCDEFGHIJLNOPQRSTUY? -"
-  
+
+    write_frame(frame, force=False)
+      - Show a 16 byte display RAM image (force=True: send all 16
+        bytes).  blank(), clear(), update() and text() change the whole
+        display with one write_frame() instead of one write per digit.
+
+    flush(force=False)
+      - The driver keeps a shadow copy of the display RAM.  Changes are sent
+        as one block write covering only the changed bytes, or not at all if
+        nothing changed.  This is done automatically after each change
+        (outside batch()); force=True rewrites the whole display RAM.
+
+    batch()
+      - Context manager: changes made inside the "with" block are sent in
+        one flush() at the end
+
+  make_frame(digits, colon=False)
+    - Return the 16 byte display RAM image for up to 4 raw digit values
+      (segments + POINT_VALUE) and the colon
+
+  number_frame(value, colon=False)
+    - Return the frame for a value 0 - 9999 from the tables precomputed at
+      import time (NUMBER_FRAMES / NUMBER_FRAMES_COLON)
+
+  text_frame(value)
+    - Return the frame for 1 - 4 characters of text (LRU cached)
+
+  Animations (all frames / commands are computed when the animation is
+  created; play them with HT16K33.play()):
+
+    marquee(value, fps=MARQUEE_FPS)
+      - Scroll text of any length across the display from right to left
+
+    blink(frame, rate=HT16K33_BLINK_2HZ, duration=2.0)
+      - Show frame with the display's hardware blinking for duration seconds
+
+    fade(frame, fps=FADE_FPS, fade_in=False)
+      - Show frame and step the brightness down to the darkest level
+        (or up to the highest level if fade_in is True)
+
+    The blink rate and brightness set with set_blink() / set_brightness()
+    are restored when an animation that changes them has finished.
+
+  HT16K33 (continued)
+
+    set_blink(rate)
+      - Set the hardware blink rate (HT16K33_BLINK_OFF / _2HZ / _1HZ / _HALFHZ)
+
+    set_brightness(level)
+      - Set the brightness (0 - 15)
+
+    play(animation, repeat=1)
+      - Play an animation; returns the number of steps skipped.  Step i is
+        shown at start + i / fps for 1 / fps seconds, so play() returns at
+        start + steps / fps (absolute deadlines, so timing does not
+        drift with I2C latency); a step is skipped if the next one is
+        already due, or (asynchronous mode) if the writer thread replaced
+        it before sending it.
+
 --------------------------------------------------------------------------
 Background Information: 
  
@@ -72,9 +151,26 @@ Background Information:
     * Letters Supported from:
         * https://en.wikichip.org/wiki/seven-segment_display/representing_letters
         * https://en.wikipedia.org/wiki/Seven-segment_display_character_representations
-        
+
+  * I2C transport:
+    * Each i2cset call forks a shell and a process (tens of ms per write,
+      five writes for blank()).  Instead /dev/i2c-<bus> is opened once, the
+      I2C_SLAVE ioctl selects the display address, and each write() on the
+      file descriptor is one I2C transaction (~0.1 - 0.3 ms at 100 kHz).
+    * https://www.kernel.org/doc/Documentation/i2c/dev-interface
+
+    * Benchmark encoding (encodes per second) and both transports on the
+      PocketBeagle (updates per second):
+        python3 ht16k33.py benchmark
+
 """
 import os
+import time
+import fcntl
+import functools
+import threading
+import contextlib
+import collections
 
 
 # ------------------------------------------------------------------------
@@ -134,6 +230,22 @@ POINT_VALUE                 = 0x80
 
 DIGIT_ADDR                  = [0x00, 0x02, 0x06, 0x08]
 COLON_ADDR                  = 0x04
+COLON_ON                    = 0x02
+COLON_OFF                   = 0x00
+
+# Display RAM (16 bytes, written in one transaction starting at address 0x00)
+DISPLAY_RAM_ADDR            = 0x00
+DISPLAY_RAM_SIZE            = 16
+
+# Number of text() frames kept by text_frame()
+TEXT_FRAME_CACHE_SIZE       = 256
+
+# Asynchronous mode: maximum frames per second sent by the writer thread
+ASYNC_MAX_RATE              = 50
+
+# Default animation speeds (steps per second)
+MARQUEE_FPS                 = 4
+FADE_FPS                    = 16
 
 HT16K33_BLINK_CMD           = 0x80
 HT16K33_BLINK_DISPLAYON     = 0x01
@@ -152,44 +264,347 @@ HT16K33_BRIGHTNESS_DARKEST  = 0x00
 # Maximum decimal value that can be displayed on 4 digit Hex Display
 HT16K33_MAX_VALUE           = 9999
 
+# I2C transport
+I2C_DEVICE                  = "/dev/i2c-{0}"
+I2C_COMMAND                 = "/usr/sbin/i2cset -y {0} 0x{1:x}"
+I2C_SLAVE                   = 0x0703     # ioctl from <linux/i2c-dev.h>
+
+TRANSPORT_DEVICE            = "device"
+TRANSPORT_COMMAND           = "command"
+
 
 # ------------------------------------------------------------------------
 # Functions / Classes
 # ------------------------------------------------------------------------
+def make_frame(digits, colon=False):
+    """Return the 16 byte display RAM image for the display
+
+    :param digits: Raw segment values (incl. POINT_VALUE) of up to 4 digits,
+                   left to right
+    :param colon:  True to turn on the colon
+    """
+    frame = bytearray(DISPLAY_RAM_SIZE)
+
+    for addr, data in zip(DIGIT_ADDR, digits):
+        frame[addr] = data
+
+    if colon:
+        frame[COLON_ADDR] = COLON_ON
+
+    return bytes(frame)
+
+# End def
+
+
+def _number_frames(colon=False):
+    """Return the frames of all values 0 - 9999 packed into one bytes object
+
+    The frame of value v is frames[16 * v:16 * (v + 1)].  Each digit address
+    is filled for all values at once with an extended slice, so this takes
+    well under a millisecond.
+    """
+    count  = HT16K33_MAX_VALUE + 1
+    frames = bytearray(DISPLAY_RAM_SIZE * count)
+
+    for position, addr in enumerate(DIGIT_ADDR):
+        # Number of consecutive values that show the same digit here
+        repeat = 10 ** (len(DIGIT_ADDR) - 1 - position)
+        column = b"".join(bytes([HEX_DIGITS[d]]) * repeat for d in range(10))
+        frames[addr::DISPLAY_RAM_SIZE] = column * (count // len(column))
+
+    if colon:
+        frames[COLON_ADDR::DISPLAY_RAM_SIZE] = bytes([COLON_ON]) * count
+
+    return bytes(frames)
+
+# End def
+
+
+# Precomputed frames of all values 0 - 9999 (160 kB each)
+NUMBER_FRAMES               = _number_frames(colon=False)
+NUMBER_FRAMES_COLON         = _number_frames(colon=True)
+
+
+def number_frame(value, colon=False):
+    """Return the frame showing value (0 - 9999, with leading zeros)
+
+    Will throw a ValueError if number is not between 0 and 9999.
+    """
+    if ((value < 0) or (value > HT16K33_MAX_VALUE)):
+        raise ValueError("Value must be between 0 and {0}".format(HT16K33_MAX_VALUE))
+
+    # Accept any number (e.g. 12.0 from a calculation); fractions are dropped
+    start = int(value) * DISPLAY_RAM_SIZE
+
+    if colon:
+        return NUMBER_FRAMES_COLON[start:start + DISPLAY_RAM_SIZE]
+    else:
+        return NUMBER_FRAMES[start:start + DISPLAY_RAM_SIZE]
+
+# End def
+
+
+@functools.lru_cache(maxsize=TEXT_FRAME_CACHE_SIZE)
+def text_frame(value):
+    """Return the frame showing 1 - 4 characters of text, left aligned
+
+    Frames are cached, so showing the same text again is a dictionary lookup.
+
+    Will throw a ValueError if there are not the appropriate number of 
+    characters or if characters are used that are not supported.
+    """
+    if ((len(value) < 1) or (len(value) > 4)):
+        raise ValueError("Must have between 1 and 4 characters")
+
+    # Translate the characters into the values needed for hex display
+    # (unused digits on the right are blank)
+    digits = []
+    for char in value:
+        try:
+            digits.append(LETTERS[char])
+        except KeyError:
+            raise ValueError("Character {0} not supported".format(char))
+
+    return make_frame(digits)
+
+# End def
+
+
+class Animation():
+    """ Class to hold the precomputed steps of a display animation """
+    # Class variables
+    steps    = None     # List of (frame, command); command is a byte or None
+    fps      = None
+    commands = False    # True if any step sends a command
+
+    def __init__(self, steps, fps):
+        """ Each step shows a frame and then sends an optional command """
+        if (len(steps) == 0) or (fps <= 0):
+            raise ValueError("Animation needs at least one step and fps > 0")
+
+        self.steps    = list(steps)
+        self.fps      = fps
+        self.commands = any(command is not None for frame, command in self.steps)
+
+    # End def
+
+
+    def duration(self):
+        """Return the play time in seconds (each step is shown for 1 / fps)"""
+        return len(self.steps) / self.fps
+
+    # End def
+
+# End class
+
+
+def marquee(value, fps=MARQUEE_FPS):
+    """Return an Animation scrolling text of any length across the display
+
+    The text enters on the right and leaves on the left, one digit per step.
+
+    Will throw a ValueError if characters are used that are not supported.
+    """
+    width = len(DIGIT_ADDR)
+
+    digits = []
+    for char in value:
+        try:
+            digits.append(LETTERS[char])
+        except KeyError:
+            raise ValueError("Character {0} not supported".format(char))
+
+    digits = [0x00] * width + digits + [0x00] * width
+
+    steps = [(make_frame(digits[i:i + width]), None) for i in range(len(digits) - width + 1)]
+
+    return Animation(steps, fps)
+
+# End def
+
+
+def blink(frame, rate=HT16K33_BLINK_2HZ, duration=2.0):
+    """Return an Animation showing frame with hardware blinking for duration seconds
+
+    The second step only holds the frame, so blinking lasts the whole
+    duration before play() restores the previous blink rate.
+    """
+    steps = [(frame, HT16K33_BLINK_CMD | rate | HT16K33_BLINK_DISPLAYON),
+             (frame, None)]
+
+    return Animation(steps, len(steps) / duration)
+
+# End def
+
+
+def fade(frame, fps=FADE_FPS, fade_in=False):
+    """Return an Animation stepping the brightness of frame down (or up)
+
+    play() restores the previous brightness after the last step.
+    """
+    levels = range(HT16K33_BRIGHTNESS_HIGHEST, HT16K33_BRIGHTNESS_DARKEST - 1, -1)
+    if fade_in:
+        levels = reversed(levels)
+
+    steps = [(frame, HT16K33_BRIGHTNESS_CMD | level) for level in levels]
+
+    return Animation(steps, fps)
+
+# End def
+
+
+class I2CDevice():
+    """ Class to write to one I2C address through /dev/i2c-<bus> """
+    # Class variables
+    fd      = None
+
+    def __init__(self, bus, address):
+        """ Open the I2C bus and select the device address
+
+        Will throw an OSError if the bus cannot be opened or the address
+        cannot be selected.
+        """
+        self.fd = os.open(I2C_DEVICE.format(bus), os.O_RDWR)
+
+        try:
+            fcntl.ioctl(self.fd, I2C_SLAVE, address)
+        except OSError:
+            self.close()
+            raise
+
+    # End def
+
+
+    def write(self, data):
+        """ Write the bytes in data to the device in one I2C transaction """
+        os.write(self.fd, bytes(data))
+
+    # End def
+
+
+    def close(self):
+        """ Close the I2C bus """
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    # End def
+
+# End class
+
+
 class HT16K33():
     """ Class to manage a HT16K33 I2C display """
     # Class variables
     bus     = None
     address = None
     command = None
-    
-    def __init__(self, bus, address=0x70, blink=HT16K33_BLINK_OFF, brightness=HT16K33_BRIGHTNESS_HIGHEST):
+    i2c     = None
+    frame   = None      # Display RAM image requested by the caller
+    shadow  = None      # Display RAM image the display is showing (None = unknown)
+    batches = 0         # Depth of nested batch() blocks
+    forced  = False     # Next flush() rewrites the whole display RAM
+
+    blink_rate = HT16K33_BLINK_OFF
+    brightness = HT16K33_BRIGHTNESS_HIGHEST
+    error   = None      # Exception raised in the writer thread
+
+    frames_requested = 0
+    frames_written   = 0
+    frames_dropped   = 0
+
+    def __init__(self, bus, address=0x70, blink=HT16K33_BLINK_OFF, brightness=HT16K33_BRIGHTNESS_HIGHEST, transport=TRANSPORT_DEVICE,
+                       asynchronous=False, max_rate=ASYNC_MAX_RATE):
         """ Initialize class variables; Set up display; Set display to blank """
-        
+
         # Initialize class variables
+        self.bus     = bus
+        self.address = address
+        self.command = I2C_COMMAND.format(bus, address)
+        self.frame   = bytearray(DISPLAY_RAM_SIZE)
+
+        # Asynchronous mode: latest frame waiting for the writer thread
+        self._thread    = None
+        self._pending   = collections.deque()   # (frame, force, command) in order
+        self._stopping  = False
+        self._interval  = 1.0 / max_rate
+        self._condition = threading.Condition()
+
+        if transport == TRANSPORT_DEVICE:
+            try:
+                self.i2c = I2CDevice(bus, address)
+            except OSError as e:
+                print("HT16K33: Cannot open {0} ({1}); using i2cset".format(I2C_DEVICE.format(bus), e))
+        elif transport != TRANSPORT_COMMAND:
+            raise ValueError("Unknown transport: {0}".format(transport))
+
         print("HT16K33:")
-        print("    Bus     = {0}".format(bus))
-        print("    Address = 0x{0:x}".format(address))
+        print("    Bus       = {0}".format(bus))
+        print("    Address   = 0x{0:x}".format(address))
+        print("    Transport = {0}".format(TRANSPORT_DEVICE if self.i2c else TRANSPORT_COMMAND))
+
+        # Set up display
+        self._setup(blink, brightness)
 
-        # Set up display        
-        
         # Set display to blank
-            
+        self.blank()
+
+        if asynchronous:
+            self._thread = threading.Thread(target=self._writer, name="ht16k33-writer", daemon=True)
+            self._thread.start()
+
     # End def
-    
+
+    def _write(self, *data):
+        """Send a command byte, or a register address followed by data"""
+        if self.i2c is not None:
+            self.i2c.write(data)
+        else:
+            os.system("{0} {1}".format(self.command, " ".join(str(d) for d in data)))
+
+    # End def
+
+    def _write_block(self, register, data):
+        """Write data to consecutive registers in one I2C transaction"""
+        if self.i2c is not None:
+            self.i2c.write(bytes([register]) + bytes(data))
+        else:
+            # i2cset -y 1 0x70 0 <16 bytes> i  (I2C block write)
+            os.system("{0} {1} {2} i".format(self.command, register, " ".join(str(d) for d in data)))
+
+    # End def
+
+    def close(self):
+        """Close the I2C device (the display keeps showing its last value)"""
+        if self._thread is not None:
+            with self._condition:
+                self._stopping = True
+                self._condition.notify()
+            self._thread.join()
+            self._thread = None
+
+        if self.i2c is not None:
+            self.i2c.close()
+            self.i2c = None
+
+    # End def
+
     def _setup(self, blink, brightness):
         """Initialize the display itself"""
+        self.blink_rate = blink
+        self.brightness = brightness
+
         if self.command:
             # i2cset -y 1 0x70 0x21
-            os.system("{0} {1}".format(self.command, (HT16K33_SYSTEM_SETUP | HT16K33_OSCILLATOR)))
+            self._write(HT16K33_SYSTEM_SETUP | HT16K33_OSCILLATOR)
             # i2cset -y 1 0x70 0x81
-            os.system("{0} {1}".format(self.command, (HT16K33_BLINK_CMD | blink | HT16K33_BLINK_DISPLAYON)))
+            self._write(HT16K33_BLINK_CMD | blink | HT16K33_BLINK_DISPLAYON)
             # i2cset -y 1 0x70 0xEF
-            os.system("{0} {1}".format(self.command, (HT16K33_BRIGHTNESS_CMD | brightness)))
+            self._write(HT16K33_BRIGHTNESS_CMD | brightness)
         else:
             print("HT16K33 setup()")
 
-    # End def    
+    # End def
 
 
     def encode(self, data, double_point=False):
@@ -219,59 +634,210 @@ class HT16K33():
 
     def set_digit(self, digit_number, data, double_point=False):
         """Update the given digit of the display."""
-        if self.command:
-            os.system("{0} {1} {2}".format(self.command, DIGIT_ADDR[digit_number], self.encode(data, double_point)))    
-        else:
-            print("HT16K33 set_digit() = {0}".format(self.encode(data, double_point)))
+        self.set_digit_raw(digit_number, self.encode(data, double_point))
 
     # End def
 
 
     def set_digit_raw(self, digit_number, data, double_point=False):
         """Update the given digit of the display using raw data value"""
-        if self.command:
-            os.system("{0} {1} {2}".format(self.command, DIGIT_ADDR[digit_number], data))
-        else:
-            print("HT16K33 set_digit_raw() = 0x{0:x}".format(data))
+        self.frame[DIGIT_ADDR[digit_number]] = data
+        self._changed()
 
     # End def
 
 
     def set_colon(self, enable):
         """Set the colon on the display."""
+        if enable:
+            self.frame[COLON_ADDR] = COLON_ON
+        else:
+            self.frame[COLON_ADDR] = COLON_OFF
+        self._changed()
+
+    # End def
+
+
+    @property
+    def colon(self):
+        """True if the colon is on (in the requested frame)"""
+        return bool(self.frame[COLON_ADDR] & COLON_ON)
+
+    # End def
+
+
+    def write_frame(self, frame, force=False):
+        """Show a 16 byte display RAM image (see make_frame())
+
+        force=True sends the whole frame in the next flush(), even the bytes
+        the display already shows.
+        """
+        if len(frame) != DISPLAY_RAM_SIZE:
+            raise ValueError("Frame must have {0} bytes".format(DISPLAY_RAM_SIZE))
+
+        self.frame[:] = frame
+        if force:
+            self.forced = True
+        self._changed()
+
+    # End def
+
+
+    def _changed(self):
+        """Send the requested frame, unless inside a batch() block"""
+        if self.batches == 0:
+            self.flush()
+
+    # End def
+
+
+    def flush(self, force=False):
+        """Send the bytes of the requested frame that differ from the shadow copy
+
+        The changed bytes are sent as one block write from the first to the
+        last changed address; nothing is sent if the display already shows
+        the frame.  force=True rewrites the whole display RAM (e.g. if the
+        display was reset or written by another program).
+
+        In asynchronous mode the frame is queued for the writer thread
+        instead.  It replaces the last queued item if that is a frame the
+        thread has not sent yet (but never a frame queued before a command).
+        """
+        self.frames_requested += 1
+
+        force       = force or self.forced
+        self.forced = False
+
+        if self._thread is None:
+            self._send(self.frame, force)
+            return
+
+        self._check_error()
+
+        with self._condition:
+            if self._pending and (self._pending[-1][0] is not None):
+                self.frames_dropped += 1
+                force = force or self._pending.pop()[1]
+            self._pending.append((bytes(self.frame), force, None))
+            self._condition.notify()
+
+    # End def
+
+
+    def _command(self, command):
+        """Send a command byte (blink / brightness) after any frame queued before it"""
+        if self._thread is None:
+            self._write(command)
+            return
+
+        self._check_error()
+
+        with self._condition:
+            self._pending.append((None, False, command))
+            self._condition.notify()
+
+    # End def
+
+
+    def _check_error(self):
+        """Raise the last exception of the writer thread (once)"""
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    # End def
+
+
+    def _writer(self):
+        """Writer thread: send queued frames (at most max_rate a second) and commands in order
+
+        All bus writes go through this thread in asynchronous mode.
+        """
+        next_write = time.monotonic()
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopping)
+                if not self._pending:
+                    return
+
+                # Wait until the next frame write is allowed; a newer frame
+                # replaces the pending one meanwhile
+                delay = next_write - time.monotonic()
+                if (self._pending[0][0] is not None) and (delay > 0):
+                    self._condition.wait_for(lambda: self._stopping, timeout=delay)
+
+                frame, force, command = self._pending.popleft()
+
+            try:
+                if frame is None:
+                    self._write(command)
+                else:
+                    self._send(frame, force)
+                    next_write = time.monotonic() + self._interval
+            except OSError as e:
+                self.error = e
+
+    # End def
+
+
+    def _send(self, frame, force=False):
+        """Write the bytes of frame that differ from the shadow copy"""
+        if force or (self.shadow is None):
+            first, last = 0, DISPLAY_RAM_SIZE - 1
+        else:
+            changed = [i for i in range(DISPLAY_RAM_SIZE) if frame[i] != self.shadow[i]]
+            if not changed:
+                return
+            first, last = changed[0], changed[-1]
+
+        data = frame[first:last + 1]
+
         if self.command:
-            if enable:
-                os.system("{0} {1} {2}".format(self.command, COLON_ADDR, 0x02))
+            if len(data) == 1:
+                self._write(DISPLAY_RAM_ADDR + first, data[0])
             else:
-                os.system("{0} {1} {2}".format(self.command, COLON_ADDR, 0x00))
+                self._write_block(DISPLAY_RAM_ADDR + first, data)
         else:
-            print("HT16K33 set_colon() = {0}".format(enable))
+            print("HT16K33 flush() = 0x{0:02x}: {1}".format(first, data.hex()))
 
-    # End def        
+        self.shadow = bytearray(frame)
+        self.frames_written += 1
+
+    # End def
+
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Context manager: collect all changes and send them once at the end
+
+            with display.batch():
+                display.set_colon(True)
+                display.update(1234)
+        """
+        self.batches += 1
+        try:
+            yield self
+        finally:
+            self.batches -= 1
+            if self.batches == 0:
+                self.flush()
+
+    # End def
 
 
     def blank(self):
         """Clear the display to read nothing"""
-        if self.command:
-            self.set_colon(False)
-
-            self.set_digit_raw(3, 0x00)
-            self.set_digit_raw(2, 0x00)
-            self.set_digit_raw(1, 0x00)
-            self.set_digit_raw(0, 0x00)
-        else:
-            print("HT16K33 blank()")
+        self.write_frame(make_frame([]))
 
     # End def
 
 
     def clear(self):
         """Clear the display to read '0000'"""
-        if self.command:
+        with self.batch():
             self.set_colon(False)
             self.update(0)
-        else:
-            print("HT16K33 clear()")        
 
     # End def
 
@@ -279,15 +845,14 @@ class HT16K33():
     def update(self, value):
         """Update the value on the display.  
         
-        This function will clear the display and then set the appropriate digits
+        Shows all four digits (with leading zeros) and keeps the current
+        colon state.  Only the digits that changed are written.
         
         :param value: Value must be between 0 and 9999.
         
         Will throw a ValueError if number is not between 0 and 9999.
         """
-
-        # Modify code to implement this function
-        print("Set value = {0}".format(value)) # Remove when updating code
+        self.write_frame(number_frame(value, self.colon))
 
     # End def
     
@@ -299,35 +864,190 @@ class HT16K33():
         Will throw a ValueError if there are not the appropriate number of 
         characters or if characters are used that are not supported.
         """
-        if ((len(value) < 1) or (len(value) > 4)):
-            raise ValueError("Must have between 1 and 4 characters")        
-        
-        # Clear the display
-        self.blank()
+        # Set the whole display (colon off); only changed digits are written
+        self.write_frame(text_frame(value))
+
+    # End def
+
+
+    def set_blink(self, rate):
+        """Set the hardware blink rate (one of HT16K33_BLINK_*)"""
+        self.blink_rate = rate
+
+        if self.command:
+            self._command(HT16K33_BLINK_CMD | rate | HT16K33_BLINK_DISPLAYON)
+        else:
+            print("HT16K33 set_blink() = {0}".format(rate))
+
+    # End def
 
-        # Set the display to the correct characters        
-        for i, char in enumerate(value):
-            try:
-                # Translate the character into the value needed for hex display
-                
-                # Set the display digit with the character value
-                print("Set char  = {0}".format(char)) # Remove when updating code
-                
-            except:
-                raise ValueError("Character {0} not supported".format(char))
+
+    def set_brightness(self, level):
+        """Set the brightness of the display
+
+        Will throw a ValueError if level is not between 0 and 15.
+        """
+        if ((level < HT16K33_BRIGHTNESS_DARKEST) or (level > HT16K33_BRIGHTNESS_HIGHEST)):
+            raise ValueError("Brightness must be between {0} and {1}".format(
+                             HT16K33_BRIGHTNESS_DARKEST, HT16K33_BRIGHTNESS_HIGHEST))
+
+        self.brightness = level
+
+        if self.command:
+            self._command(HT16K33_BRIGHTNESS_CMD | level)
+        else:
+            print("HT16K33 set_brightness() = {0}".format(level))
+
+    # End def
+
+
+    def play(self, animation, repeat=1):
+        """Play an animation; return the number of steps skipped
+
+        Step i is due at start + i / fps.  Waiting for an absolute deadline
+        (instead of sleeping a fixed time after each write) means time spent
+        on the I2C bus does not add up over the animation.  If a step is so
+        late that the next one is already due, it is skipped (the last step
+        and steps that send a command are always shown).  Returns when the last step has been shown for
+        1 / fps; if the animation sends commands, the blink rate and
+        brightness set with set_blink() / set_brightness() are restored.
+
+        In asynchronous mode the writer thread sends at most max_rate frames
+        per second; steps it replaced with a newer one before sending are
+        counted as skipped too.
+        """
+        period  = 1.0 / animation.fps
+        total   = repeat * len(animation.steps)
+        skipped = 0
+        dropped = self.frames_dropped
+        start   = time.monotonic()
+
+        for index in range(total):
+            frame, command = animation.steps[index % len(animation.steps)]
+            deadline = start + index * period
+
+            now = time.monotonic()
+            if (now >= deadline + period) and (index < total - 1) and (command is None):
+                skipped += 1
+                continue
+            if now < deadline:
+                time.sleep(deadline - now)
+
+            self.write_frame(frame)
+            if command is not None:
+                self._command(command)
+
+        # Hold the last step for its full period
+        delay = (start + total * period) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        # Animation commands are not tracked; restore the display settings
+        if animation.commands:
+            self.set_blink(self.blink_rate)
+            self.set_brightness(self.brightness)
+
+        return skipped + (self.frames_dropped - dropped)
+
+    # End def
 
 # End class
 
 
+def benchmark_encode(count=100000):
+    """Print frames encoded per second (no display needed)"""
+
+    def encode_digits(value):
+        digits = [HEX_DIGITS[int(d)] for d in "{0:04d}".format(value)]
+        return make_frame(digits)
+
+    words = ["Prog", " go ", "in 1", "in 2", "in 3", "----", "done"]
+
+    tests = [("number, per digit",  lambda i: encode_digits(i % 10000)),
+             ("number, table",      lambda i: number_frame(i % 10000)),
+             ("text, uncached",     lambda i: text_frame.__wrapped__(words[i % 7])),
+             ("text, cached",       lambda i: text_frame(words[i % 7]))]
+
+    print("Benchmark HT16K33 Encoding:")
+
+    for name, encode in tests:
+        start = time.perf_counter()
+        for i in range(count):
+            encode(i)
+        elapsed = time.perf_counter() - start
+
+        print("    {0:18s}: {1:10.0f} encodes/s".format(name, count / elapsed))
+
+# End def
+
+
+def benchmark(bus=1, address=0x70, duration=2.0):
+    """Print display updates per second for each transport
+
+    An update is one update() call on a counter.  "full" rewrites the
+    whole display RAM each time; "diff" only sends the digits that changed
+    (usually just the last one).  "async" posts each update to the writer
+    thread, which sends at most ASYNC_MAX_RATE frames per second.
+    """
+
+    print("Benchmark HT16K33 Display:")
+
+    for transport in [TRANSPORT_DEVICE, TRANSPORT_COMMAND]:
+        display = HT16K33(bus, address, transport=transport)
+
+        if (transport == TRANSPORT_DEVICE) and (display.i2c is None):
+            print("    {0:8s}: not available".format(transport))
+            continue
+
+        for mode in ["full", "diff"]:
+            count = 0
+            start = time.perf_counter()
+            while (time.perf_counter() - start) < duration:
+                if mode == "full":
+                    display.write_frame(number_frame(count % (HT16K33_MAX_VALUE + 1)), force=True)
+                else:
+                    display.update(count % (HT16K33_MAX_VALUE + 1))
+                count += 1
+            elapsed = time.perf_counter() - start
+
+            print("    {0:8s} {1:4s}: {2:8.1f} updates/s  ({3:.2f} ms per update)".format(
+                  transport, mode, count / elapsed, 1000.0 * elapsed / count))
+
+        display.blank()
+        display.close()
+
+        display = HT16K33(bus, address, transport=transport, asynchronous=True)
+
+        count = 0
+        start = time.perf_counter()
+        while (time.perf_counter() - start) < duration:
+            display.update(count % (HT16K33_MAX_VALUE + 1))
+            count += 1
+        elapsed = time.perf_counter() - start
+
+        display.close()
+
+        print("    {0:8s} {1:4s}: {2:8.1f} updates/s  ({3} requested, {4} written, {5} dropped)".format(
+              transport, "async", count / elapsed, display.frames_requested,
+              display.frames_written, display.frames_dropped))
+
+# End def
+
+
 # ------------------------------------------------------------------------
 # Main script
 # ------------------------------------------------------------------------
 
 if __name__ == '__main__':
-    import time
+    import sys
+
+    if (len(sys.argv) > 1) and (sys.argv[1] == "benchmark"):
+        benchmark_encode()
+        benchmark()
+        sys.exit(0)
 
     delay = 0.1
-    
+
     print("Test HT16K33 Display:")
     
     display = HT16K33(1, 0x70)
@@ -369,6 +1089,15 @@ if __name__ == '__main__':
     time.sleep(1)
 
     display.clear()    
+    time.sleep(1)
+
+    # Test animations
+    display.play(marquee("HELLO PocketbeAgLe"))
+    display.play(blink(text_frame("done")))
+    display.play(fade(text_frame("done")))
+    display.play(fade(text_frame("done"), fade_in=True))
+
+    display.blank()
     print("Test Finished.")
 
 
@@ -1,10 +1,12 @@
 import sounddevice as sd
-import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Non-GUI backend
-import matplotlib.pyplot as plt
-import time
 import os
+import sys
+
+# Shared stethoscope modules live in project_01
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "project_01"))
+from ring_buffer import RingBuffer
+from stream_capture import StreamCapture
+from live_plot import LiveWaveformPlot
 
 # ----------------------------
 # CONFIG
@@ -14,29 +16,62 @@ duration = 10        # Total recording duration (seconds)
 block_size = 2048    # Samples per block
 device = 'hw:1,0'    # USB microphone device
 output_file = "live_waveform.png"
+keep_seconds = None  # Only plot the last N seconds (None = whole session)
+capture_mode = "stream"  # "stream" (gapless InputStream) or "blocking" (sd.rec per block)
+max_save_rate = 1.0  # Maximum PNG writes per second (None = every block)
 # ----------------------------
 
 print(f"Starting live waveform recording for {duration} seconds...")
 
 num_blocks = int(duration * fs / block_size)
-audio_buffer = np.array([], dtype=np.int16)
 
-for i in range(num_blocks):
-    block = sd.rec(block_size, samplerate=fs, channels=1, dtype='int16', device=device)
-    sd.wait()
-    block = block.flatten()
-    audio_buffer = np.concatenate((audio_buffer, block))
+# Preallocated buffer: constant cost per block regardless of session length
+if keep_seconds is None:
+    audio_buffer = RingBuffer(num_blocks * block_size)
+else:
+    audio_buffer = RingBuffer.from_seconds(keep_seconds, fs)
+
+# One figure for the whole session; only the line data changes per block
+live_plot = LiveWaveformPlot(output_file, audio_buffer.capacity, max_save_rate=max_save_rate)
+
+def read_blocks():
+    """Yield lists of captured blocks until num_blocks have been read."""
+    if capture_mode == "stream":
+        # Device stays open; blocks queue up while we plot, so nothing is lost
+        with StreamCapture(fs=fs, block_size=block_size, device=device) as capture:
+            count = 0
+            while count < num_blocks:
+                block = capture.get_block(timeout=1.0)
+                if block is None:
+                    print("Timeout waiting for audio.")
+                    break
+                blocks = [block]
+                # Drain anything that arrived while we were plotting
+                while capture.pending() and (count + len(blocks) < num_blocks):
+                    blocks.append(capture.get_block())
+                count += len(blocks)
+                yield blocks
+        print(f"Blocks captured: {capture.blocks_captured}, "
+              f"dropped: {capture.blocks_dropped}, "
+              f"overflowed: {capture.blocks_overflowed}")
+    else:
+        for _ in range(num_blocks):
+            block = sd.rec(block_size, samplerate=fs, channels=1, dtype='int16', device=device)
+            sd.wait()
+            yield [block.flatten()]
+
+i = 0
+for blocks in read_blocks():
+    for block in blocks:
+        audio_buffer.write(block)
+    i += len(blocks)
     
-    # Plot the current buffer
-    plt.figure(figsize=(10, 4))
-    plt.plot(audio_buffer, color='blue')
-    plt.title("Live Audio Waveform")
-    plt.xlabel("Sample Number")
-    plt.ylabel("Amplitude")
-    plt.tight_layout()
-    plt.savefig(output_file)
-    plt.close()
+    # Redraw the current buffer (PNG is re-encoded at most max_save_rate per second)
+    saved = live_plot.update(audio_buffer.view())
     
-    print(f"Block {i+1}/{num_blocks} recorded. Waveform updated.")
+    print(f"Block {i}/{num_blocks} recorded." + (" Waveform updated." if saved else ""))
+
+live_plot.save()
+live_plot.close()
 
 print(f"Recording complete! Waveform saved as {output_file}")